@@ -1,89 +1,20 @@
 import os
 import logging
-import logging.config
-import sys
 import uuid
 from flask import Flask
-from flask import g, request
+from flask import g
 from flask_sqlalchemy import SQLAlchemy
-from flask_cors import CORS
 from dotenv import load_dotenv
-from pythonjsonlogger import jsonlogger
 
 # Load environment variables
 load_dotenv()
 
-# Initialize SQLAlchemy
-db = SQLAlchemy()
+# Initialize SQLAlchemy (sessions route read-only requests to replicas, if configured)
+from app.database import RoutingSession
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
-# Setup logging - COMPLETE VERSION
-# Remove all existing handlers
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
-
-# Create file handler with immediate flush
-file_handler = logging.FileHandler('app.log', mode='a', encoding='utf-8')
-file_handler.setLevel(logging.DEBUG)
-file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(file_formatter)
-
-# Create console handler
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-console_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(console_formatter)
-
-# Configure root logger
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-root_logger.addHandler(file_handler)
-root_logger.addHandler(console_handler)
-
-# Make sure app loggers work
-logging.getLogger('app').setLevel(logging.DEBUG)
-logging.getLogger('app.services').setLevel(logging.DEBUG)
-logging.getLogger('app.services.user_service').setLevel(logging.DEBUG)
-logging.getLogger('app.services.cart_service').setLevel(logging.DEBUG)
-logging.getLogger('app.services.product_service').setLevel(logging.DEBUG)
-logging.getLogger('app.services.order_service').setLevel(logging.DEBUG)
-
-# Reduce Flask noise
-logging.getLogger('werkzeug').setLevel(logging.WARNING)
-
-# Human-readable formatter (with emojis)
-human_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-# JSON formatter (for Grafana/Loki)
-json_formatter = jsonlogger.JsonFormatter(
-    '%(asctime)s %(levelname)s %(name)s %(message)s',
-    rename_fields={'asctime': 'timestamp', 'levelname': 'level', 'name': 'logger'}
-)
-
-# File handler for human-readable logs
-human_file_handler = logging.FileHandler('app.log')
-human_file_handler.setFormatter(human_formatter)
-human_file_handler.setLevel(logging.INFO)
-
-# File handler for JSON logs
-json_file_handler = logging.FileHandler('app_json.log')
-json_file_handler.setFormatter(json_formatter)
-json_file_handler.setLevel(logging.INFO)
-
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(human_formatter)
-console_handler.setLevel(logging.INFO)
-
-# Configure root logger
-logging.basicConfig(
-    level=logging.INFO,
-    handlers=[human_file_handler, json_file_handler, console_handler],
-    force=True  # ← ADD THIS!
-)
-
-# Get logger for this module
+# Logging is configured by create_app (importing the package has no side effects)
 logger = logging.getLogger(__name__)
-logger.info("✅ Logging system initialized with JSON support")
 
 def get_database_uri():
     """
@@ -106,24 +37,72 @@ def get_database_uri():
     else:
         return 'sqlite:///ecommerce.db'
 
-def create_app():
+def get_replica_uris():
+    """
+    Read replica URIs, next to the primary settings:
+    MYSQL_REPLICA_HOSTS ("host" or "host:port", comma separated; same credentials
+    unless MYSQL_REPLICA_USER / MYSQL_REPLICA_PASSWORD are set) or SQLITE_REPLICA_PATHS
+    """
+    db_type = os.getenv('DATABASE_TYPE', 'sqlite').lower()
+    
+    if db_type == 'mysql':
+        user = os.getenv('MYSQL_REPLICA_USER', os.getenv('MYSQL_USER', 'root'))
+        password = os.getenv('MYSQL_REPLICA_PASSWORD', os.getenv('MYSQL_PASSWORD', ''))
+        database = os.getenv('MYSQL_DATABASE', 'ecommerce_db')
+        uris = []
+        for host in filter(None, (h.strip() for h in os.getenv('MYSQL_REPLICA_HOSTS', '').split(','))):
+            if ':' not in host:
+                host = f"{host}:{os.getenv('MYSQL_PORT', '3306')}"
+            uris.append(f'mysql+pymysql://{user}:{password}@{host}/{database}')
+        return uris
+    
+    return [f'sqlite:///{path.strip()}' for path in os.getenv('SQLITE_REPLICA_PATHS', '').split(',') if path.strip()]
+
+def _env_flag(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+def create_app(start_workers=None):
     """
     Application factory - creates and configures Flask app with monitoring
+    
+    Per-process machinery (hashing pool, job/activity threads, tracing exporter)
+    is started by init_worker(). With APP_PRELOAD=true (or start_workers=False)
+    that is left to the server, which calls it in each worker after fork so the
+    workers share the parent's imported code and configured app.
     """
-    logger.info("Logging system initialized")
+    from app.utils.logger import configure_logging
+    configure_logging()
     
     # Create Flask app
     app = Flask(__name__, static_folder='../static', static_url_path='/static')
     
     # Configuration
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+    from app.auth import DEFAULT_SECRET_KEY
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', DEFAULT_SECRET_KEY)
+    if app.config['SECRET_KEY'] == DEFAULT_SECRET_KEY:
+        logger.warning("⚠️ SECRET_KEY is not set - login tokens are only issued in debug or testing")
     app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri()
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Pool sizing (MySQL) / pool metrics, from DB_POOL_* variables; optional read replicas
+    from app.database import get_engine_options, init_database
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_BINDS'] = {
+        f'replica_{i}': {'url': uri, **get_engine_options(uri)}
+        for i, uri in enumerate(get_replica_uris())
+    }
+    
     logger.info(f"Database configured: {app.config['SQLALCHEMY_DATABASE_URI'].split('://')[0]}")
     
     # Initialize extensions
     db.init_app(app)
+    init_database(app, db)
+    
+    # Log statements over SLOW_QUERY_MS with their plans
+    from app.slow_queries import init_slow_query_log
+    init_slow_query_log(app)
+    
+    from flask_cors import CORS
     CORS(app)
     
     # Initialize Prometheus Metrics
@@ -133,13 +112,13 @@ def create_app():
     except Exception as e:
         logger.warning(f"⚠️ Could not initialize metrics: {e}")
     
-    # Initialize OpenTelemetry Tracing
-    try:
-        from app.tracing import init_tracing
-        with app.app_context():
-            init_tracing(app, db.engine)
-    except Exception as e:
-        logger.warning(f"⚠️ Could not initialize tracing: {e}")
+    # Per-request phase timings (Server-Timing header, JSON access log)
+    from app.server_timing import init_server_timing
+    init_server_timing(app)
+    
+    # Shed excess load with 503 before any other request work
+    from app.admission import init_admission
+    init_admission(app)
     
     # Register blueprints (API routes)
     from app.routes import products, cart, orders, users, admin
@@ -156,24 +135,18 @@ def create_app():
     @app.before_request
     def before_request():
         g.request_id = str(uuid.uuid4())[:8] #Generate unique request id
-
-    # Inject request ID into all logs
-    old_factory = logging.getLogRecordFactory()
-
-    def record_factory(*args, **kwargs):
-        record = old_factory(*args, **kwargs)
-        try:
-            #Try to get request_id from Flask context
-            if hasattr(g, 'request_id'):
-                record.taskName = g.request_id
-            else:
-                record.taskName = None
-        except RuntimeError:
-            # Outside request context (e.g., during startup)
-            record.taskName = None
-        return record
-        
-    logging.setLogRecordFactory(record_factory)
+    
+    # Verify signed session tokens (no database access)
+    from app.auth import init_auth
+    init_auth(app)
+    
+    # Throttle login attempts per username and client IP
+    from app.throttle import init_login_throttle
+    init_login_throttle(app)
+    
+    # Cache shared GET responses, invalidated by tag on writes
+    from app.response_cache import init_response_cache
+    init_response_cache(app)
 
     # Serve frontend
     @app.route('/')
@@ -190,9 +163,96 @@ def create_app():
     def health_check():
         return {'status': 'healthy', 'service': 'ecommerce-api'}, 200
     
-    # Create database tables
+    # Bring the schema up to date (a single version check when already current)
+    from app.migrations import ensure_schema
+    ensure_schema(app, db)
+    
+    # Password hashing, background jobs and active-user tracking
+    from app.utils.passwords import init_password_hasher
+    from app.jobs import init_jobs
+    from app.active_users import init_active_users
+    init_password_hasher(start=False)
+    init_jobs(app, start=False)
+    init_active_users(app, start=False)
+    
+    # /health/live and /health/ready (dependency checks run in the background)
+    from app.health import init_health
+    init_health(app, start=False)
+    
+    if start_workers is None:
+        start_workers = not _env_flag('APP_PRELOAD', False)
+    if start_workers:
+        init_worker(app)
+    
+    return app
+
+def init_worker(app):
+    """
+    Start per-process resources. Call once per serving process - directly from
+    create_app, or from the server's post-fork hook when the app is preloaded.
+    """
+    if app.extensions.get('worker_pid') == os.getpid():
+        return
+    preloaded = 'worker_pid' in app.extensions or _env_flag('APP_PRELOAD', False)
+    app.extensions['worker_pid'] = os.getpid()
+    
+    # Connections opened in the parent must not be shared with forked workers
+    if preloaded:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+    
+    # Start the password hashing pool (forks, so before any background threads)
+    from app.utils.passwords import get_password_hasher
+    get_password_hasher().start()
+    
+    # Initialize OpenTelemetry Tracing (exporter connections are per process)
+    from app.tracing import init_tracing
     with app.app_context():
-        db.create_all()
-        logger.info("Database tables created successfully")
+        app.extensions['tracer'] = init_tracing(app, db.engine)
+    
+    # Start background job workers (post-checkout processing)
+    job_queue = app.extensions.get('job_queue')
+    if job_queue is not None and job_queue.workers > 0:
+        job_queue.start()
+    
+    # Count distinct active users for the ecommerce_active_users gauges
+    tracker = app.extensions.get('active_users')
+    if tracker is not None:
+        tracker.start()
+    
+    # Readiness checks, cached for /health/ready
+    checker = app.extensions.get('health')
+    if checker is not None:
+        checker.start()
+
+def shutdown_worker(app):
+    """
+    Stop per-process resources before a worker exits (graceful reload or
+    max-requests recycling), so in-flight jobs and activity are not lost.
+    """
+    if app.extensions.get('worker_pid') != os.getpid():
+        return
+    
+    # Report not ready first so new traffic goes elsewhere
+    checker = app.extensions.get('health')
+    if checker is not None:
+        checker.stop()
+    
+    job_queue = app.extensions.get('job_queue')
+    if job_queue is not None:
+        job_queue.stop()
+    
+    # Write out pending activity so other workers keep counting it
+    tracker = app.extensions.get('active_users')
+    if tracker is not None:
+        tracker.stop()
+        try:
+            tracker.flush()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not flush active users on exit: {e}")
+    
+    from app.utils.passwords import get_password_hasher
+    get_password_hasher().shutdown()
     
-    return app
\ No newline at end of file
+    app.extensions.pop('worker_pid', None)
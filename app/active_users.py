@@ -0,0 +1,342 @@
+"""
+Active User Tracking
+Distinct authenticated users over 5 minute, 1 hour and 24 hour windows.
+
+Requests only append the user id to a bounded deque (atomic, no lock). A
+background thread drains it into time buckets - minute buckets for the 5m/1h windows,
+hour buckets for 24h - and updates the gauges. Each bucket is an exact set
+until it grows past a threshold, then becomes a HyperLogLog sketch (4 KB,
+~1.6% error). Sketches use a stable hash, so buckets from several worker
+processes can be merged through a shared directory.
+"""
+import base64
+import glob
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Window name -> (bucket granularity in seconds, number of buckets)
+WINDOWS = {
+    '5m': (60, 5),
+    '1h': (60, 60),
+    '24h': (3600, 24),
+}
+
+
+def _hash64(value):
+    """Stable 64-bit hash (Python's hash() is salted per process, so not mergeable)"""
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """Cardinality sketch with 2^precision one-byte registers"""
+
+    def __init__(self, precision=12, registers=None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    def add(self, value):
+        x = _hash64(value)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class ActivityBucket:
+    """Distinct users seen in one time slot: exact set, promoted to a sketch when large"""
+
+    __slots__ = ('users', 'sketch', 'exact_limit')
+
+    def __init__(self, exact_limit=1000):
+        self.users = set()
+        self.sketch = None
+        self.exact_limit = exact_limit
+
+    def add(self, user_id):
+        if self.sketch is not None:
+            self.sketch.add(user_id)
+            return
+        self.users.add(user_id)
+        if len(self.users) > self.exact_limit:
+            self.sketch = HyperLogLog()
+            for uid in self.users:
+                self.sketch.add(uid)
+            self.users = None
+
+    def merge(self, other):
+        if other.sketch is None:
+            for uid in other.users:
+                self.add(uid)
+        else:
+            if self.sketch is None:
+                self.sketch = HyperLogLog()
+                for uid in self.users:
+                    self.sketch.add(uid)
+                self.users = None
+            self.sketch.merge(other.sketch)
+
+    def to_state(self):
+        if self.sketch is None:
+            return {'users': sorted(self.users)}
+        return {'hll': base64.b64encode(bytes(self.sketch.registers)).decode('ascii')}
+
+    @classmethod
+    def from_state(cls, state, exact_limit=1000):
+        bucket = cls(exact_limit)
+        if 'hll' in state:
+            bucket.sketch = HyperLogLog(registers=base64.b64decode(state['hll']))
+            bucket.users = None
+        else:
+            bucket.users = set(state['users'])
+        return bucket
+
+
+def count_distinct(buckets, exact_limit=1000):
+    """Distinct users across buckets (exact while every bucket is still a set)"""
+    combined = ActivityBucket(exact_limit)
+    for bucket in buckets:
+        combined.merge(bucket)
+    return len(combined.users) if combined.sketch is None else combined.sketch.count()
+
+
+class ActiveUserTracker:
+    """
+    Sliding-window distinct user counts.
+    `record()` is safe to call from any request thread; everything else runs
+    on the flusher thread (or under the tracker lock).
+    """
+
+    def __init__(self, exact_limit=1000, flush_interval=5.0, shared_dir=None, max_pending=100000):
+        self.exact_limit = exact_limit
+        self.flush_interval = flush_interval
+        self.shared_dir = shared_dir
+
+        # Bounded so activity cannot pile up when nothing flushes (e.g. the
+        # flusher was never started); the oldest entries are dropped first
+        self._pending = deque(maxlen=max_pending)
+        self.dropped = 0  # approximate: counted without a lock
+        # Granularity -> {slot index -> ActivityBucket}
+        self._buckets = {granularity: {} for granularity, _ in WINDOWS.values()}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, user_id):
+        """Note activity by a user (called per request - no locking)"""
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append(user_id)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name='active-users', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"💥 Active user flush error: {str(e)}")
+
+    def flush(self, now=None):
+        """Drain pending activity, expire old buckets and update the gauges"""
+        now = time.time() if now is None else now
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+            if dropped:
+                logger.warning(f"⚠️ Active user backlog full - dropped {dropped} activity records")
+            self._drain(now)
+            self._expire(now)
+            if self.shared_dir:
+                self._write_shared_state()
+            counts = self.counts(now, _locked=True)
+
+        try:
+            from app.metrics import update_active_users
+            update_active_users(counts['5m'], counts)
+        except Exception:
+            pass
+        return counts
+
+    def _drain(self, now):
+        slots = {granularity: int(now // granularity) for granularity in self._buckets}
+        current = {}
+        for granularity, slot in slots.items():
+            buckets = self._buckets[granularity]
+            if slot not in buckets:
+                buckets[slot] = ActivityBucket(self.exact_limit)
+            current[granularity] = buckets[slot]
+
+        pending = self._pending
+        targets = list(current.values())
+        while True:
+            try:
+                user_id = pending.popleft()
+            except IndexError:
+                break
+            for bucket in targets:
+                bucket.add(user_id)
+
+    def _expire(self, now):
+        for granularity, keep in self._retention().items():
+            oldest = int(now // granularity) - keep + 1
+            buckets = self._buckets[granularity]
+            for slot in [s for s in buckets if s < oldest]:
+                del buckets[slot]
+
+    def _retention(self):
+        retention = {}
+        for granularity, count in WINDOWS.values():
+            retention[granularity] = max(retention.get(granularity, 0), count)
+        return retention
+
+    def counts(self, now=None, _locked=False):
+        """Distinct users per window, merged with other workers when a shared dir is set"""
+        now = time.time() if now is None else now
+        if not _locked:
+            with self._lock:
+                return self.counts(now, _locked=True)
+
+        sources = [self._buckets]
+        if self.shared_dir:
+            sources.extend(self._read_shared_states(now))
+
+        counts = {}
+        for window, (granularity, count) in WINDOWS.items():
+            newest = int(now // granularity)
+            selected = [
+                source[granularity][slot]
+                for source in sources
+                for slot in range(newest - count + 1, newest + 1)
+                if slot in source.get(granularity, {})
+            ]
+            counts[window] = count_distinct(selected, self.exact_limit)
+        return counts
+
+    # --- Cross-process merging ---
+
+    def to_state(self):
+        """Serializable snapshot of all live buckets"""
+        return {
+            str(granularity): {str(slot): bucket.to_state() for slot, bucket in buckets.items()}
+            for granularity, buckets in self._buckets.items()
+        }
+
+    def _state_path(self):
+        return os.path.join(self.shared_dir, f'active-users-{os.getpid()}.json')
+
+    def _write_shared_state(self):
+        try:
+            os.makedirs(self.shared_dir, exist_ok=True)
+            path = self._state_path()
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.to_state(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write active user state: {str(e)}")
+
+    def _read_shared_states(self, now):
+        """Bucket maps written by other workers (files untouched for over a day are ignored)"""
+        states = []
+        own_path = self._state_path()
+        max_age = max(granularity * count for granularity, count in WINDOWS.values())
+        for path in glob.glob(os.path.join(self.shared_dir, 'active-users-*.json')):
+            if path == own_path:
+                continue
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    continue
+                with open(path) as f:
+                    raw = json.load(f)
+                states.append({
+                    int(granularity): {
+                        int(slot): ActivityBucket.from_state(state, self.exact_limit)
+                        for slot, state in buckets.items()
+                    }
+                    for granularity, buckets in raw.items()
+                })
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping active user state {path}: {str(e)}")
+        return states
+
+
+_tracker = None
+
+
+def get_active_user_tracker():
+    return _tracker
+
+
+def record_activity(user_id):
+    """Record activity for a user if tracking is enabled"""
+    if _tracker is not None:
+        _tracker.record(user_id)
+
+
+def init_active_users(app, start=True):
+    """
+    Track authenticated users on every request. Environment:
+    ACTIVE_USERS_ENABLED, ACTIVE_USERS_FLUSH_INTERVAL (seconds),
+    ACTIVE_USERS_EXACT_LIMIT (users per bucket before switching to a sketch),
+    ACTIVE_USERS_MAX_PENDING (activity records held between flushes),
+    ACTIVE_USERS_SHARED_DIR (merge counts across worker processes)
+    """
+    global _tracker
+
+    if os.getenv('ACTIVE_USERS_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    _tracker = ActiveUserTracker(
+        exact_limit=int(os.getenv('ACTIVE_USERS_EXACT_LIMIT', 1000)),
+        flush_interval=float(os.getenv('ACTIVE_USERS_FLUSH_INTERVAL', 5.0)),
+        shared_dir=os.getenv('ACTIVE_USERS_SHARED_DIR') or None,
+        max_pending=int(os.getenv('ACTIVE_USERS_MAX_PENDING', 100000))
+    )
+    app.extensions['active_users'] = _tracker
+
+    @app.after_request
+    def track_active_user(response):
+        from flask import g
+        identity = g.get('identity')
+        if identity is not None:
+            _tracker.record(identity.user_id)
+        return response
+
+    if start:
+        _tracker.start()
+    return _tracker
@@ -0,0 +1,225 @@
+"""
+Admission Control
+Per-route-class concurrency limits that adapt to latency (AIMD): the limit
+grows by about one per limit's worth of fast requests and shrinks by a
+factor when requests exceed the class's target latency - e.g. when the
+database slows down. Requests over the limit are shed at once with 503 and
+Retry-After instead of queueing in the worker; health and metrics endpoints
+are always admitted.
+
+Latency is measured from when the proxy received the request (X-Request-Start)
+when that header is present, so time spent waiting in the server's accept
+backlog counts. Under gunicorn, limits default to the worker's thread count,
+the most it can ever have in flight; other servers (run.py, the ASGI entry
+point, test clients) have no fixed thread pool and get a high default.
+"""
+import logging
+import os
+import threading
+import time
+from flask import g, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+ROUTE_CLASSES = ('browse', 'checkout', 'auth', 'admin')
+# Login and registration have their own class (and the login throttle), so a
+# credential-stuffing burst cannot shed cart and order writes
+AUTH_PATHS = ('/api/users/login', '/api/users/register')
+# Set by gunicorn.conf.py; unset means the thread count is unknown
+WORKER_THREADS_ENV = 'GUNICORN_WORKER_THREADS'
+UNKNOWN_THREADS_LIMIT = 64
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit for one route class.
+    Decreases at most once per target-latency period so a single slow burst
+    does not collapse the limit.
+    """
+
+    def __init__(self, name, max_limit, target_latency, min_limit=1, backoff=0.9):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.shed = 0
+
+        self._lock = threading.Lock()
+        self._next_decrease = 0.0
+        self._next_log = 0.0
+
+    def try_acquire(self):
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.shed += 1
+                admitted = False
+            else:
+                self.in_flight += 1
+                admitted = True
+        self._record(shed=not admitted)
+        return admitted
+
+    def release(self, latency):
+        now = time.monotonic()
+        with self._lock:
+            busy = self.in_flight
+            self.in_flight -= 1
+            if latency > self.target_latency:
+                if now >= self._next_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._next_decrease = now + self.target_latency
+            elif busy * 2 >= self.limit:
+                # Only grow while the limit is actually being used
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._record()
+
+    def should_log(self):
+        """Rate-limit shed warnings to one per second per class"""
+        now = time.monotonic()
+        if now < self._next_log:
+            return False
+        self._next_log = now + 1.0
+        return True
+
+    def _record(self, shed=False):
+        try:
+            from app.metrics import record_admission
+            record_admission(self.name, self.in_flight, int(self.limit), shed)
+        except Exception:
+            pass
+
+
+def parse_request_start(value):
+    """
+    Epoch seconds from an X-Request-Start value: 't=1700000000.123' (nginx
+    $msec) or a bare number in seconds, milliseconds or microseconds
+    """
+    try:
+        start = float(value.strip().removeprefix('t='))
+    except (AttributeError, ValueError):
+        return None
+    if start > 1e14:
+        return start / 1e6
+    if start > 1e11:
+        return start / 1e3
+    return start
+
+
+class AdmissionController:
+    # Ignore queue times beyond this - a skewed clock or a stale header, not a real wait
+    MAX_QUEUE_SECONDS = 60.0
+
+    def __init__(self, limits, exempt_paths=('/health', '/metrics'), retry_after=1, queue_header='X-Request-Start'):
+        self.limits = limits  # route class -> AdaptiveLimit
+        self.exempt_paths = tuple(exempt_paths)
+        self.retry_after = retry_after
+        self.queue_header = queue_header
+
+    def queue_time(self):
+        """Seconds between the proxy receiving this request and this worker starting it"""
+        if not self.queue_header:
+            return 0.0
+        start = parse_request_start(request.headers.get(self.queue_header))
+        if start is None:
+            return 0.0
+        queued = time.time() - start
+        return queued if 0.0 < queued <= self.MAX_QUEUE_SECONDS else 0.0
+
+    def is_exempt(self, path):
+        return any(path == exempt or path.startswith(exempt + '/') for exempt in self.exempt_paths)
+
+    @staticmethod
+    def route_class(path, method):
+        if path.startswith('/api/admin'):
+            return 'admin'
+        if path in AUTH_PATHS:
+            return 'auth'
+        if method not in ('GET', 'HEAD', 'OPTIONS'):
+            return 'checkout'  # cart and order writes
+        return 'browse'
+
+    def before_request(self):
+        if self.is_exempt(request.path):
+            return None
+        limit = self.limits.get(self.route_class(request.path, request.method))
+        if limit is None:
+            return None
+
+        if not limit.try_acquire():
+            if limit.should_log():
+                logger.warning(f"🚦 Shedding {limit.name} requests (limit {int(limit.limit)}, in flight {limit.in_flight}) → HTTP 503")
+            response = jsonify({'error': 'Server busy, please retry shortly'})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(self.retry_after)
+            return response
+
+        # Backdate the start so the backlog wait counts towards the class's latency
+        g.admission = (limit, time.perf_counter() - self.queue_time())
+        return None
+
+    def teardown_request(self, exc=None):
+        admitted = g.pop('admission', None)
+        if admitted is not None:
+            limit, started = admitted
+            limit.release(time.perf_counter() - started)
+
+
+def _parse_classes(value, cast):
+    """'browse=64,checkout=32' -> {'browse': 64, 'checkout': 32}"""
+    parsed = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, number = item.partition('=')
+        parsed[name.strip()] = cast(number)
+    return parsed
+
+
+def default_limits(threads):
+    """Per-class limits for a worker with `threads` request threads (auth and admin never get all of them)"""
+    return {'browse': threads, 'checkout': threads, 'auth': max(1, threads // 2), 'admin': max(1, threads // 2)}
+
+
+def init_admission(app):
+    """
+    Install admission control (register before other request hooks so shed
+    requests cost no further work). Environment:
+    ADMISSION_ENABLED, ADMISSION_LIMITS (max in flight per class per process;
+    default from the gunicorn worker's threads, else UNKNOWN_THREADS_LIMIT),
+    ADMISSION_TARGET_MS (latency above which a
+    class's limit shrinks), ADMISSION_MIN_LIMIT, ADMISSION_BACKOFF,
+    ADMISSION_RETRY_AFTER (seconds), ADMISSION_EXEMPT_PATHS (always admitted,
+    with sub-paths), ADMISSION_QUEUE_HEADER (proxy receive-time header; empty
+    to ignore)
+    """
+    if os.getenv('ADMISSION_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    threads = os.getenv(WORKER_THREADS_ENV)
+    max_limits = default_limits(int(threads) if threads else UNKNOWN_THREADS_LIMIT)
+    max_limits.update(_parse_classes(os.getenv('ADMISSION_LIMITS', ''), int))
+    # Password hashing makes auth requests slow by design
+    targets_ms = {'browse': 250, 'checkout': 1000, 'auth': 2000, 'admin': 2000}
+    targets_ms.update(_parse_classes(os.getenv('ADMISSION_TARGET_MS', ''), float))
+    min_limit = int(os.getenv('ADMISSION_MIN_LIMIT', 1))
+    backoff = float(os.getenv('ADMISSION_BACKOFF', 0.9))
+
+    limits = {
+        name: AdaptiveLimit(name, max_limits[name], targets_ms[name] / 1000.0, min_limit, backoff)
+        for name in ROUTE_CLASSES if max_limits.get(name, 0) > 0
+    }
+    # Exports stream for minutes by design: their duration says nothing about load
+    exempt_paths = os.getenv('ADMISSION_EXEMPT_PATHS', '/health,/metrics,/api/admin/export')
+    exempt = [path.strip() for path in exempt_paths.split(',') if path.strip()]
+    controller = AdmissionController(limits, exempt, int(os.getenv('ADMISSION_RETRY_AFTER', 1)),
+                                     os.getenv('ADMISSION_QUEUE_HEADER', 'X-Request-Start').strip())
+
+    app.before_request(controller.before_request)
+    app.teardown_request(controller.teardown_request)
+    app.extensions['admission'] = controller
+    logger.info("🚦 Admission control: " + ', '.join(
+        f"{name}≤{limit.max_limit} @{limit.target_latency * 1000:.0f}ms" for name, limit in limits.items()
+    ))
+    return controller
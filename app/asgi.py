@@ -0,0 +1,167 @@
+"""
+ASGI Application
+Serves the hot read endpoints - /health, product listing and detail, order
+history - with an async database engine, so a worker waiting on the database
+keeps serving other requests. Every other path falls through to the Flask app,
+which runs in a thread pool. Models, serializers and queries are shared.
+
+The async routes deliberately skip the Flask request hooks: no admission
+control, no response cache, no replica routing (reads go to the primary) and
+no Server-Timing header. Latency is still exported per route. Run the app
+under gunicorn to get those; tests/test_asgi.py pins this behaviour.
+
+    uvicorn app.asgi:app --workers 4 --port 5000
+"""
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import wraps
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+from app import create_app, shutdown_worker
+from app.active_users import record_activity
+from app.auth import verify_token
+from app.database import create_async_db_engine
+from app.models.product import Product
+from app.services.order_service import OrderService
+
+logger = logging.getLogger(__name__)
+
+flask_app = create_app()
+
+
+def instrumented(path):
+    """Record latency per route template (these requests bypass the Flask exporter)"""
+    def decorator(endpoint):
+        @wraps(endpoint)
+        async def wrapper(request):
+            started = time.perf_counter()
+            try:
+                response = await endpoint(request)
+            except Exception as e:
+                logger.error(f"💥 Error in {endpoint.__name__}: {str(e)} → HTTP 500")
+                response = JSONResponse({'error': 'Internal server error'}, status_code=500)
+            try:
+                from app.metrics import record_asgi_request
+                record_asgi_request(request.method, path, response.status_code, time.perf_counter() - started)
+            except Exception:
+                pass
+            return response
+        return wrapper
+    return decorator
+
+
+def current_identity(request):
+    """Identity from the bearer token (None if missing or invalid)"""
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    with flask_app.app_context():
+        return verify_token(header[7:].strip())
+
+
+def int_arg(request, name):
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return None
+
+
+@instrumented('/health')
+async def health_check(request):
+    return JSONResponse({'status': 'healthy', 'service': 'ecommerce-api'})
+
+
+@instrumented('/api/products')
+async def get_products(request):
+    """Get all products"""
+    async with request.app.state.sessions() as session:
+        products = (await session.scalars(select(Product).filter_by(is_active=True))).all()
+        logger.info(f"📦 Retrieved {len(products)} products → HTTP 200")
+        return JSONResponse({
+            'products': [product.to_dict() for product in products],
+            'count': len(products)
+        })
+
+
+@instrumented('/api/products/{product_id}')
+async def get_product(request):
+    """Get product by ID"""
+    product_id = request.path_params['product_id']
+    async with request.app.state.sessions() as session:
+        product = await session.get(Product, product_id)
+        if not product:
+            logger.warning(f"❌ Product not found: ID {product_id} → HTTP 404")
+            return JSONResponse({'error': 'Product not found'}, status_code=404)
+        logger.info(f"✅ Product retrieved: '{product.name}' (ID: {product_id}) → HTTP 200")
+        return JSONResponse(product.to_dict())
+
+
+@instrumented('/api/orders/user/{user_id}')
+async def get_user_orders(request):
+    """
+    Get a page of orders for a user
+    Query params: limit, cursor (from next_cursor), summary=1 (omit items)
+    """
+    user_id = request.path_params['user_id']
+    identity = current_identity(request)
+    if identity is None:
+        return JSONResponse({'error': 'Authentication required'}, status_code=401)
+    if user_id != identity.user_id and not identity.is_admin:
+        logger.warning(f"🚫 User {identity.user_id} tried to access user {user_id}'s data → HTTP 403")
+        return JSONResponse({'error': 'Forbidden'}, status_code=403)
+    record_activity(identity.user_id)
+
+    summary = request.query_params.get('summary', '').lower() in ('1', 'true', 'yes')
+    limit = OrderService.page_limit(int_arg(request, 'limit'))
+    try:
+        stmt = OrderService.user_orders_statement(
+            user_id, limit, request.query_params.get('cursor'), include_items=not summary
+        )
+    except ValueError as e:
+        logger.warning(f"❌ Order history failed: {str(e)} (User: {user_id}) → HTTP 400")
+        return JSONResponse({'error': str(e)}, status_code=400)
+
+    async with request.app.state.sessions() as session:
+        orders, next_cursor = OrderService.split_page((await session.scalars(stmt)).all(), limit)
+        logger.info(f"📦 Retrieved {len(orders)} orders for user {user_id} (more: {next_cursor is not None}) → HTTP 200")
+        return JSONResponse({
+            'orders': [order.to_dict(include_items=not summary) for order in orders],
+            'count': len(orders),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        })
+
+
+@asynccontextmanager
+async def lifespan(app):
+    engine = create_async_db_engine(flask_app.config['SQLALCHEMY_DATABASE_URI'])
+    app.state.sessions = async_sessionmaker(engine, expire_on_commit=False)
+    logger.info(f"⚡ Async endpoints ready ({engine.url.drivername})")
+    try:
+        yield
+    finally:
+        await engine.dispose()
+        shutdown_worker(flask_app)
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check),
+        Route('/api/products', get_products),
+        Route('/api/products/{product_id:int}', get_product),
+        Route('/api/orders/user/{user_id:int}', get_user_orders),
+        # Everything else: the Flask blueprints, run on a thread pool
+        Mount('/', app=WSGIMiddleware(flask_app, workers=int(os.getenv('ASGI_WSGI_THREADS', 10))))
+    ],
+    # Same open CORS policy as flask_cors on the Flask app
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
@@ -0,0 +1,117 @@
+"""
+Signed Stateless Session Tokens
+Login issues a signed, expiring token carrying the user id and admin flag.
+Every request verifies it with SECRET_KEY alone - no database lookup.
+
+The built-in development SECRET_KEY is public, so anyone could sign an admin
+token with it: outside debug and testing, no token is issued or accepted
+until SECRET_KEY is set.
+"""
+import logging
+import os
+from collections import namedtuple
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'ecommerce-auth-token'
+DEFAULT_SECRET_KEY = 'dev-secret-key'
+
+# Who is making the request, as stated by a verified token
+Identity = namedtuple('Identity', ['user_id', 'is_admin'])
+
+
+class InsecureSecretKey(RuntimeError):
+    """SECRET_KEY is the development default outside debug/testing"""
+
+
+def signing_allowed(app=None):
+    """Whether tokens may be signed and trusted with this app's SECRET_KEY"""
+    app = app or current_app
+    return app.config['SECRET_KEY'] != DEFAULT_SECRET_KEY or app.debug or app.testing
+
+
+def _get_serializer():
+    if not signing_allowed():
+        raise InsecureSecretKey("SECRET_KEY is not set - auth tokens are disabled")
+    serializer = current_app.extensions.get('auth_serializer')
+    if serializer is None:
+        serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=TOKEN_SALT)
+        current_app.extensions['auth_serializer'] = serializer
+    return serializer
+
+
+def issue_token(user):
+    """Create a signed token for a logged-in user"""
+    return _get_serializer().dumps({'uid': user.id, 'adm': bool(user.is_admin)})
+
+
+def verify_token(token):
+    """Return the Identity in a valid token, or None if it is forged, malformed or expired"""
+    try:
+        data = _get_serializer().loads(token, max_age=current_app.config['AUTH_TOKEN_MAX_AGE'])
+        return Identity(user_id=int(data['uid']), is_admin=bool(data.get('adm')))
+    except SignatureExpired:
+        logger.info("🔑 Rejected expired auth token")
+        return None
+    except InsecureSecretKey:
+        logger.warning("🔑 Rejected auth token: SECRET_KEY is not set")
+        return None
+    except (BadSignature, KeyError, TypeError, ValueError):
+        logger.warning("🔑 Rejected invalid auth token")
+        return None
+
+
+def current_identity():
+    """Identity of the current request (None if not authenticated)"""
+    return g.get('identity')
+
+
+def load_identity():
+    """Verify the bearer token (if any) and attach the identity to the request"""
+    g.identity = None
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        g.identity = verify_token(header[7:].strip())
+
+
+def login_required(view):
+    """
+    Require a valid token. If the route has a `user_id` argument it must be
+    the caller's own id (admins may act on any user).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        identity = current_identity()
+        if identity is None:
+            return jsonify({'error': 'Authentication required'}), 401
+
+        user_id = kwargs.get('user_id')
+        if user_id is not None and user_id != identity.user_id and not identity.is_admin:
+            logger.warning(f"🚫 User {identity.user_id} tried to access user {user_id}'s data → HTTP 403")
+            return jsonify({'error': 'Forbidden'}), 403
+
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def admin_required(view):
+    """Require a valid token with the admin flag"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        identity = current_identity()
+        if identity is None:
+            return jsonify({'error': 'Authentication required'}), 401
+        if not identity.is_admin:
+            logger.warning(f"🚫 Non-admin user {identity.user_id} tried to access {request.path} → HTTP 403")
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_auth(app):
+    """Install token verification on every request"""
+    app.config.setdefault('AUTH_TOKEN_MAX_AGE', int(os.getenv('AUTH_TOKEN_MAX_AGE', 86400)))
+    app.before_request(load_identity)
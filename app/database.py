@@ -0,0 +1,279 @@
+"""
+Database Engine Configuration
+Connection pool sizing for MySQL, concurrency pragmas for SQLite, pool
+checkout metrics and read-replica routing - all driven by environment variables.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that reports how long callers wait for a connection
+    (including connect and pre-ping) and how many connections are in use.
+    """
+
+    metrics_label = 'primary'
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self._record(time.perf_counter() - started, timed_out=True)
+            raise
+        self._record(time.perf_counter() - started)
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._record()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+    def _record(self, wait=None, timed_out=False):
+        try:
+            from app.metrics import record_db_pool
+            record_db_pool(self.metrics_label, wait, timed_out, self.checkedout(), self.checkedin())
+        except Exception:
+            pass
+
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def get_engine_options(uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a database URI
+
+    MySQL: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+    SQLite files: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (in-memory keeps its static pool)
+    """
+    url = make_url(uri)
+    if _is_sqlite_memory(url):
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    }
+    if url.get_backend_name() == 'mysql':
+        # Recycle below MySQL's wait_timeout; pre-ping drops connections the server closed
+        options['pool_recycle'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+        options['pool_pre_ping'] = _env_bool('DB_POOL_PRE_PING', True)
+    return options
+
+
+def get_sqlite_pragmas(memory=False):
+    """
+    Pragmas applied to every new SQLite connection:
+    SQLITE_JOURNAL_MODE (WAL lets readers run alongside a writer), SQLITE_SYNCHRONOUS,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB
+    """
+    pragmas = [
+        ('synchronous', os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+        ('cache_size', -int(os.getenv('SQLITE_CACHE_SIZE_KB', 20000))),
+    ]
+    if not memory:
+        pragmas.insert(0, ('journal_mode', os.getenv('SQLITE_JOURNAL_MODE', 'WAL')))
+    return pragmas
+
+
+def configure_engine(engine, label='primary'):
+    """Attach pragmas (SQLite) and the metrics label to an engine"""
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics_label = label
+
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = get_sqlite_pragmas(memory=_is_sqlite_memory(engine.url))
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    logger.info(f"🗄️ SQLite pragmas for '{label}': " + ', '.join(f'{name}={value}' for name, value in pragmas))
+
+
+# --- Async engine (ASGI path) ---
+
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'mysql': 'mysql+aiomysql'}
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for asyncio engines"""
+
+
+def get_async_database_uri(uri):
+    """The same database URI with its asyncio driver (aiosqlite / aiomysql)"""
+    url = make_url(uri)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(uri, label='async'):
+    """AsyncEngine with the same pool sizing, pragmas and pool metrics as the sync engine"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    options = get_engine_options(uri)
+    if options.get('poolclass') is InstrumentedQueuePool:
+        options['poolclass'] = InstrumentedAsyncQueuePool
+    engine = create_async_engine(get_async_database_uri(uri), **options)
+    configure_engine(engine.sync_engine, label)
+    return engine
+
+
+# --- Read replicas ---
+
+REPLICA_BIND_PREFIX = 'replica_'
+STICKY_COOKIE = 'db_primary_until'
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to a replica while the request is marked read-only (see
+    `read_only`); everything else - writes, reads after a flush in the same
+    transaction, background work - goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not self.info.get('db_wrote') \
+                and not getattr(clause, 'is_dml', False) \
+                and has_request_context() and g.get('db_replica') is not None:
+            return g.db_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_write(session, flush_context):
+    session.info['db_wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_write(session):
+    if session.info.pop('db_wrote', False) and has_request_context():
+        g.db_committed_write = True
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_write(session):
+    session.info.pop('db_wrote', None)
+
+
+class StickyPrimary:
+    """Remembers, per user, until when reads must stay on the primary"""
+
+    def __init__(self, window_seconds, max_users=100000):
+        self.window = window_seconds
+        self.max_users = max_users
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._until[user_id] = now + self.window
+            if len(self._until) > self.max_users:
+                self._until = {uid: until for uid, until in self._until.items() if until > now}
+        return now + self.window
+
+    def is_sticky(self, user_id, now=None):
+        now = time.time() if now is None else now
+        return self._until.get(user_id, 0) > now
+
+
+def _choose_route():
+    """'replica', or 'primary' with the reason replicas cannot be used"""
+    if not current_app.extensions.get('db_replicas'):
+        return 'primary', 'no_replica'
+
+    now = time.time()
+    try:
+        if float(request.cookies.get(STICKY_COOKIE, 0)) > now:
+            return 'primary', 'sticky'
+    except ValueError:
+        pass
+
+    identity = g.get('identity')
+    sticky = current_app.extensions.get('db_sticky')
+    if identity is not None and sticky is not None and sticky.is_sticky(identity.user_id, now):
+        return 'primary', 'sticky'
+    return 'replica', 'read_only'
+
+
+def read_only(view):
+    """Let this view read from a replica (unless the caller wrote recently)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_route, reason = _choose_route()
+        if g.db_route == 'replica':
+            # One replica per request so all its reads see the same snapshot
+            g.db_replica = random.choice(current_app.extensions['db_replicas'])
+        try:
+            from app.metrics import record_db_route
+            record_db_route(g.db_route, reason)
+        except Exception:
+            pass
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _after_request(response):
+    """Keep the writer on the primary for a while (read-your-writes) and expose the route"""
+    if g.get('db_committed_write'):
+        sticky = current_app.extensions['db_sticky']
+        identity = g.get('identity')
+        until = time.time() + sticky.window
+        if identity is not None:
+            sticky.mark(identity.user_id)
+        response.set_cookie(STICKY_COOKIE, f'{until:.3f}', max_age=int(sticky.window) + 1,
+                            httponly=True, samesite='Lax')
+    if current_app.config.get('DB_ROUTE_HEADER'):
+        response.headers['X-DB-Route'] = g.get('db_route', 'primary')
+    return response
+
+
+def init_database(app, db):
+    """Configure every engine Flask-SQLAlchemy created for the app and set up replica routing"""
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            configure_engine(engine, bind_key or 'primary')
+        replicas = [
+            engine for bind_key, engine in sorted(db.engines.items(), key=lambda item: str(item[0]))
+            if bind_key and bind_key.startswith(REPLICA_BIND_PREFIX)
+        ]
+
+    app.extensions['db_replicas'] = replicas
+    if replicas:
+        app.extensions['db_sticky'] = StickyPrimary(float(os.getenv('DB_REPLICA_STICKY_SECONDS', 5)))
+        app.config.setdefault('DB_ROUTE_HEADER', _env_bool('DB_ROUTE_HEADER', False))
+        app.after_request(_after_request)
+        logger.info(f"📚 Read replicas enabled ({len(replicas)}): read-only routes use replicas")
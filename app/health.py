@@ -0,0 +1,219 @@
+"""
+Health Probes
+/health/live says the process is serving; /health/ready says whether it
+should get traffic. Readiness comes from a background checker that pings the
+database engines, the trace exporter, the log files and the job dispatcher
+every HEALTH_CHECK_INTERVAL seconds, so a probe only reads the cached result.
+
+Check states: ok, degraded (serving, but something needs attention) and down.
+Only a down primary database makes the instance not ready.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint('health', __name__, url_prefix='/health')
+
+
+def check_databases(app, slow_ms):
+    """SELECT 1 on every engine; a down replica only degrades (reads fall back to the primary)"""
+    from app import db
+    results = {}
+    with app.app_context():
+        engines = dict(db.engines)
+    for bind_key, engine in engines.items():
+        name = f'database:{bind_key}' if bind_key else 'database'
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            results[name] = {'status': 'down' if bind_key is None else 'degraded', 'critical': bind_key is None,
+                             'detail': str(e).splitlines()[0][:200]}
+            continue
+        latency = (time.perf_counter() - started) * 1000
+        result = {'status': 'ok', 'critical': bind_key is None, 'latency_ms': round(latency, 2)}
+        if latency > slow_ms:
+            result.update(status='degraded', detail=f'ping slower than {slow_ms:.0f}ms')
+
+        pool = engine.pool
+        if hasattr(pool, 'checkedout') and hasattr(pool, 'size'):
+            in_use, capacity = pool.checkedout(), pool.size() + max(pool._max_overflow, 0)
+            result['pool'] = {'checked_out': in_use, 'capacity': capacity}
+            if capacity and in_use >= capacity:
+                result.update(status='degraded', detail='connection pool exhausted')
+        results[name] = result
+    return results
+
+
+def check_tracing(app):
+    """Reachability of the OTLP collector when this process exports traces"""
+    if app.extensions.get('tracer') is None:
+        return {'status': 'ok', 'detail': 'tracing not active'}
+    from app.tracing import check_port_open
+    host, port = os.getenv('TRACING_HOST', 'localhost'), int(os.getenv('TRACING_PORT', 4317))
+    if check_port_open(host, port, float(os.getenv('TRACING_PROBE_TIMEOUT', 0.2))):
+        return {'status': 'ok'}
+    return {'status': 'degraded', 'detail': f'collector {host}:{port} unreachable - spans are dropped'}
+
+
+def check_logging(min_free_mb):
+    """Log files (shipped by promtail) must be writable with disk space left"""
+    problems = []
+    for handler in logging.getLogger().handlers:
+        path = getattr(handler, 'baseFilename', None)
+        if not path:
+            continue
+        directory = os.path.dirname(path) or '.'
+        if not os.access(path if os.path.exists(path) else directory, os.W_OK):
+            problems.append(f'{os.path.basename(path)} not writable')
+            continue
+        free_mb = shutil.disk_usage(directory).free / (1024 * 1024)
+        if free_mb < min_free_mb:
+            problems.append(f'{free_mb:.0f} MB free for {os.path.basename(path)}')
+    if problems:
+        return {'status': 'degraded', 'detail': '; '.join(problems)}
+    return {'status': 'ok'}
+
+
+def check_jobs(app):
+    """The job dispatcher must be running when this process has job workers"""
+    job_queue = app.extensions.get('job_queue')
+    if job_queue is None or job_queue.workers <= 0:
+        return {'status': 'ok', 'detail': 'no job workers in this process'}
+    if not job_queue.running:
+        return {'status': 'degraded', 'detail': 'job dispatcher not running'}
+    return {'status': 'ok'}
+
+
+class HealthChecker:
+    """Runs the checks on a background thread and keeps the latest result"""
+
+    def __init__(self, app, interval=5.0, db_slow_ms=250, min_free_mb=100, stale_after=None):
+        self.app = app
+        self.interval = interval
+        self.db_slow_ms = db_slow_ms
+        self.min_free_mb = min_free_mb
+        self.stale_after = stale_after or interval * 3
+        self.draining = False
+
+        self._result = None
+        self._checked_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.draining = False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._check_loop, name='health-checker', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop checking and report not ready, so traffic drains before exit"""
+        self.draining = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _check_loop(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"💥 Health check error: {str(e)}")
+            if self._stop.wait(self.interval):
+                break
+
+    def check(self):
+        checks = check_databases(self.app, self.db_slow_ms)
+        checks['tracing'] = check_tracing(self.app)
+        checks['logging'] = check_logging(self.min_free_mb)
+        checks['jobs'] = check_jobs(self.app)
+
+        if any(result['status'] == 'down' and result.get('critical') for result in checks.values()):
+            status = 'down'
+        elif any(result['status'] != 'ok' for result in checks.values()):
+            status = 'degraded'
+        else:
+            status = 'ok'
+
+        previous = self._result['status'] if self._result else None
+        if status != previous and (previous is not None or status != 'ok'):
+            failing = ', '.join(name for name, result in checks.items() if result['status'] != 'ok')
+            log = logger.info if status == 'ok' else logger.warning
+            log(f"🩺 Health {previous or 'starting'} → {status}" + (f" ({failing})" if failing else ''))
+
+        self._result = {'status': status, 'checked_at': datetime.utcnow().isoformat(), 'checks': checks}
+        self._checked_at = time.monotonic()
+        self._record(checks)
+        return self._result
+
+    def snapshot(self):
+        """Latest result plus its age - O(1), never touches dependencies"""
+        if self.draining:
+            return {'status': 'draining', 'ready': False}
+        if self._result is None:
+            return {'status': 'starting', 'ready': False}
+        age = time.monotonic() - self._checked_at
+        if age > self.stale_after:
+            return {**self._result, 'status': 'stale', 'ready': False, 'age_seconds': round(age, 1)}
+        return {**self._result, 'ready': self._result['status'] != 'down', 'age_seconds': round(age, 1)}
+
+    def _record(self, checks):
+        try:
+            from app.metrics import record_health
+            for name, result in checks.items():
+                record_health(name, result['status'])
+        except Exception:
+            pass
+
+
+@bp.route('/live', methods=['GET'])
+def live():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'alive', 'pid': os.getpid()}), 200
+
+
+@bp.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: cached dependency checks (503 when down, starting, stale or draining)"""
+    checker = current_app.extensions.get('health')
+    if checker is None:
+        return jsonify({'status': 'ok', 'ready': True, 'detail': 'health checks disabled'}), 200
+    result = checker.snapshot()
+    return jsonify(result), 200 if result['ready'] else 503
+
+
+def init_health(app, start=True):
+    """
+    Register /health/live and /health/ready. Environment:
+    HEALTH_CHECKS_ENABLED, HEALTH_CHECK_INTERVAL (seconds), HEALTH_DB_SLOW_MS
+    (ping latency reported as degraded), HEALTH_MIN_FREE_MB (disk for log
+    files), HEALTH_STALE_AFTER (seconds before a result stops counting;
+    default 3 intervals)
+    """
+    app.register_blueprint(bp)
+    if os.getenv('HEALTH_CHECKS_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    checker = HealthChecker(
+        app,
+        interval=float(os.getenv('HEALTH_CHECK_INTERVAL', 5.0)),
+        db_slow_ms=float(os.getenv('HEALTH_DB_SLOW_MS', 250)),
+        min_free_mb=float(os.getenv('HEALTH_MIN_FREE_MB', 100)),
+        stale_after=float(os.getenv('HEALTH_STALE_AFTER', 0)) or None
+    )
+    app.extensions['health'] = checker
+    if start:
+        checker.start()
+    return checker
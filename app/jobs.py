@@ -0,0 +1,427 @@
+"""
+Background Job Queue
+Durable outbox table + in-process worker pool with retry/backoff
+
+Jobs are written to the `outbox_jobs` table inside the caller's transaction,
+so they are only visible once the business change commits and they survive
+restarts. A dispatcher thread claims due jobs and hands them to worker threads.
+Delivery is at-least-once: handlers should be idempotent. Handlers whose side
+effects live outside the database (metrics) register with once=True instead:
+the job is marked done before they run, so they run at most once.
+
+Finished jobs are kept for JOB_RETENTION_DAYS, then deleted by the dispatcher
+(or `python purge_jobs.py`).
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.models.job import OutboxJob
+
+logger = logging.getLogger(__name__)
+
+# Registered job handlers: job type -> callable(payload)
+_handlers = {}
+
+# Event subscriptions: event name -> [job types]
+_subscriptions = {}
+
+# Job types whose handlers must not run twice (marked done before they run)
+_at_most_once = set()
+
+# Queue running in this process (set by init_jobs)
+_job_queue = None
+
+
+def job(job_type, events=(), once=False):
+    """
+    Register a job handler, optionally subscribed to one or more events.
+    once=True: the handler runs at most once and is never retried - for side
+    effects a retry would repeat (its database changes are not committed).
+
+    Usage:
+        @job('order.record_metrics', events=['order.created'], once=True)
+        def record_order_metrics(payload): ...
+    """
+    def decorator(func):
+        _handlers[job_type] = func
+        if once:
+            _at_most_once.add(job_type)
+        else:
+            _at_most_once.discard(job_type)
+        for event_name in events:
+            subscribers = _subscriptions.setdefault(event_name, [])
+            if job_type not in subscribers:
+                subscribers.append(job_type)
+        return func
+    return decorator
+
+
+def enqueue(job_type, payload=None, max_attempts=None):
+    """
+    Add a job to the current database session.
+    The job is committed together with the caller's changes.
+    """
+    if max_attempts is None:
+        max_attempts = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+
+    outbox_job = OutboxJob(
+        job_type=job_type,
+        payload=json.dumps(payload or {}, default=str),
+        max_attempts=max_attempts,
+        status='pending',
+        run_after=datetime.utcnow()
+    )
+    db.session.add(outbox_job)
+    db.session.info['outbox_enqueued'] = True
+    return outbox_job
+
+
+def publish(event_name, payload=None):
+    """Enqueue one job per handler subscribed to the event"""
+    return [enqueue(job_type, payload) for job_type in _subscriptions.get(event_name, [])]
+
+
+def purge_finished_jobs(retention_days, batch_size=1000, now=None):
+    """
+    Delete done and failed jobs that finished more than `retention_days` ago,
+    `batch_size` rows per transaction so the table is never locked for long.
+    Returns the number deleted.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    deleted = 0
+    try:
+        while True:
+            ids = [
+                row.id for row in db.session.query(OutboxJob.id)
+                .filter(OutboxJob.status.in_(['done', 'failed']), OutboxJob.finished_at < cutoff)
+                .limit(batch_size)
+            ]
+            if not ids:
+                db.session.rollback()
+                break
+            OutboxJob.query.filter(OutboxJob.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            deleted += len(ids)
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if deleted:
+        logger.info(f"🧹 Purged {deleted} finished jobs older than {retention_days} days")
+    return deleted
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_after_commit(session):
+    """Wake the dispatcher as soon as new jobs are committed"""
+    if session.info.pop('outbox_enqueued', False) and _job_queue is not None:
+        _job_queue.wake()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('outbox_enqueued', None)
+
+
+class JobQueue:
+    """
+    In-process worker pool fed from the outbox table
+    """
+
+    def __init__(self, app, workers=2, poll_interval=2.0, batch_size=50,
+                 lease_seconds=60, backoff_base=2.0, backoff_max=300.0,
+                 retention_days=7, purge_interval=3600.0):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retention_days = retention_days  # 0 keeps finished jobs forever
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+
+        self._queue = queue.Queue()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._token = None
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        """Start dispatcher and worker threads"""
+        if self.running:
+            return
+
+        # New token per start so a restarted process never trusts old claims
+        self._token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._queue = queue.Queue()
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._dispatch_loop, name='job-dispatcher', daemon=True)]
+        for i in range(self.workers):
+            self._threads.append(
+                threading.Thread(target=self._worker_loop, name=f'job-worker-{i}', daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+
+        logger.info(f"⚙️ Background job queue started ({self.workers} workers)")
+
+    def stop(self, timeout=5):
+        """Stop all threads (claimed jobs are picked up again after their lease expires)"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        """Ask the dispatcher to look for new jobs now"""
+        self._wake.set()
+
+    def backoff(self, attempts):
+        """Delay before the next attempt (exponential with jitter)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    for job_id in self._claim_due_jobs():
+                        self._queue.put(job_id)
+                    self._update_depth()
+                    self._purge_if_due()
+            except Exception as e:
+                logger.error(f"💥 Job dispatcher error: {str(e)}")
+
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _claim_due_jobs(self):
+        """Claim due jobs (pending, or processing with an expired lease) for this process"""
+        capacity = self.batch_size - self._queue.qsize()
+        if capacity <= 0:
+            return []
+
+        now = datetime.utcnow()
+        try:
+            due_ids = [
+                row.id for row in db.session.query(OutboxJob.id)
+                .filter(OutboxJob.status.in_(['pending', 'processing']), OutboxJob.run_after <= now)
+                .order_by(OutboxJob.run_after)
+                .limit(capacity)
+            ]
+            if not due_ids:
+                db.session.rollback()
+                return []
+
+            # Conditional update so concurrent dispatchers never claim the same job
+            OutboxJob.query.filter(
+                OutboxJob.id.in_(due_ids),
+                OutboxJob.status.in_(['pending', 'processing']),
+                OutboxJob.run_after <= now
+            ).update({
+                'status': 'processing',
+                'locked_by': self._token,
+                'run_after': now + timedelta(seconds=self.lease_seconds)
+            }, synchronize_session=False)
+            db.session.commit()
+
+            claimed = [
+                row.id for row in db.session.query(OutboxJob.id)
+                .filter(OutboxJob.id.in_(due_ids), OutboxJob.locked_by == self._token,
+                        OutboxJob.status == 'processing')
+            ]
+            db.session.rollback()
+            return claimed
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _purge_if_due(self):
+        if self.retention_days <= 0 or time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.purge_interval
+        try:
+            purge_finished_jobs(self.retention_days)
+        except Exception as e:
+            logger.error(f"💥 Finished job purge failed: {str(e)}")
+
+    def _update_depth(self):
+        try:
+            pending = OutboxJob.query.filter_by(status='pending').count()
+            db.session.rollback()
+            from app.metrics import update_job_queue_depth
+            update_job_queue_depth(pending, self._queue.qsize())
+        except Exception:
+            db.session.rollback()
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                with self.app.app_context():
+                    self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"💥 Job worker error (job {job_id}): {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job_id):
+        outbox_job = db.session.get(OutboxJob, job_id)
+        if not outbox_job or outbox_job.status != 'processing' or outbox_job.locked_by != self._token:
+            db.session.rollback()
+            return
+
+        job_type = outbox_job.job_type
+        handler = _handlers.get(job_type)
+        started = time.perf_counter()
+
+        if handler is not None and job_type in _at_most_once:
+            return self._run_once(outbox_job, handler, started)
+
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job type '{job_type}'")
+
+            handler(outbox_job.get_payload())
+
+            # Handler changes left in the session commit together with the job
+            self._mark_done(outbox_job)
+            db.session.commit()
+
+            duration = time.perf_counter() - started
+            self._record(job_type, 'done', duration, self._latency(outbox_job))
+            logger.debug(f"✅ Job {job_id} ({job_type}) done in {duration * 1000:.1f}ms")
+
+        except Exception as e:
+            db.session.rollback()
+            duration = time.perf_counter() - started
+            status = self._record_failure(job_id, job_type, e, retryable=handler is not None)
+            self._record(job_type, status, duration)
+
+    def _run_once(self, outbox_job, handler, started):
+        """Commit the job as done, then run the handler: a failure is recorded, never retried"""
+        job_id, job_type, payload = outbox_job.id, outbox_job.job_type, outbox_job.get_payload()
+        self._mark_done(outbox_job)
+        db.session.commit()
+        latency = self._latency(outbox_job)
+
+        try:
+            handler(payload)
+        except Exception as e:
+            db.session.rollback()
+            outbox_job = db.session.get(OutboxJob, job_id)
+            if outbox_job:
+                outbox_job.status = 'failed'
+                outbox_job.last_error = str(e)[:2000]
+                db.session.commit()
+            self._record(job_type, 'failed', time.perf_counter() - started)
+            logger.error(f"💥 Job {job_id} ({job_type}) failed (runs at most once, not retried): {e}")
+            return
+        db.session.rollback()
+
+        duration = time.perf_counter() - started
+        self._record(job_type, 'done', duration, latency)
+        logger.debug(f"✅ Job {job_id} ({job_type}) done in {duration * 1000:.1f}ms")
+
+    @staticmethod
+    def _mark_done(outbox_job):
+        outbox_job.attempts += 1
+        outbox_job.status = 'done'
+        outbox_job.finished_at = datetime.utcnow()
+        outbox_job.locked_by = None
+        outbox_job.last_error = None
+
+    @staticmethod
+    def _latency(outbox_job):
+        """Seconds from enqueue to completion"""
+        if not outbox_job.created_at:
+            return None
+        return (outbox_job.finished_at - outbox_job.created_at).total_seconds()
+
+    def _record_failure(self, job_id, job_type, error, retryable=True):
+        """Schedule a retry with backoff, or mark the job failed once attempts run out"""
+        outbox_job = db.session.get(OutboxJob, job_id)
+        if not outbox_job:
+            return 'failed'
+
+        outbox_job.attempts += 1
+        outbox_job.last_error = str(error)[:2000]
+        outbox_job.locked_by = None
+
+        if not retryable or outbox_job.attempts >= outbox_job.max_attempts:
+            outbox_job.status = 'failed'
+            outbox_job.finished_at = datetime.utcnow()
+            status = 'failed'
+            logger.error(f"💥 Job {job_id} ({job_type}) failed permanently after {outbox_job.attempts} attempts: {error}")
+        else:
+            delay = self.backoff(outbox_job.attempts)
+            outbox_job.status = 'pending'
+            outbox_job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            status = 'retry'
+            logger.warning(f"⚠️ Job {job_id} ({job_type}) attempt {outbox_job.attempts} failed: {error} - retrying in {delay:.1f}s")
+
+        db.session.commit()
+        return status
+
+    def _record(self, job_type, status, duration, latency=None):
+        try:
+            from app.metrics import record_job
+            record_job(job_type, status, duration, latency)
+        except Exception:
+            pass
+
+
+def get_job_queue():
+    """Return the job queue running in this process (or None)"""
+    return _job_queue
+
+
+def init_jobs(app, start=True):
+    """
+    Create the background job queue and (unless start=False) start its workers.
+    Set JOB_WORKERS=0 to only write jobs to the outbox (another process drains it).
+    JOB_RETENTION_DAYS (0 = keep) and JOB_PURGE_INTERVAL (seconds) control
+    how often the dispatcher deletes old finished jobs.
+    """
+    global _job_queue
+
+    _job_queue = JobQueue(
+        app,
+        workers=int(os.getenv('JOB_WORKERS', 2)),
+        poll_interval=float(os.getenv('JOB_POLL_INTERVAL', 2.0)),
+        batch_size=int(os.getenv('JOB_BATCH_SIZE', 50)),
+        lease_seconds=int(os.getenv('JOB_LEASE_SECONDS', 60)),
+        backoff_base=float(os.getenv('JOB_BACKOFF_BASE', 2.0)),
+        backoff_max=float(os.getenv('JOB_BACKOFF_MAX', 300.0)),
+        retention_days=float(os.getenv('JOB_RETENTION_DAYS', 7)),
+        purge_interval=float(os.getenv('JOB_PURGE_INTERVAL', 3600))
+    )
+    app.extensions['job_queue'] = _job_queue
+
+    if _job_queue.workers > 0:
+        if start:
+            _job_queue.start()
+    else:
+        logger.info("ℹ️  JOB_WORKERS=0 - jobs are written to the outbox but not processed here")
+
+    return _job_queue
@@ -3,7 +3,7 @@ Prometheus Metrics for E-commerce Application
 Tracks: Requests, Errors, Response Times, Business Metrics
 """
 import logging
-from prometheus_flask_exporter import PrometheusMetrics
+import os
 from prometheus_client import Counter, Histogram, Gauge
 
 logger = logging.getLogger(__name__)
@@ -38,13 +38,210 @@ order_value = Histogram(
 
 active_users = Gauge(
     'ecommerce_active_users',
-    'Number of currently active users'
+    'Number of currently active users (distinct authenticated users in the last 5 minutes)',
+    multiprocess_mode='livemax'
+)
+
+active_users_window = Gauge(
+    'ecommerce_active_users_window',
+    'Distinct authenticated users per sliding window',
+    ['window'],  # 5m, 1h, 24h
+    multiprocess_mode='livemax'
+)
+
+# Database connection pool metrics
+db_pool_checkout_duration = Histogram(
+    'ecommerce_db_pool_checkout_seconds',
+    'Time to get a connection from the pool (waiting, connecting and pre-ping)',
+    ['engine'],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0]
+)
+
+db_pool_timeouts = Counter(
+    'ecommerce_db_pool_timeouts_total',
+    'Pool checkouts that gave up after DB_POOL_TIMEOUT',
+    ['engine']
+)
+
+db_pool_connections = Gauge(
+    'ecommerce_db_pool_connections',
+    'Pooled connections by state',
+    ['engine', 'state'],  # checked_out or idle
+    multiprocess_mode='livesum'
+)
+
+db_route = Counter(
+    'ecommerce_db_route_total',
+    'Database routing decisions for read-only requests',
+    ['target', 'reason']  # replica/primary; read_only, sticky, no_replica
+)
+
+slow_query_duration = Histogram(
+    'ecommerce_slow_query_seconds',
+    'Statements slower than SLOW_QUERY_MS',
+    ['engine', 'operation'],  # operation: SELECT, INSERT, UPDATE, ...
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+# Login throttling metrics
+login_throttled = Counter(
+    'ecommerce_login_throttled_total',
+    'Login attempts rejected by throttling before any database work',
+    ['scope']  # user or ip
+)
+
+login_throttle_keys = Gauge(
+    'ecommerce_login_throttle_tracked_keys',
+    'Usernames and client IPs currently tracked by the in-memory login throttle',
+    multiprocess_mode='livesum'
+)
+
+# User cache metrics
+user_cache_requests = Counter(
+    'ecommerce_user_cache_requests_total',
+    'User identity cache lookups',
+    ['result']  # hit or miss
+)
+
+user_cache_hit_ratio = Gauge(
+    'ecommerce_user_cache_hit_ratio',
+    'User identity cache hit ratio since process start',
+    multiprocess_mode='liveall'
+)
+
+user_cache_size = Gauge(
+    'ecommerce_user_cache_entries',
+    'Users currently held in the identity cache',
+    multiprocess_mode='livesum'
+)
+
+# Admission control metrics
+admission_in_flight = Gauge(
+    'ecommerce_admission_in_flight',
+    'Requests currently admitted per route class',
+    ['route_class'],  # browse, checkout or admin
+    multiprocess_mode='livesum'
+)
+
+admission_limit = Gauge(
+    'ecommerce_admission_limit',
+    'Current adaptive concurrency limit per route class',
+    ['route_class'],
+    multiprocess_mode='livesum'
+)
+
+admission_shed = Counter(
+    'ecommerce_admission_shed_total',
+    'Requests rejected with 503 by admission control',
+    ['route_class']
+)
+
+# Response cache metrics
+response_cache_requests = Counter(
+    'ecommerce_response_cache_requests_total',
+    'Response cache lookups per endpoint',
+    ['route', 'result']  # hit or miss
+)
+
+response_cache_evictions = Counter(
+    'ecommerce_response_cache_evictions_total',
+    'Cached responses dropped',
+    ['reason']  # size, expired or invalidated
+)
+
+response_cache_bytes = Gauge(
+    'ecommerce_response_cache_bytes',
+    'Approximate memory held by cached responses',
+    multiprocess_mode='livesum'
+)
+
+response_cache_entries = Gauge(
+    'ecommerce_response_cache_entries',
+    'Responses currently cached',
+    multiprocess_mode='livesum'
+)
+
+# Password hashing metrics
+password_hash_duration = Histogram(
+    'ecommerce_password_hash_seconds',
+    'Time spent hashing or verifying a password, including pool wait',
+    ['operation'],  # hash or verify
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+)
+
+password_hash_rejected = Counter(
+    'ecommerce_password_hash_rejected_total',
+    'Password hash operations rejected because the hashing pool was saturated',
+    ['operation']
+)
+
+# Background job metrics
+job_queue_depth = Gauge(
+    'ecommerce_job_queue_depth',
+    'Number of background jobs waiting to run',
+    ['state'],  # pending (outbox table) or queued (claimed, waiting for a worker)
+    multiprocess_mode='livemax'
+)
+
+jobs_processed = Counter(
+    'ecommerce_jobs_processed_total',
+    'Total number of background job executions',
+    ['job_type', 'status']  # done, retry or failed
+)
+
+job_duration = Histogram(
+    'ecommerce_job_duration_seconds',
+    'Time spent running a background job handler',
+    ['job_type']
+)
+
+job_latency = Histogram(
+    'ecommerce_job_latency_seconds',
+    'Time from job enqueue to successful completion',
+    ['job_type'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+)
+
+# Health check metrics (per check: 1 ok, 0.5 degraded, 0 down; worst worker wins)
+health_check_status = Gauge(
+    'ecommerce_health_check_status',
+    'Latest background health check result',
+    ['check'],
+    multiprocess_mode='livemin'
+)
+
+# ASGI (async) path metrics - requests it serves never reach the Flask exporter
+asgi_request_duration = Histogram(
+    'ecommerce_asgi_request_duration_seconds',
+    'Latency of requests served by the async ASGI endpoints',
+    ['method', 'path', 'status']
+)
+
+# Order export metrics
+export_rows = Counter(
+    'ecommerce_export_rows_total',
+    'Rows streamed by order exports',
+    ['table', 'format']
+)
+
+export_duration = Histogram(
+    'ecommerce_export_duration_seconds',
+    'Time to stream one table of an order export',
+    ['table', 'format'],
+    buckets=[0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600]
 )
 
 def init_metrics(app):
     """
     Initialize Prometheus metrics for the application
     """
+    # Under gunicorn every worker writes to PROMETHEUS_MULTIPROC_DIR and
+    # /metrics aggregates all workers (gauges per their multiprocess_mode)
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_flask_exporter.multiprocess import GunicornInternalPrometheusMetrics as PrometheusMetrics
+    else:
+        from prometheus_flask_exporter import PrometheusMetrics
+    
     # This automatically creates /metrics endpoint
     # and tracks basic HTTP metrics
     metrics = PrometheusMetrics(app)
@@ -74,6 +271,91 @@ def record_order(total_amount):
     orders_created.inc()
     order_value.observe(total_amount)
 
-def update_active_users(count):
-    """Update active users count"""
-    active_users.set(count)
\ No newline at end of file
+def update_active_users(count, windows=None):
+    """Update active users count (and per-window counts if given)"""
+    active_users.set(count)
+    for window, value in (windows or {}).items():
+        active_users_window.labels(window=window).set(value)
+
+def record_db_pool(engine, wait=None, timed_out=False, checked_out=None, idle=None):
+    """Record a pool checkout (wait given) or return, with current pool usage"""
+    if timed_out:
+        db_pool_timeouts.labels(engine=engine).inc()
+    elif wait is not None:
+        db_pool_checkout_duration.labels(engine=engine).observe(wait)
+    if checked_out is not None:
+        db_pool_connections.labels(engine=engine, state='checked_out').set(checked_out)
+    if idle is not None:
+        db_pool_connections.labels(engine=engine, state='idle').set(idle)
+
+def record_db_route(target, reason):
+    """Record where a read-only request was routed"""
+    db_route.labels(target=target, reason=reason).inc()
+
+def record_slow_query(engine, operation, duration):
+    """Record a statement over the slow query threshold"""
+    slow_query_duration.labels(engine=engine, operation=operation).observe(duration)
+
+def record_login_throttled(scope, tracked_keys=None):
+    """Record a throttled login attempt"""
+    login_throttled.labels(scope=scope).inc()
+    if tracked_keys is not None:
+        login_throttle_keys.set(tracked_keys)
+
+def record_user_cache(hit, size, hit_ratio):
+    """Record a user cache lookup"""
+    user_cache_requests.labels(result='hit' if hit else 'miss').inc()
+    user_cache_size.set(size)
+    user_cache_hit_ratio.set(hit_ratio)
+
+def record_admission(route_class, in_flight, limit, shed=False):
+    """Record admission state for a route class (and a shed request)"""
+    admission_in_flight.labels(route_class=route_class).set(in_flight)
+    admission_limit.labels(route_class=route_class).set(limit)
+    if shed:
+        admission_shed.labels(route_class=route_class).inc()
+
+def record_response_cache(route, hit, size_bytes, entries):
+    """Record a response cache lookup"""
+    response_cache_requests.labels(route=route, result='hit' if hit else 'miss').inc()
+    response_cache_bytes.set(size_bytes)
+    response_cache_entries.set(entries)
+
+def record_response_cache_eviction(reason, count, size_bytes, entries):
+    """Record cached responses dropped by size, expiry or invalidation"""
+    response_cache_evictions.labels(reason=reason).inc(count)
+    response_cache_bytes.set(size_bytes)
+    response_cache_entries.set(entries)
+
+def record_password_hash(operation, duration):
+    """Record a password hash/verify call"""
+    password_hash_duration.labels(operation=operation).observe(duration)
+
+def record_password_hash_rejected(operation):
+    """Record a password operation rejected by the hashing pool"""
+    password_hash_rejected.labels(operation=operation).inc()
+
+def record_job(job_type, status, duration, latency=None):
+    """Record a background job execution"""
+    jobs_processed.labels(job_type=job_type, status=status).inc()
+    job_duration.labels(job_type=job_type).observe(duration)
+    if latency is not None:
+        job_latency.labels(job_type=job_type).observe(latency)
+
+def update_job_queue_depth(pending, queued):
+    """Update background job queue depth"""
+    job_queue_depth.labels(state='pending').set(pending)
+    job_queue_depth.labels(state='queued').set(queued)
+
+def record_health(check, status):
+    """Record a background health check result"""
+    health_check_status.labels(check=check).set({'ok': 1.0, 'degraded': 0.5}.get(status, 0.0))
+
+def record_asgi_request(method, path, status, duration):
+    """Record a request served by an async ASGI endpoint (path is the route template)"""
+    asgi_request_duration.labels(method=method, path=path, status=str(status)).observe(duration)
+
+def record_export(table, fmt, rows, duration):
+    """Record one streamed export table"""
+    export_rows.labels(table=table, format=fmt).inc(rows)
+    export_duration.labels(table=table, format=fmt).observe(duration)
@@ -0,0 +1,187 @@
+"""
+Schema Migrations
+Versioned, forward-only migrations recorded in the `schema_version` table.
+
+Each module `mNNNN_<name>.py` in this package is one migration with an
+`upgrade(connection)` function; NNNN is its version. Migrations must be
+idempotent (check before creating) so a half-applied MySQL migration - DDL
+there is not transactional - can simply be run again.
+"""
+import importlib
+import logging
+import os
+import pkgutil
+import re
+from contextlib import contextmanager
+from datetime import datetime
+import sqlalchemy as sa
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+_metadata = sa.MetaData()
+
+schema_version = sa.Table(
+    'schema_version', _metadata,
+    sa.Column('version', sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column('name', sa.String(200), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False)
+)
+
+_MODULE_PATTERN = re.compile(r'^m(\d{4})_(\w+)$')
+
+MIGRATION_LOCK = 'ecommerce_schema_migrations'
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    @property
+    def description(self):
+        return (self.module.__doc__ or self.name).strip().splitlines()[0]
+
+    def upgrade(self, connection):
+        self.module.upgrade(connection)
+
+
+def load_migrations():
+    """All migrations in this package, ordered by version"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_PATTERN.match(module_info.name)
+        if match:
+            module = importlib.import_module(f'{__name__}.{module_info.name}')
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def latest_version():
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(engine):
+    """Highest applied version (0 for an unmigrated database)"""
+    with engine.connect() as connection:
+        if not sa.inspect(connection).has_table('schema_version'):
+            return 0
+        return connection.execute(sa.select(sa.func.max(schema_version.c.version))).scalar() or 0
+
+
+def pending_migrations(engine):
+    current = current_version(engine)
+    return [migration for migration in load_migrations() if migration.version > current]
+
+
+@contextmanager
+def migration_lock(engine, timeout=None):
+    """
+    Serialize migrating processes. MySQL: a named lock (GET_LOCK) held on its
+    own connection. SQLite has one writer at a time, and a step that loses a
+    race there is caught in upgrade().
+    """
+    if engine.dialect.name != 'mysql':
+        yield
+        return
+
+    timeout = int(os.getenv('DB_MIGRATION_LOCK_TIMEOUT', 300)) if timeout is None else timeout
+    with engine.connect() as connection:
+        acquired = connection.execute(sa.text('SELECT GET_LOCK(:name, :timeout)'),
+                                      {'name': MIGRATION_LOCK, 'timeout': timeout}).scalar()
+        if acquired != 1:
+            raise RuntimeError(f"Timed out after {timeout}s waiting for another process to finish migrating")
+        try:
+            yield
+        finally:
+            connection.execute(sa.text('SELECT RELEASE_LOCK(:name)'), {'name': MIGRATION_LOCK})
+
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to `target` (default: latest). Returns the applied versions."""
+    applied = []
+    with migration_lock(engine):
+        try:
+            _metadata.create_all(engine)
+        except DBAPIError:
+            # Another process created schema_version between the check and the CREATE
+            if not sa.inspect(engine).has_table('schema_version'):
+                raise
+
+        # Read after taking the lock: a process that waited finds the work done
+        for migration in pending_migrations(engine):
+            if target is not None and migration.version > target:
+                break
+
+            logger.info(f"🧱 Applying migration {migration.version:04d} {migration.name}: {migration.description}")
+            try:
+                with engine.begin() as connection:
+                    migration.upgrade(connection)
+                    connection.execute(schema_version.insert().values(
+                        version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+                    ))
+            except DBAPIError:
+                # Lost a race (duplicate version row, table or index already created) -
+                # fine once the other process has recorded this version
+                if current_version(engine) < migration.version:
+                    raise
+                logger.info(f"ℹ️  Migration {migration.version:04d} already applied by another process")
+                continue
+            applied.append(migration.version)
+
+    return applied
+
+
+def ensure_schema(app, db):
+    """
+    Called from create_app: one version query when the schema is current,
+    otherwise apply pending migrations (unless DB_AUTO_MIGRATE=false).
+    """
+    with app.app_context():
+        engine = db.engine
+        current = current_version(engine)
+        latest = latest_version()
+
+        if current >= latest:
+            logger.info(f"✅ Database schema is current (version {current})")
+            return current
+
+        if os.getenv('DB_AUTO_MIGRATE', 'true').lower() not in ('1', 'true', 'yes'):
+            logger.warning(
+                f"⚠️ Database schema is at version {current}, code expects {latest} - run `python migrate.py upgrade`"
+            )
+            return current
+
+        applied = upgrade(engine)
+        logger.info(f"✅ Database migrated to version {latest} (applied {len(applied)} migration(s))")
+        return latest
+
+
+# --- Helpers for migrations ---
+
+def index_exists(connection, table, name):
+    return any(index['name'] == name for index in sa.inspect(connection).get_indexes(table))
+
+
+def create_index_if_missing(connection, name, table, columns):
+    """
+    Create an index unless it exists. On MySQL the build is online
+    (ALGORITHM=INPLACE, LOCK=NONE) so reads and writes continue meanwhile.
+    """
+    if index_exists(connection, table, name):
+        logger.info(f"   index {name} already exists")
+        return False
+
+    if connection.dialect.name == 'mysql':
+        column_list = ', '.join(f'`{column}`' for column in columns)
+        connection.exec_driver_sql(
+            f'CREATE INDEX `{name}` ON `{table}` ({column_list}) ALGORITHM=INPLACE LOCK=NONE'
+        )
+    else:
+        table_obj = sa.Table(table, sa.MetaData(), autoload_with=connection)
+        sa.Index(name, *(table_obj.c[column] for column in columns)).create(connection)
+
+    logger.info(f"   created index {name} on {table}({', '.join(columns)})")
+    return True
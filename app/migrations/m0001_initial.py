@@ -0,0 +1,102 @@
+"""
+Initial schema (tables that do not exist yet)
+
+Databases created by the old `db.create_all()` startup already have the
+tables; this only adds what is missing, so they can join the versioned path.
+
+The tables are frozen here as they were at version 1, never read from the
+live models: later migrations add their own columns and indexes, and must
+find the schema exactly as this version left it on a fresh database.
+"""
+import sqlalchemy as sa
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'users', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('username', sa.String(80), unique=True, nullable=False, index=True),
+    sa.Column('email', sa.String(120), unique=True, nullable=False, index=True),
+    sa.Column('password_hash', sa.String(255), nullable=False),
+    sa.Column('full_name', sa.String(100)),
+    sa.Column('is_admin', sa.Boolean),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime)
+)
+
+sa.Table(
+    'products', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(200), nullable=False, index=True),
+    sa.Column('description', sa.Text),
+    sa.Column('price', sa.Float, nullable=False),
+    sa.Column('stock_quantity', sa.Integer),
+    sa.Column('category', sa.String(100), index=True),
+    sa.Column('image_url', sa.String(500)),
+    sa.Column('is_active', sa.Boolean),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime)
+)
+
+sa.Table(
+    'carts', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False, unique=True),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime)
+)
+
+sa.Table(
+    'cart_items', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('cart_id', sa.Integer, sa.ForeignKey('carts.id'), nullable=False),
+    sa.Column('product_id', sa.Integer, sa.ForeignKey('products.id'), nullable=False),
+    sa.Column('quantity', sa.Integer, nullable=False),
+    sa.Column('added_at', sa.DateTime)
+)
+
+sa.Table(
+    'orders', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('order_number', sa.String(50), unique=True, nullable=False, index=True),
+    sa.Column('status', sa.String(50)),
+    sa.Column('total_amount', sa.Float, nullable=False),
+    sa.Column('shipping_address', sa.Text),
+    sa.Column('payment_method', sa.String(50)),
+    sa.Column('payment_status', sa.String(50)),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime)
+)
+
+sa.Table(
+    'order_items', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('order_id', sa.Integer, sa.ForeignKey('orders.id'), nullable=False),
+    sa.Column('product_id', sa.Integer, sa.ForeignKey('products.id'), nullable=False),
+    sa.Column('product_name', sa.String(200), nullable=False),
+    sa.Column('quantity', sa.Integer, nullable=False),
+    sa.Column('price_at_purchase', sa.Float, nullable=False),
+    sa.Column('subtotal', sa.Float, nullable=False)
+)
+
+sa.Table(
+    'outbox_jobs', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('job_type', sa.String(100), nullable=False),
+    sa.Column('payload', sa.Text, nullable=False),
+    sa.Column('status', sa.String(20), nullable=False),
+    sa.Column('attempts', sa.Integer, nullable=False),
+    sa.Column('max_attempts', sa.Integer, nullable=False),
+    sa.Column('run_after', sa.DateTime, nullable=False),
+    sa.Column('locked_by', sa.String(64)),
+    sa.Column('last_error', sa.Text),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime),
+    sa.Column('finished_at', sa.DateTime),
+    sa.Index('ix_outbox_jobs_status_run_after', 'status', 'run_after')
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection, checkfirst=True)
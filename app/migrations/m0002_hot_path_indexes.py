@@ -0,0 +1,21 @@
+"""
+Indexes for the hot query paths
+
+- cart_items(cart_id, product_id): cart contents and add/remove lookups
+- order_items(order_id): loading an order's items
+- orders(user_id, created_at, id): order history pages
+- products(is_active): product listing
+"""
+from app.migrations import create_index_if_missing
+
+INDEXES = [
+    ('ix_cart_items_cart_product', 'cart_items', ['cart_id', 'product_id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_orders_user_created_id', 'orders', ['user_id', 'created_at', 'id']),
+    ('ix_products_is_active', 'products', ['is_active']),
+]
+
+
+def upgrade(connection):
+    for name, table, columns in INDEXES:
+        create_index_if_missing(connection, name, table, columns)
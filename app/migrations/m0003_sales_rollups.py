@@ -0,0 +1,40 @@
+"""
+Sales rollup tables for the analytics endpoint
+
+- sales_rollups: revenue/units/orders per hour, day and month, in total and by category and product
+- rollup_watermarks: last order folded in. It starts at the newest existing
+  order, so only new orders are rolled up; `python backfill_rollups.py` folds
+  in the history.
+"""
+from datetime import datetime
+import sqlalchemy as sa
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'sales_rollups', metadata,
+    sa.Column('granularity', sa.String(8), primary_key=True),
+    sa.Column('dimension', sa.String(16), primary_key=True),
+    sa.Column('bucket_start', sa.DateTime, primary_key=True),
+    sa.Column('dim_key', sa.String(200), primary_key=True),
+    sa.Column('revenue', sa.Float, nullable=False),
+    sa.Column('units', sa.Integer, nullable=False),
+    sa.Column('orders', sa.Integer, nullable=False)
+)
+
+watermarks = sa.Table(
+    'rollup_watermarks', metadata,
+    sa.Column('name', sa.String(50), primary_key=True),
+    sa.Column('last_order_id', sa.Integer, nullable=False),
+    sa.Column('updated_at', sa.DateTime)
+)
+
+orders = sa.table('orders', sa.column('id'))
+
+
+def upgrade(connection):
+    metadata.create_all(connection, checkfirst=True)
+
+    if connection.execute(sa.select(watermarks.c.name).where(watermarks.c.name == 'sales')).first() is None:
+        newest = connection.execute(sa.select(sa.func.max(orders.c.id))).scalar() or 0
+        connection.execute(watermarks.insert().values(name='sales', last_order_id=newest, updated_at=datetime.utcnow()))
@@ -0,0 +1,10 @@
+"""
+Index for incremental order exports
+
+- orders(updated_at, id): orders changed since an export watermark, in watermark order
+"""
+from app.migrations import create_index_if_missing
+
+
+def upgrade(connection):
+    create_index_if_missing(connection, 'ix_orders_updated_id', 'orders', ['updated_at', 'id'])
@@ -0,0 +1,10 @@
+"""
+Index for the finished job retention sweep
+
+- outbox_jobs(status, finished_at): done/failed jobs that finished before the cutoff
+"""
+from app.migrations import create_index_if_missing
+
+
+def upgrade(connection):
+    create_index_if_missing(connection, 'ix_outbox_jobs_status_finished_at', 'outbox_jobs', ['status', 'finished_at'])
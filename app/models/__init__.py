@@ -2,5 +2,7 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.cart import Cart, CartItem
 from app.models.order import Order, OrderItem
+from app.models.job import OutboxJob
+from app.models.analytics import SalesRollup, RollupWatermark
 
-__all__ = ['User', 'Product', 'Cart', 'CartItem', 'Order', 'OrderItem']
\ No newline at end of file
+__all__ = ['User', 'Product', 'Cart', 'CartItem', 'Order', 'OrderItem', 'OutboxJob', 'SalesRollup', 'RollupWatermark']
\ No newline at end of file
@@ -0,0 +1,47 @@
+from datetime import datetime
+from app import db
+from app.server_timing import timed
+
+class SalesRollup(db.Model):
+    """
+    SalesRollup model - revenue, units and orders per time bucket,
+    maintained incrementally from new orders (see AnalyticsService)
+    """
+    __tablename__ = 'sales_rollups'
+
+    # Primary key order serves range scans: granularity, dimension, bucket range
+    granularity = db.Column(db.String(8), primary_key=True)  # hour, day, month
+    dimension = db.Column(db.String(16), primary_key=True)  # total, category, product
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    dim_key = db.Column(db.String(200), primary_key=True, default='')  # '' for total, category name, product id
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+
+    @timed('serialize')
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            'bucket': self.bucket_start.isoformat(),
+            'key': self.dim_key or None,
+            'revenue': round(self.revenue, 2),
+            'units': self.units,
+            'orders': self.orders
+        }
+
+    def __repr__(self):
+        return f'<SalesRollup {self.granularity} {self.dimension}={self.dim_key} {self.bucket_start}>'
+
+
+class RollupWatermark(db.Model):
+    """
+    RollupWatermark model - highest order id folded into the rollups
+    """
+    __tablename__ = 'rollup_watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_order_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RollupWatermark {self.name}={self.last_order_id}>'
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app import db
+from app.server_timing import timed
 
 class Cart(db.Model):
     """
@@ -23,6 +24,7 @@ class Cart(db.Model):
         """Get total number of items in cart"""
         return sum(item.quantity for item in self.items)
     
+    @timed('serialize')
     def to_dict(self):
         """Convert cart object to dictionary"""
         return {
@@ -44,6 +46,10 @@ class CartItem(db.Model):
     CartItem model - individual items in a cart
     """
     __tablename__ = 'cart_items'
+    __table_args__ = (
+        # Cart contents and the "is this product already in the cart" lookup
+        db.Index('ix_cart_items_cart_product', 'cart_id', 'product_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     cart_id = db.Column(db.Integer, db.ForeignKey('carts.id'), nullable=False)
@@ -58,6 +64,7 @@ class CartItem(db.Model):
         """Calculate subtotal for this cart item"""
         return self.product.price * self.quantity
     
+    @timed('serialize')
     def to_dict(self):
         """Convert cart item object to dictionary"""
         return {
@@ -0,0 +1,50 @@
+from datetime import datetime
+import json
+from app import db
+
+class OutboxJob(db.Model):
+    """
+    OutboxJob model - durable background jobs written in the same
+    transaction as the business change that triggered them
+    """
+    __tablename__ = 'outbox_jobs'
+    __table_args__ = (
+        db.Index('ix_outbox_jobs_status_run_after', 'status', 'run_after'),
+        # Retention sweep: finished jobs past their retention period
+        db.Index('ix_outbox_jobs_status_finished_at', 'status', 'finished_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON encoded
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, processing, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # next attempt / lease expiry
+    locked_by = db.Column(db.String(64))  # dispatcher that claimed the job
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def get_payload(self):
+        """Decode the JSON payload"""
+        return json.loads(self.payload) if self.payload else {}
+
+    def to_dict(self):
+        """Convert job object to dictionary"""
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'payload': self.get_payload(),
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<OutboxJob {self.id} {self.job_type} {self.status}>'
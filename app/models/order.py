@@ -1,11 +1,18 @@
 from datetime import datetime
 from app import db
+from app.server_timing import timed
 
 class Order(db.Model):
     """
     Order model - completed purchases
     """
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Keyset pagination of order history: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        db.Index('ix_orders_user_created_id', 'user_id', 'created_at', 'id'),
+        # Incremental exports: WHERE (updated_at, id) > watermark ORDER BY updated_at, id
+        db.Index('ix_orders_updated_id', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -18,12 +25,13 @@ class Order(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    items = db.relationship('OrderItem', backref='order', lazy='dynamic', cascade='all, delete-orphan')
+    # Relationships (eager-loadable so a page of orders fetches its items in one query)
+    items = db.relationship('OrderItem', backref='order', lazy='select', cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert order object to dictionary"""
-        return {
+    @timed('serialize')
+    def to_dict(self, include_items=True):
+        """Convert order object to dictionary (summary mode leaves items out)"""
+        data = {
             'id': self.id,
             'order_number': self.order_number,
             'user_id': self.user_id,
@@ -32,10 +40,12 @@ class Order(db.Model):
             'shipping_address': self.shipping_address,
             'payment_method': self.payment_method,
             'payment_status': self.payment_status,
-            'items': [item.to_dict() for item in self.items],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        if include_items:
+            data['items'] = [item.to_dict() for item in self.items]
+        return data
     
     def __repr__(self):
         return f'<Order {self.order_number}>'
@@ -48,7 +58,7 @@ class OrderItem(db.Model):
     __tablename__ = 'order_items'
     
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
     product_name = db.Column(db.String(200), nullable=False)  # Store product name at time of order
     quantity = db.Column(db.Integer, nullable=False)
@@ -58,6 +68,7 @@ class OrderItem(db.Model):
     # Relationships
     product = db.relationship('Product', backref='order_items')
     
+    @timed('serialize')
     def to_dict(self):
         """Convert order item object to dictionary"""
         return {
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app import db
+from app.server_timing import timed
 
 class Product(db.Model):
     """
@@ -15,10 +16,11 @@ class Product(db.Model):
     stock_quantity = db.Column(db.Integer, default=0)
     category = db.Column(db.String(100), index=True)
     image_url = db.Column(db.String(500))
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, default=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @timed('serialize')
     def to_dict(self):
         """Convert product object to dictionary"""
         return {
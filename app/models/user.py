@@ -1,6 +1,7 @@
 from datetime import datetime
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.server_timing import timed
+from app.utils.passwords import hash_password, verify_password, password_needs_rehash
 
 class User(db.Model):
     """
@@ -23,13 +24,18 @@ class User(db.Model):
     orders = db.relationship('Order', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     
     def set_password(self, password):
-        """Hash and set the password (for security)"""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set the password (for security) - runs on the hashing pool"""
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        """Check if the provided password matches"""
-        return check_password_hash(self.password_hash, password)
+        """Check if the provided password matches - runs on the hashing pool"""
+        return verify_password(self.password_hash, password)
     
+    def password_needs_rehash(self):
+        """Check if the stored hash uses an outdated method or cost"""
+        return password_needs_rehash(self.password_hash)
+    
+    @timed('serialize')
     def to_dict(self):
         """Convert user object to dictionary (for JSON responses)"""
         return {
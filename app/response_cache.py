@@ -0,0 +1,282 @@
+"""
+HTTP Response Cache
+Caches serialized GET responses keyed by route, path, query string and
+optionally the caller. Each entry carries dependency tags ('products',
+'product:42', 'orders:user:7', 'admin:stats'); service writes invalidate
+tags once their transaction commits. Eviction is LRU within a byte budget.
+
+Entries are per process: other workers see a write once the entry's TTL
+expires, so TTLs stay short.
+
+A response read from a replica shortly after one of its tags was invalidated
+may predate the write (the replica lags), so it is served but not stored.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping overhead (entry object, dict slots, tag index)
+ENTRY_OVERHEAD = 256
+
+
+class CachedResponse:
+    __slots__ = ('body', 'status', 'content_type', 'tags', 'expires', 'size')
+
+    def __init__(self, body, status, content_type, tags, expires, key):
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+        self.tags = tags
+        self.expires = expires
+        self.size = len(body) + len(key) + ENTRY_OVERHEAD
+
+
+class ResponseCache:
+    """
+    Thread-safe byte-bounded LRU with per-entry expiry and a tag index.
+    A response built while one of its tags was invalidated is not stored, nor
+    is one read from a replica within `replica_lag` seconds of such an
+    invalidation.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_entry_bytes=1024 * 1024, max_tracked_tags=10000,
+                 replica_lag=5.0):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.max_tracked_tags = max_tracked_tags
+        self.replica_lag = replica_lag
+        self.size = 0
+
+        self._entries = OrderedDict()  # key -> CachedResponse
+        self._keys_by_tag = {}  # tag -> keys of entries carrying it
+        self._invalidated = {}  # tag -> (generation, monotonic time) of its last invalidation
+        self._floor = 0  # puts started before this generation are dropped
+        self._floor_at = float('-inf')  # replica puts within replica_lag of this are dropped
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= now:
+                self._remove(key)
+                self._record_eviction('expired')
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, generation, replica=False, now=None):
+        """
+        Store an entry built from data read at `generation` (see .generation);
+        replica=True when that data came from a read replica
+        """
+        if entry.size > self.max_entry_bytes:
+            return False
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        with self._lock:
+            if generation < self._floor or self._stale(entry.tags, generation, replica, now):
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.size += entry.size
+            for tag in entry.tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while self.size > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        if evicted:
+            self._record_eviction('size', evicted)
+        return True
+
+    def _stale(self, tags, generation, replica, now):
+        """Whether data read at `generation` may miss an invalidation of one of `tags`"""
+        if replica and now - self._floor_at < self.replica_lag:
+            return True
+        for tag in tags:
+            invalidated = self._invalidated.get(tag)
+            if invalidated is None:
+                continue
+            invalidated_generation, invalidated_at = invalidated
+            if invalidated_generation > generation:
+                return True  # written while this response was being built
+            if replica and now - invalidated_at < self.replica_lag:
+                return True  # written just before, and the replica may not have it yet
+        return False
+
+    def invalidate_tags(self, tags, now=None):
+        now = time.monotonic() if now is None else now
+        removed = 0
+        with self._lock:
+            self._generation += 1
+            if len(self._invalidated) >= self.max_tracked_tags:
+                # Forget per-tag history; anything in flight is dropped instead
+                self._invalidated.clear()
+                self._floor = self._generation
+                self._floor_at = now
+            for tag in tags:
+                self._invalidated[tag] = (self._generation, now)
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        if removed:
+            self._record_eviction('invalidated', removed)
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._floor = self._generation
+            self._floor_at = time.monotonic()
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._invalidated.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _record_eviction(self, reason, count=1):
+        try:
+            from app.metrics import record_response_cache_eviction
+            record_response_cache_eviction(reason, count, self.size, len(self._entries))
+        except Exception:
+            pass
+
+
+_cache = None
+
+
+def get_response_cache():
+    return _cache
+
+
+def cache_response(ttl=60, tags=(), per_user=False):
+    """
+    Cache a GET view's 200 JSON responses for `ttl` seconds (overridable per
+    endpoint with RESPONSE_CACHE_TTLS). `tags` are formatted with the view's
+    arguments, e.g. 'orders:user:{user_id}'. Put it below the auth decorators
+    so access is checked on every request; per_user=True keys entries by caller.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = _cache
+            route_ttl = current_app.config.get('RESPONSE_CACHE_TTLS', {}).get(request.endpoint, ttl)
+            if cache is None or route_ttl <= 0 or request.method != 'GET':
+                return view(*args, **kwargs)
+
+            key = f"{request.endpoint}|{request.path}?{'&'.join(sorted(request.query_string.decode().split('&')))}"
+            if per_user:
+                identity = g.get('identity')
+                key += f"|user:{identity.user_id if identity else '-'}"
+
+            entry = cache.get(key)
+            _record(request.endpoint, entry is not None, cache)
+            if entry is not None:
+                response = current_app.response_class(entry.body, status=entry.status, content_type=entry.content_type)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            generation = cache.generation
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.is_json and 'Set-Cookie' not in response.headers:
+                entry_tags = tuple(tag.format(**kwargs) for tag in tags)
+                entry = CachedResponse(response.get_data(), response.status_code, response.content_type,
+                                       entry_tags, time.monotonic() + route_ttl, key)
+                cache.put(key, entry, generation, replica=g.get('db_route') == 'replica')
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    """
+    Invalidate cached responses carrying any of `tags` when the current
+    transaction commits (dropped if it rolls back)
+    """
+    from app import db
+    db.session.info.setdefault('response_cache_tags', set()).update(tags)
+
+
+def _record(route, hit, cache):
+    try:
+        from app.metrics import record_response_cache
+        record_response_cache(route, hit, cache.size, len(cache))
+    except Exception:
+        pass
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    tags = session.info.pop('response_cache_tags', None)
+    if tags and _cache is not None:
+        _cache.invalidate_tags(tags)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('response_cache_tags', None)
+
+
+def _parse_ttls(value):
+    """'products.get_products=30,admin.get_stats=0' -> {endpoint: seconds}"""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        endpoint, _, seconds = item.partition('=')
+        ttls[endpoint.strip()] = float(seconds)
+    return ttls
+
+
+def init_response_cache(app):
+    """
+    Enable response caching from the environment:
+    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_MB (total budget),
+    RESPONSE_CACHE_MAX_ENTRY_KB (larger responses are not cached),
+    RESPONSE_CACHE_TTLS (per-endpoint overrides, 0 disables a route),
+    RESPONSE_CACHE_REPLICA_LAG (seconds replica reads of a just-invalidated
+    tag are not stored; default DB_REPLICA_STICKY_SECONDS)
+    """
+    global _cache
+
+    app.config.setdefault('RESPONSE_CACHE_TTLS', _parse_ttls(os.getenv('RESPONSE_CACHE_TTLS', '')))
+    if os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        _cache = None
+        return None
+
+    _cache = ResponseCache(
+        max_bytes=int(float(os.getenv('RESPONSE_CACHE_MAX_MB', 32)) * 1024 * 1024),
+        max_entry_bytes=int(float(os.getenv('RESPONSE_CACHE_MAX_ENTRY_KB', 1024)) * 1024),
+        replica_lag=float(os.getenv('RESPONSE_CACHE_REPLICA_LAG', os.getenv('DB_REPLICA_STICKY_SECONDS', 5)))
+    )
+    app.extensions['response_cache'] = _cache
+    logger.info(f"🧊 Response cache enabled ({_cache.max_bytes // (1024 * 1024)} MB)")
+    return _cache
@@ -1,28 +1,28 @@
 import logging
-from flask import Blueprint, request, jsonify
+from urllib.parse import urlencode
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from sqlalchemy.orm import selectinload
 from app import db
+from app.auth import admin_required
+from app.database import read_only
+from app.response_cache import cache_response, invalidate
+from app.slow_queries import get_slow_query_log
 from app.models.user import User
 from app.models.product import Product
 from app.models.order import Order
+from app.services.analytics_service import AnalyticsService
+from app.services.export_service import DEFAULT_CHUNK_SIZE, ExportService
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
-def check_admin(user_id):
-    """Helper function to check if user is admin"""
-    user = User.query.get(user_id)
-    if not user or not user.is_admin:
-        return False
-    return True
-
 @bp.route('/users', methods=['GET'])
+@admin_required
+@read_only
 def get_all_users():
     """Get all users (admin only)"""
     try:
-        # In a real app, this is where we check authentication 
-        # For demo, we'll just return data
-        
         users = User.query.all()
         logger.info(f"📊 Admin viewed all users (Total: {len(users)})")
         
@@ -36,10 +36,12 @@ def get_all_users():
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/orders', methods=['GET'])
+@admin_required
+@read_only
 def get_all_orders():
     """Get all orders (admin only)"""
     try:
-        orders = Order.query.order_by(Order.created_at.desc()).all()
+        orders = Order.query.options(selectinload(Order.items)).order_by(Order.created_at.desc()).all()
         logger.info(f"📊 Admin viewed all orders (Total: {len(orders)})")
         
         return jsonify({
@@ -52,6 +54,9 @@ def get_all_orders():
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/stats', methods=['GET'])
+@admin_required
+@cache_response(ttl=15, tags=('admin:stats',))
+@read_only
 def get_stats():
     """Get admin dashboard statistics"""
     try:
@@ -74,6 +79,7 @@ def get_stats():
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/products/<int:product_id>', methods=['PUT'])
+@admin_required
 def update_product(product_id):
     """Update product (admin only)"""
     try:
@@ -95,6 +101,7 @@ def update_product(product_id):
         if 'category' in data:
             product.category = data['category']
         
+        invalidate('products', f'product:{product_id}')
         db.session.commit()
         
         logger.info(f"✅ Admin updated product: {product.name}")
@@ -110,6 +117,7 @@ def update_product(product_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/products/<int:product_id>', methods=['DELETE'])
+@admin_required
 def delete_product(product_id):
     """Delete product (admin only)"""
     try:
@@ -120,6 +128,7 @@ def delete_product(product_id):
         
         product_name = product.name
         db.session.delete(product)
+        invalidate('products', f'product:{product_id}', 'admin:stats')
         db.session.commit()
         
         logger.info(f"✅ Admin deleted product: {product_name}")
@@ -132,6 +141,7 @@ def delete_product(product_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/products', methods=['POST'])
+@admin_required
 def create_product():
     """Create new product (admin only)"""
     try:
@@ -154,6 +164,7 @@ def create_product():
         )
         
         db.session.add(product)
+        invalidate('products', 'admin:stats')
         db.session.commit()
         
         logger.info(f"✅ Admin created new product: {product.name} (Price: ${product.price}, Stock: {product.stock_quantity})")
@@ -166,4 +177,89 @@ def create_product():
     except Exception as e:
         db.session.rollback()
         logger.error(f"❌ Error creating product: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Internal server error'}), 500
+
+@bp.route('/analytics', methods=['GET'])
+@admin_required
+@cache_response(ttl=60, tags=('analytics',))
+@read_only
+def get_analytics():
+    """
+    Sales from the rollup tables (admin only)
+    Query params: start, end (ISO dates, UTC; default last 30 days / 2 days hourly),
+    granularity (day|hour|month), group_by (total|category|product), key, limit
+    """
+    try:
+        result, error = AnalyticsService.get_sales(
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            granularity=request.args.get('granularity', 'day'),
+            group_by=request.args.get('group_by', 'total'),
+            key=request.args.get('key'),
+            limit=min(max(request.args.get('limit', 20, type=int), 1), 100)
+        )
+        
+        if error:
+            return jsonify({'error': error}), 400
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        logger.error(f"❌ Error fetching analytics: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@bp.route('/export/<table>', methods=['GET'])
+@admin_required
+@read_only
+def export_orders(table):
+    """
+    Stream orders or order_items as a file download (admin only)
+    Query params: format (csv|parquet|arrow), since_id, since_updated (ISO), chunk_size.
+    X-Export-Watermark holds the query string that continues after this export.
+    """
+    try:
+        export, error = ExportService.start_export(
+            table,
+            fmt=request.args.get('format', 'csv'),
+            since_id=request.args.get('since_id', type=int),
+            since_updated=request.args.get('since_updated'),
+            chunk_size=request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+        )
+        
+        if error:
+            return jsonify({'error': error}), 400
+        
+        return Response(
+            stream_with_context(export.chunks()),
+            mimetype=export.mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename={export.filename}',
+                'X-Export-Watermark': urlencode(ExportService.next_watermark(export.watermark))
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"❌ Error exporting {table}: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """
+    Recent slow statements and per-statement totals with captured plans (admin only)
+    Query params: limit (default 50)
+    """
+    slow_log = get_slow_query_log()
+    if slow_log is None:
+        return jsonify({'error': 'Slow query log is disabled'}), 404
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    recent, statements = slow_log.snapshot(limit)
+    logger.info(f"🐢 Admin viewed slow queries ({len(recent)} recent, {len(statements)} statements)")
+    
+    return jsonify({
+        'threshold_ms': slow_log.threshold * 1000,
+        'recent': recent,
+        'statements': statements
+    }), 200
+
@@ -1,5 +1,6 @@
 import logging
 from flask import Blueprint, request, jsonify
+from app.auth import login_required
 from app.services.cart_service import CartService
 
 logger = logging.getLogger(__name__)
@@ -7,6 +8,7 @@ logger = logging.getLogger(__name__)
 bp = Blueprint('cart', __name__, url_prefix='/api/cart')
 
 @bp.route('/<int:user_id>', methods=['GET'])
+@login_required
 def get_cart(user_id):
     """Get user's cart"""
     try:
@@ -22,6 +24,7 @@ def get_cart(user_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/<int:user_id>/add', methods=['POST'])
+@login_required
 def add_to_cart(user_id):
     """Add product to cart"""
     try:
@@ -47,6 +50,7 @@ def add_to_cart(user_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/<int:user_id>/remove/<int:product_id>', methods=['DELETE'])
+@login_required
 def remove_from_cart(user_id, product_id):
     """Remove product from cart"""
     try:
@@ -1,5 +1,8 @@
 import logging
 from flask import Blueprint, request, jsonify
+from app.auth import current_identity, login_required
+from app.database import read_only
+from app.response_cache import cache_response
 from app.services.order_service import OrderService
 
 logger = logging.getLogger(__name__)
@@ -7,16 +10,17 @@ logger = logging.getLogger(__name__)
 bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
 @bp.route('', methods=['POST'])
+@login_required
 def create_order():
-    """Create an order from cart"""
+    """Create an order from the caller's cart"""
     try:
         data = request.get_json()
         
-        if 'user_id' not in data or 'shipping_address' not in data:
+        if 'shipping_address' not in data:
             return jsonify({'error': 'Missing required fields'}), 400
         
         order, error = OrderService.create_order(
-            user_id=data['user_id'],
+            user_id=current_identity().user_id,
             shipping_address=data['shipping_address'],
             payment_method=data.get('payment_method', 'credit_card')
         )
@@ -34,17 +38,32 @@ def create_order():
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/user/<int:user_id>', methods=['GET'])
+@login_required
+@cache_response(ttl=60, tags=('orders:user:{user_id}',))
+@read_only
 def get_user_orders(user_id):
-    """Get all orders for a user"""
+    """
+    Get a page of orders for a user
+    Query params: limit, cursor (from next_cursor), summary=1 (omit items)
+    """
     try:
-        orders, error = OrderService.get_user_orders(user_id)
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        summary = request.args.get('summary', '').lower() in ('1', 'true', 'yes')
+        
+        page, error = OrderService.get_user_orders_page(
+            user_id, limit=limit, cursor=cursor, include_items=not summary
+        )
         
         if error:
             return jsonify({'error': error}), 400
         
+        orders, next_cursor = page
         return jsonify({
-            'orders': [order.to_dict() for order in orders],
-            'count': len(orders)
+            'orders': [order.to_dict(include_items=not summary) for order in orders],
+            'count': len(orders),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         }), 200
         
     except Exception as e:
@@ -54,7 +73,7 @@ def get_user_orders(user_id):
 
 #**What this does:**
 #- `POST /api/orders` - Create order from cart
-#- `GET /api/orders/user/<user_id>` - Get user's orders
+#- `GET /api/orders/user/<user_id>` - Get user's orders (paginated)
 
 ## ✅ Routes Complete!
 
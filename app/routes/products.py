@@ -1,5 +1,8 @@
 import logging
 from flask import Blueprint, request, jsonify
+from app.auth import admin_required
+from app.database import read_only
+from app.response_cache import cache_response
 from app.services.product_service import ProductService
 
 logger = logging.getLogger(__name__)
@@ -7,6 +10,8 @@ logger = logging.getLogger(__name__)
 bp = Blueprint('products', __name__, url_prefix='/api/products')
 
 @bp.route('', methods=['GET'])
+@cache_response(ttl=30, tags=('products',))
+@read_only
 def get_products():
     """Get all products"""
     try:
@@ -25,6 +30,8 @@ def get_products():
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/<int:product_id>', methods=['GET'])
+@cache_response(ttl=60, tags=('product:{product_id}',))
+@read_only
 def get_product(product_id):
     """Get product by ID"""
     try:
@@ -40,8 +47,9 @@ def get_product(product_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('', methods=['POST'])
+@admin_required
 def create_product():
-    """Create a new product"""
+    """Create a new product (admin only)"""
     try:
         data = request.get_json()
         
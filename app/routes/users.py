@@ -1,5 +1,10 @@
 import logging
-from flask import Blueprint, request, jsonify
+import math
+from flask import Blueprint, current_app, request, jsonify
+from app.active_users import record_activity
+from app.auth import InsecureSecretKey, issue_token
+from app.database import read_only
+from app.throttle import get_login_throttle
 from app.services.user_service import UserService
 
 logger = logging.getLogger(__name__)
@@ -22,6 +27,8 @@ def register():
             full_name=data.get('full_name')
         )
         
+        if error == UserService.BUSY_ERROR:
+            return jsonify({'error': error}), 503, {'Retry-After': '1'}
         if error:
             return jsonify({'error': error}), 400
         
@@ -42,25 +49,48 @@ def login():
         
         if 'username' not in data or 'password' not in data:
             return jsonify({'error': 'Missing credentials'}), 400
+        if not isinstance(data['username'], str) or not isinstance(data['password'], str):
+            return jsonify({'error': 'Username and password must be strings'}), 400
+        
+        # Reject floods before any database or hashing work
+        throttle = get_login_throttle()
+        if throttle:
+            retry_after = throttle.check(data['username'], request.remote_addr)
+            if retry_after:
+                logger.warning(f"🚦 Login throttled for '{data['username']}' from {request.remote_addr} → HTTP 429")
+                return jsonify({'error': 'Too many login attempts, please try again later'}), 429, \
+                    {'Retry-After': str(int(math.ceil(retry_after)))}
         
         user, error = UserService.authenticate_user(
             username=data['username'],
             password=data['password']
         )
         
+        if error == UserService.BUSY_ERROR:
+            return jsonify({'error': error}), 503, {'Retry-After': '1'}
         if error:
             return jsonify({'error': error}), 401
         
+        if throttle:
+            throttle.reset_user(data['username'])
+        record_activity(user.id)
+        
         return jsonify({
             'message': 'Login successful',
-            'user': user.to_dict()
+            'user': user.to_dict(),
+            'token': issue_token(user),
+            'expires_in': current_app.config['AUTH_TOKEN_MAX_AGE']
         }), 200
         
+    except InsecureSecretKey as e:
+        logger.error(f"🔑 Login refused: {str(e)} → HTTP 503")
+        return jsonify({'error': 'Login is unavailable: the server has no SECRET_KEY configured'}), 503
     except Exception as e:
         logger.error(f"Error in login: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/<int:user_id>', methods=['GET'])
+@read_only
 def get_user(user_id):
     """Get user by ID"""
     try:
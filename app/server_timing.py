@@ -0,0 +1,251 @@
+"""
+Server-Timing
+Per-request phase timers: database (cursor execution), ORM (statement setup,
+plus row hydration when SERVER_TIMING_ORM_HYDRATION is on), serialization (model to_dict), JSON encoding and logging.
+Phases nest - a lazy load inside to_dict counts as db, not serialize - so each
+reports its own time. Emitted as a Server-Timing header and as fields on the
+JSON access log line.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+from functools import wraps
+from flask import current_app, g, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger('app.access')
+
+PHASES = ('db', 'orm', 'serialize', 'json', 'log')
+
+_timings = ContextVar('server_timing', default=None)
+
+
+class RequestTimings:
+    """Exclusive time per phase for one request; `_stack` holds open phases"""
+
+    __slots__ = ('started', 'elapsed', 'counts', '_stack')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.elapsed = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+        self._stack = []  # [phase, started, time spent in nested phases]
+
+    def start(self, phase):
+        self._stack.append([phase, time.perf_counter(), 0.0])
+
+    def stop(self, phase):
+        if not self._stack or self._stack[-1][0] != phase:
+            return
+        name, started, nested = self._stack.pop()
+        duration = time.perf_counter() - started
+        self.elapsed[name] += duration - nested
+        self.counts[name] += 1
+        if self._stack:
+            self._stack[-1][2] += duration
+
+    def summary(self):
+        """{'total': ms, 'app': ms not in any phase, phase: ms, ...}"""
+        total = (time.perf_counter() - self.started) * 1000
+        phases = {phase: self.elapsed[phase] * 1000 for phase in PHASES}
+        return {'total': total, 'app': max(0.0, total - sum(phases.values())), **phases}
+
+
+def timed(phase):
+    """Count a function's time towards `phase` of the current request"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _timings.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            timings.start(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.stop(phase)
+        return wrapper
+    return decorator
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that counts encoding time (jsonify included)"""
+
+    @timed('json')
+    def dumps(self, obj, **kwargs):
+        return super().dumps(obj, **kwargs)
+
+
+# --- SQLAlchemy hooks ---
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _db_start(conn, cursor, statement, parameters, context, executemany):
+    timings = _timings.get()
+    if timings is not None:
+        timings.start('db')
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _db_stop(conn, cursor, statement, parameters, context, executemany):
+    timings = _timings.get()
+    if timings is not None:
+        timings.stop('db')
+
+
+@event.listens_for(Engine, 'handle_error')
+def _db_error(exception_context):
+    timings = _timings.get()
+    if timings is not None:
+        timings.stop('db')
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _orm_execute(orm_execute_state):
+    """
+    Time ORM statement setup. Rows are hydrated lazily as the caller reads
+    them, and that time lands in whichever phase reads them. With
+    SERVER_TIMING_ORM_HYDRATION, SELECTs are buffered here (freeze()) so
+    hydration counts as orm too - at the cost of building every row even
+    when the caller only wants .first(). Streaming (yield_per) queries are
+    never buffered.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return None
+    options = orm_execute_state.execution_options
+    streaming = options.get('yield_per') or options.get('stream_results')
+    timings.start('orm')
+    try:
+        result = orm_execute_state.invoke_statement()
+        if (orm_execute_state.is_select and not streaming
+                and current_app.config.get('SERVER_TIMING_ORM_HYDRATION')):
+            return result.freeze()()
+        return result
+    finally:
+        timings.stop('orm')
+
+
+def _timed_handler(handle):
+    @wraps(handle)
+    def wrapper(record):
+        timings = _timings.get()
+        if timings is None:
+            return handle(record)
+        timings.start('log')
+        try:
+            return handle(record)
+        finally:
+            timings.stop('log')
+    wrapper._server_timing = True
+    return wrapper
+
+
+# --- Request hooks ---
+
+def _start_access_log():
+    g.access_log_started = time.perf_counter()
+
+
+def _before_request():
+    g.server_timing_token = _timings.set(RequestTimings())
+
+
+def _after_request(response):
+    timings = _timings.get()
+    if timings is None:
+        return response
+    # Stop counting before the access log line, which is not part of the request's work
+    g.server_timing_summary = summary = timings.summary()
+    if _send_header():
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={summary[name]:.2f}' + (f';desc="{timings.counts[name]}"' if name in ('db', 'orm') else '')
+            for name in ('total', 'app') + PHASES
+        )
+    return response
+
+
+def _send_header():
+    """Whether this response gets the Server-Timing header (the timings are recorded either way)"""
+    mode = current_app.config['SERVER_TIMING_HEADER']
+    if mode == 'admin':
+        identity = g.get('identity')
+        return current_app.debug or (identity is not None and identity.is_admin)
+    return mode == 'all'
+
+
+def _header_mode(value):
+    value = value.lower()
+    if value in ('1', 'true', 'yes', 'all'):
+        return 'all'
+    if value == 'admin':
+        return 'admin'
+    return 'off'
+
+
+def _teardown_request(exc=None):
+    token = g.pop('server_timing_token', None)
+    if token is not None:
+        _timings.reset(token)
+
+
+def _access_log(response):
+    """One structured line per request; phase timings included when collected"""
+    started = g.get('access_log_started')
+    duration_ms = (time.perf_counter() - started) * 1000 if started else None
+    summary = g.get('server_timing_summary')
+    fields = {
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(summary['total'] if summary else duration_ms, 2),
+        'bytes': response.calculate_content_length(),
+    }
+    if summary:
+        fields['timing'] = {name: round(value, 2) for name, value in summary.items()}
+    access_logger.info(f"📨 {request.method} {request.path} → HTTP {response.status_code} ({fields['duration_ms']:.1f}ms)",
+                       extra=fields)
+    return response
+
+
+def init_server_timing(app):
+    """
+    Per-request phase timing from the environment:
+    SERVER_TIMING_ENABLED (collect phase timings), SERVER_TIMING_HEADER
+    (send them to clients: admin - admins and debug mode only, true, false),
+    SERVER_TIMING_ORM_HYDRATION (buffer ORM SELECTs
+    to time hydration - diagnostics only), ACCESS_LOG_ENABLED (one log line per request,
+    with the timings as JSON fields). Call before the other request hooks.
+    """
+    enabled = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    access_log = os.getenv('ACCESS_LOG_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+    app.config.setdefault('SERVER_TIMING_HEADER', _header_mode(os.getenv('SERVER_TIMING_HEADER', 'admin')))
+    app.config.setdefault('SERVER_TIMING_ORM_HYDRATION',
+                          os.getenv('SERVER_TIMING_ORM_HYDRATION', 'false').lower() in ('1', 'true', 'yes'))
+
+    if access_log:
+        # Registered before the other hooks, so it runs after theirs (after_request runs in reverse)
+        app.before_request(_start_access_log)
+        app.after_request(_access_log)
+
+    if not enabled:
+        return None
+
+    app.json = TimedJSONProvider(app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+    for handler in logging.getLogger().handlers:
+        if not getattr(handler.handle, '_server_timing', False):
+            handler.handle = _timed_handler(handler.handle)
+
+    logger.info(f"⏱️ Server-Timing enabled (header: {app.config['SERVER_TIMING_HEADER']}, "
+                f"ORM hydration: {'on' if app.config['SERVER_TIMING_ORM_HYDRATION'] else 'off'}, "
+                f"access log: {'on' if access_log else 'off'})")
+    return True
@@ -0,0 +1,270 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_, select, update
+from app import db
+from app.jobs import enqueue, job
+from app.models.analytics import SalesRollup, RollupWatermark
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.response_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = 'sales'
+GRANULARITIES = ('hour', 'day', 'month')
+DIMENSIONS = ('total', 'category', 'product')
+MAX_RANGE_DAYS = {'hour': 31, 'day': 3660, 'month': 3660}
+
+
+@job('analytics.update_rollups', events=['order.created'])
+def update_sales_rollups(payload):
+    """Fold new orders into the sales rollups (runs on a background worker)"""
+    settle = float(os.getenv('ROLLUP_SETTLE_SECONDS', 30))
+    folded, more = AnalyticsService.fold_new_orders(int(os.getenv('ROLLUP_BATCH_SIZE', 1000)), settle)
+    if more is not None:
+        # Committed with this job: continue the backlog now, or retry once a gap settles
+        follow_up = enqueue('analytics.update_rollups', {'reason': more})
+        if more == 'gap':
+            follow_up.run_after = datetime.utcnow() + timedelta(seconds=settle)
+
+
+def truncate(moment, granularity):
+    """Start of the hour, day or month containing `moment`"""
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(moment, granularity):
+    """First bucket starting at or after `moment`"""
+    start = truncate(moment, granularity)
+    if start == moment:
+        return start
+    if granularity == 'hour':
+        return start + timedelta(hours=1)
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def covering_buckets(start, end, granularity):
+    """
+    [(granularity, lo, hi)] selecting the same data as `granularity` buckets
+    starting in [start, end), using coarser buckets where whole ones fit -
+    a year of daily product rows becomes ~12 monthly ones plus the edges
+    """
+    lo, hi = ceil_bucket(start, granularity), ceil_bucket(end, granularity)
+    level = GRANULARITIES.index(granularity)
+    if level + 1 < len(GRANULARITIES):
+        coarser = GRANULARITIES[level + 1]
+        inner_lo, inner_hi = ceil_bucket(lo, coarser), truncate(hi, coarser)
+        if inner_lo < inner_hi:
+            return [part for part in [(granularity, lo, inner_lo)] + covering_buckets(inner_lo, inner_hi, coarser)
+                    + [(granularity, inner_hi, hi)] if part[1] < part[2]]
+    return [(granularity, lo, hi)] if lo < hi else []
+
+
+class AnalyticsService:
+
+    @staticmethod
+    def fold_new_orders(batch_size=1000, settle_seconds=30):
+        """
+        Add up to `batch_size` orders past the watermark to the rollups, in the
+        caller's transaction (the caller commits). Orders are taken in id order;
+        a missing id younger than `settle_seconds` may belong to a transaction
+        that has not committed yet, so folding stops there until it settles.
+        Returns (orders folded, None | 'backlog' | 'gap').
+        """
+        watermark = db.session.get(RollupWatermark, WATERMARK)
+        if watermark is None:
+            watermark = RollupWatermark(name=WATERMARK, last_order_id=0)
+            db.session.add(watermark)
+            db.session.flush()
+        start_id = watermark.last_order_id
+
+        now = datetime.utcnow()
+        candidates = db.session.execute(
+            select(Order.id, Order.created_at).where(Order.id > start_id).order_by(Order.id).limit(batch_size)
+        ).all()
+        end_id, more = start_id, 'backlog' if len(candidates) == batch_size else None
+        for order_id, created_at in candidates:
+            if order_id != end_id + 1 and created_at is not None \
+                    and (now - created_at).total_seconds() < settle_seconds:
+                more = 'gap'
+                break
+            end_id = order_id
+        if end_id == start_id:
+            return 0, more
+
+        # Claim the id range first (compare-and-set), so concurrent folds never count an order twice
+        claimed = db.session.execute(
+            update(RollupWatermark)
+            .where(RollupWatermark.name == WATERMARK, RollupWatermark.last_order_id == start_id)
+            .values(last_order_id=end_id, updated_at=now)
+        ).rowcount
+        if claimed != 1:
+            return 0, None
+
+        items = db.session.execute(
+            select(Order.id, Order.created_at, OrderItem.product_id, Product.category,
+                   OrderItem.quantity, OrderItem.subtotal)
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .outerjoin(Product, Product.id == OrderItem.product_id)
+            .where(Order.id > start_id, Order.id <= end_id)
+        ).all()
+
+        totals = {}  # (granularity, dimension, bucket, key) -> [revenue, units, order ids]
+        for order_id, created_at, product_id, category, quantity, subtotal in items:
+            for granularity in GRANULARITIES:
+                bucket = truncate(created_at or now, granularity)
+                for dimension, key in (('total', ''), ('category', category or 'Uncategorized'), ('product', str(product_id))):
+                    entry = totals.setdefault((granularity, dimension, bucket, key), [0.0, 0, set()])
+                    entry[0] += subtotal
+                    entry[1] += quantity
+                    entry[2].add(order_id)
+
+        if totals:
+            AnalyticsService.add_to_rollups([
+                {'granularity': granularity, 'dimension': dimension, 'bucket_start': bucket, 'dim_key': key,
+                 'revenue': revenue, 'units': units, 'orders': len(order_ids)}
+                for (granularity, dimension, bucket, key), (revenue, units, order_ids) in totals.items()
+            ])
+            invalidate('analytics')
+
+        folded = sum(1 for order_id, _ in candidates if start_id < order_id <= end_id)
+        logger.info(f"📈 Rolled up {folded} orders (ids {start_id + 1}-{end_id}, {len(totals)} buckets)")
+        return folded, more
+
+    @staticmethod
+    def add_to_rollups(rows):
+        """Upsert that adds to existing rollup rows (one executemany)"""
+        table = SalesRollup.__table__
+        if db.session.get_bind().dialect.name == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table)
+            stmt = stmt.on_duplicate_key_update(
+                revenue=table.c.revenue + stmt.inserted.revenue,
+                units=table.c.units + stmt.inserted.units,
+                orders=table.c.orders + stmt.inserted.orders
+            )
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[column.name for column in table.primary_key],
+                set_={
+                    'revenue': table.c.revenue + stmt.excluded.revenue,
+                    'units': table.c.units + stmt.excluded.units,
+                    'orders': table.c.orders + stmt.excluded.orders
+                }
+            )
+        db.session.execute(stmt, rows)
+
+    @staticmethod
+    def rebuild():
+        """
+        Empty the rollups and rewind the watermark (caller commits, then folds again).
+        The watermark row is locked first: a fold in flight holds it from its
+        claim until commit, so this waits for it, and folds that read the old
+        watermark find it moved and add nothing.
+        """
+        watermark = db.session.execute(
+            select(RollupWatermark).where(RollupWatermark.name == WATERMARK)
+            .with_for_update().execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        db.session.execute(SalesRollup.__table__.delete())
+        if watermark is None:
+            db.session.add(RollupWatermark(name=WATERMARK, last_order_id=0))
+        else:
+            watermark.last_order_id = 0
+        invalidate('analytics')
+
+    @staticmethod
+    def parse_range(start=None, end=None, granularity='day'):
+        """(start, end) datetimes from ISO dates; raises ValueError when invalid"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        try:
+            end = datetime.fromisoformat(end) if end else datetime.utcnow()
+            start = datetime.fromisoformat(start) if start else end - timedelta(days=2 if granularity == 'hour' else 30)
+        except ValueError:
+            raise ValueError("start and end must be ISO dates (YYYY-MM-DD or YYYY-MM-DDTHH:MM)")
+        if start >= end:
+            raise ValueError("start must be before end")
+        if end - start > timedelta(days=MAX_RANGE_DAYS[granularity]):
+            raise ValueError(f"range too long for {granularity} buckets (max {MAX_RANGE_DAYS[granularity]} days)")
+        return start, end
+
+    @staticmethod
+    def get_sales(start=None, end=None, granularity='day', group_by='total', key=None, limit=20):
+        """
+        Revenue, units and orders in [start, end) from the rollups (UTC).
+        group_by=total (or a category/product `key`): a series per bucket;
+        group_by=category|product: the top `limit` keys over the range.
+        """
+        try:
+            if group_by not in DIMENSIONS:
+                raise ValueError(f"group_by must be one of: {', '.join(DIMENSIONS)}")
+            start, end = AnalyticsService.parse_range(start, end, granularity)
+            in_range = (SalesRollup.granularity == granularity,
+                        SalesRollup.bucket_start >= start, SalesRollup.bucket_start < end)
+            # Totals over the range read the coarsest buckets that fit
+            covered = or_(*(
+                and_(SalesRollup.granularity == level, SalesRollup.bucket_start >= lo, SalesRollup.bucket_start < hi)
+                for level, lo, hi in covering_buckets(start, end, granularity)
+            ) or [False])
+
+            revenue, units, orders = db.session.execute(
+                select(func.sum(SalesRollup.revenue), func.sum(SalesRollup.units), func.sum(SalesRollup.orders))
+                .where(SalesRollup.dimension == 'total', covered)
+            ).one()
+            watermark = db.session.get(RollupWatermark, WATERMARK)
+            result = {
+                'granularity': granularity,
+                'group_by': group_by,
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'summary': {'revenue': round(revenue or 0, 2), 'units': units or 0, 'orders': orders or 0},
+                'last_order_id': watermark.last_order_id if watermark else 0,
+                'updated_at': watermark.updated_at.isoformat() if watermark and watermark.updated_at else None
+            }
+
+            if group_by == 'total' or key is not None:
+                rows = db.session.scalars(
+                    select(SalesRollup)
+                    .where(SalesRollup.dimension == group_by, SalesRollup.dim_key == (key or ''), *in_range)
+                    .order_by(SalesRollup.bucket_start)
+                ).all()
+                result['key'] = key
+                result['series'] = [row.to_dict() for row in rows]
+            else:
+                rows = db.session.execute(
+                    select(SalesRollup.dim_key, func.sum(SalesRollup.revenue).label('revenue'),
+                           func.sum(SalesRollup.units), func.sum(SalesRollup.orders))
+                    .where(SalesRollup.dimension == group_by, covered)
+                    .group_by(SalesRollup.dim_key)
+                    .order_by(func.sum(SalesRollup.revenue).desc())
+                    .limit(limit)
+                ).all()
+                names = {}
+                if group_by == 'product' and rows:
+                    names = dict(db.session.execute(
+                        select(Product.id, Product.name).where(Product.id.in_([int(row[0]) for row in rows]))
+                    ).all())
+                result['breakdown'] = [
+                    {'key': dim_key, 'name': names.get(int(dim_key)) if group_by == 'product' else dim_key,
+                     'revenue': round(revenue, 2), 'units': units, 'orders': orders}
+                    for dim_key, revenue, units, orders in rows
+                ]
+
+            logger.info(f"📈 Sales analytics: {granularity} by {group_by} {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M} → HTTP 200")
+            return result, None
+        except ValueError as e:
+            logger.warning(f"❌ Sales analytics failed: {str(e)} → HTTP 400")
+            return None, str(e)
+        except Exception as e:
+            logger.error(f"💥 Error fetching sales analytics: {str(e)} → HTTP 500")
+            return None, str(e)
@@ -0,0 +1,298 @@
+"""
+Order Export
+Streams orders and order_items for offline analytics. Rows come from a
+server-side cursor (yield_per) one chunk at a time, and each chunk is encoded
+and handed on before the next is fetched, so memory stays flat however large
+the export. Formats: gzip CSV always; Parquet and Arrow IPC when pyarrow is
+installed.
+
+Incremental exports start after a watermark - the last order id, or the last
+(updated_at, id) pair for changed orders - and stop at an upper bound fixed
+when the export starts. That bound is the watermark for the next run, and
+both tables of one export share it. It only covers rows older than
+EXPORT_SETTLE_SECONDS: ids and updated_at are stamped at flush, so a
+transaction still in flight can commit a row below the newest committed one,
+and a bound above it would skip that row in every later run.
+"""
+import csv
+import io
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy import and_, not_, or_, select
+from sqlalchemy.types import Boolean, DateTime, Float, Integer, Numeric
+from app import db
+from app.models.order import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+TABLES = ('orders', 'order_items')
+FORMATS = {
+    # format: (file extension, mimetype)
+    'csv': ('csv.gz', 'application/gzip'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrows', 'application/vnd.apache.arrow.stream'),
+}
+DEFAULT_CHUNK_SIZE = 5000
+MAX_CHUNK_SIZE = 50000
+
+
+def load_pyarrow():
+    """pyarrow (with ipc and parquet) when installed, else None"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt == 'csv' or load_pyarrow() is not None]
+
+
+class CsvGzipEncoder:
+    """CSV with a header row, gzip-compressed incrementally (one gzip member)"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._datetimes = [i for i, column in enumerate(columns) if isinstance(column.type, DateTime)]
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text)
+        self._gzip = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+        self._writer.writerow([column.name for column in columns])
+
+    def encode(self, rows):
+        if self._datetimes:
+            rows = [self._isoformat(row) for row in rows]
+        self._writer.writerows(rows)
+        data = self._gzip.compress(self._text.getvalue().encode('utf-8'))
+        self._text.seek(0)
+        self._text.truncate()
+        return data
+
+    def _isoformat(self, row):
+        values = list(row)
+        for i in self._datetimes:
+            if values[i] is not None:
+                values[i] = values[i].isoformat()
+        return values
+
+    def close(self):
+        return self._gzip.compress(self._text.getvalue().encode('utf-8')) + self._gzip.flush()
+
+
+class ArrowEncoder:
+    """One Arrow record batch per chunk, written as Parquet row groups or an Arrow IPC stream"""
+
+    def __init__(self, columns, fmt, pyarrow):
+        self.pa = pyarrow
+        self.schema = pyarrow.schema([(column.name, self._arrow_type(column.type)) for column in columns])
+        self._sink = io.BytesIO()
+        if fmt == 'parquet':
+            self._writer = pyarrow.parquet.ParquetWriter(self._sink, self.schema, compression='zstd')
+            self._write = lambda batch: self._writer.write_table(pyarrow.Table.from_batches([batch]))
+        else:
+            self._writer = pyarrow.ipc.new_stream(self._sink, self.schema)
+            self._write = self._writer.write_batch
+
+    def _arrow_type(self, column_type):
+        pa = self.pa
+        if isinstance(column_type, Boolean):
+            return pa.bool_()
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, (Float, Numeric)):
+            return pa.float64()
+        if isinstance(column_type, DateTime):
+            return pa.timestamp('us')
+        return pa.string()
+
+    def encode(self, rows):
+        values = list(zip(*rows))
+        self._write(self.pa.record_batch(
+            [self.pa.array(column, type=field.type) for column, field in zip(values, self.schema)],
+            schema=self.schema
+        ))
+        return self._drain()
+
+    def close(self):
+        self._writer.close()
+        return self._drain()
+
+    def _drain(self):
+        """Bytes written since the last call (the sink never holds more than one chunk)"""
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+
+class OrderExport:
+    """One table of an export: `chunks()` yields the encoded bytes, then rows/bytes/seconds are set"""
+
+    def __init__(self, table, fmt, watermark, chunk_size):
+        self.table = table
+        self.format = fmt
+        self.watermark = watermark
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def filename(self):
+        return f"{self.table}-{datetime.utcnow():%Y%m%dT%H%M%S}.{FORMATS[self.format][0]}"
+
+    @property
+    def mimetype(self):
+        return FORMATS[self.format][1]
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def statement(self):
+        """Rows past the watermark up to its bound, in watermark order"""
+        orders = Order.__table__
+        since, until = self.watermark['since'], self.watermark['until']
+        if self.watermark['mode'] == 'id':
+            after = orders.c.id > since['id']
+            up_to = orders.c.id <= until['id']
+            order_key = (orders.c.id,)
+        else:
+            after = or_(orders.c.updated_at > since['updated_at'],
+                        and_(orders.c.updated_at == since['updated_at'], orders.c.id > since['id']))
+            up_to = not_(or_(orders.c.updated_at > until['updated_at'],
+                             and_(orders.c.updated_at == until['updated_at'], orders.c.id > until['id'])))
+            order_key = (orders.c.updated_at, orders.c.id)
+
+        if self.table == 'orders':
+            return select(*orders.c).where(after, up_to).order_by(*order_key)
+
+        items = OrderItem.__table__
+        if self.watermark['mode'] == 'id':
+            # Filter on order_items.order_id directly so the order_id index drives the scan
+            return (select(*items.c)
+                    .where(items.c.order_id > since['id'], items.c.order_id <= until['id'])
+                    .order_by(items.c.order_id, items.c.id))
+        return (select(*items.c)
+                .join(orders, orders.c.id == items.c.order_id)
+                .where(after, up_to)
+                .order_by(*order_key, items.c.id))
+
+    def chunks(self):
+        statement = self.statement()
+        columns = list(statement.selected_columns)
+        if self.format == 'csv':
+            encoder = CsvGzipEncoder(columns)
+        else:
+            encoder = ArrowEncoder(columns, self.format, load_pyarrow())
+
+        started = time.perf_counter()
+        result = db.session.execute(statement.execution_options(yield_per=self.chunk_size))
+        try:
+            for rows in result.partitions():
+                self.rows += len(rows)
+                data = encoder.encode(rows)
+                if data:
+                    self.bytes += len(data)
+                    yield data
+            data = encoder.close()
+            self.bytes += len(data)
+            yield data
+        finally:
+            result.close()
+            self.seconds = time.perf_counter() - started
+
+        logger.info(f"📦 Exported {self.rows} {self.table} rows as {self.format} "
+                    f"({self.bytes / 1024:.0f} KB in {self.seconds:.2f}s, {self.rows_per_second:,.0f} rows/s)")
+        try:
+            from app.metrics import record_export
+            record_export(self.table, self.format, self.rows, self.seconds)
+        except Exception:
+            pass
+
+
+class ExportService:
+
+    @staticmethod
+    def plan(since_id=None, since_updated=None, settle_seconds=None, now=None):
+        """
+        Watermark for an export: rows after `since` up to `until`, the newest
+        row older than `settle_seconds` (default EXPORT_SETTLE_SECONDS).
+        since_updated (ISO) exports orders changed after that time (ties
+        broken by since_id); otherwise orders with id > since_id.
+        Raises ValueError when invalid.
+        """
+        orders = Order.__table__
+        if since_id is not None and since_id < 0:
+            raise ValueError("since_id must not be negative")
+        if settle_seconds is None:
+            settle_seconds = float(os.getenv('EXPORT_SETTLE_SECONDS', 30))
+        settled = (now or datetime.utcnow()) - timedelta(seconds=settle_seconds)
+
+        if since_updated is None:
+            until_id = db.session.execute(
+                select(orders.c.id)
+                .where(or_(orders.c.created_at <= settled, orders.c.created_at.is_(None)))
+                .order_by(orders.c.id.desc())
+                .limit(1)
+            ).scalar() or 0
+            return {'mode': 'id', 'since': {'id': since_id or 0}, 'until': {'id': max(until_id, since_id or 0)}}
+
+        if isinstance(since_updated, str):
+            try:
+                since_updated = datetime.fromisoformat(since_updated)
+            except ValueError:
+                raise ValueError("since_updated must be an ISO timestamp (YYYY-MM-DDTHH:MM:SS)")
+        since = {'updated_at': since_updated, 'id': since_id or 0}
+        until = db.session.execute(
+            select(orders.c.updated_at, orders.c.id)
+            .where(orders.c.updated_at <= settled)
+            .order_by(orders.c.updated_at.desc(), orders.c.id.desc())
+            .limit(1)
+        ).first()
+        if until is None or (until.updated_at, until.id) < (since['updated_at'], since['id']):
+            until = since
+        else:
+            until = {'updated_at': until.updated_at, 'id': until.id}
+        return {'mode': 'updated', 'since': since, 'until': until}
+
+    @staticmethod
+    def next_watermark(watermark):
+        """Query parameters that continue after this export"""
+        until = watermark['until']
+        if watermark['mode'] == 'id':
+            return {'since_id': until['id']}
+        return {'since_updated': until['updated_at'].isoformat(), 'since_id': until['id']}
+
+    @staticmethod
+    def start_export(table, fmt='csv', since_id=None, since_updated=None, chunk_size=DEFAULT_CHUNK_SIZE, watermark=None):
+        """
+        Prepare a streaming export of one table. Returns (OrderExport, error);
+        nothing is read until its chunks() generator is iterated.
+        """
+        try:
+            if table not in TABLES:
+                raise ValueError(f"table must be one of: {', '.join(TABLES)}")
+            if fmt not in FORMATS:
+                raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+            if fmt not in available_formats():
+                raise ValueError(f"{fmt} export needs pyarrow (pip install pyarrow); available: {', '.join(available_formats())}")
+            if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+                raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+
+            if watermark is None:
+                watermark = ExportService.plan(since_id, since_updated)
+            logger.info(f"📦 Export of {table} as {fmt} started ({watermark['mode']} watermark → {watermark['until']})")
+            return OrderExport(table, fmt, watermark, chunk_size), None
+        except ValueError as e:
+            logger.warning(f"❌ Export failed: {str(e)} → HTTP 400")
+            return None, str(e)
+        except Exception as e:
+            logger.error(f"💥 Error starting export: {str(e)} → HTTP 500")
+            return None, str(e)
@@ -1,14 +1,33 @@
+import base64
 import logging
 import uuid
 from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload, selectinload
 from app import db
+from app.jobs import job, publish
 from app.models.order import Order, OrderItem
 from app.models.cart import Cart, CartItem
+from app.response_cache import invalidate
 
 logger = logging.getLogger(__name__)
 
+
+@job('order.record_metrics', events=['order.created'], once=True)
+def record_order_metrics(payload):
+    """
+    Record business metrics for a new order (runs on a background worker).
+    At most once: a retry after a partial update would count the order twice.
+    """
+    from app.metrics import record_order
+    record_order(payload['total_amount'])
+
+
 class OrderService:
     
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+    
     @staticmethod
     def generate_order_number():
         """Generate unique order number"""
@@ -18,17 +37,40 @@ class OrderService:
     
     @staticmethod
     def create_order(user_id, shipping_address, payment_method='credit_card'):
-        """Create order from cart"""
+        """
+        Create order from cart in a single pass:
+        load cart lines with their products once, total in memory,
+        bulk insert order items and clear the cart with one statement.
+        """
         try:
-            cart = Cart.query.filter_by(user_id=user_id).first()
-            if not cart or not cart.items.count():
+            cart_items = CartItem.query.join(Cart, CartItem.cart_id == Cart.id) \
+                .options(joinedload(CartItem.product)) \
+                .filter(Cart.user_id == user_id).all()
+            if not cart_items:
                 return None, "Cart is empty"
+            cart_id = cart_items[0].cart_id
+            
+            # Price every line once, in memory
+            lines = []
+            total_amount = 0
+            for cart_item in cart_items:
+                product = cart_item.product
+                subtotal = product.price * cart_item.quantity
+                total_amount += subtotal
+                lines.append({
+                    'product_id': product.id,
+                    'product_name': product.name,
+                    'quantity': cart_item.quantity,
+                    'price_at_purchase': product.price,
+                    'subtotal': subtotal
+                })
+                product.reduce_stock(cart_item.quantity)
             
             # Create order
             order = Order(
                 user_id=user_id,
                 order_number=OrderService.generate_order_number(),
-                total_amount=cart.get_total(),
+                total_amount=total_amount,
                 shipping_address=shipping_address,
                 payment_method=payment_method,
                 status='pending'
@@ -36,30 +78,29 @@ class OrderService:
             db.session.add(order)
             db.session.flush()
             
-            # Create order items
-            for cart_item in cart.items:
-                order_item = OrderItem(
-                    order_id=order.id,
-                    product_id=cart_item.product_id,
-                    product_name=cart_item.product.name,
-                    quantity=cart_item.quantity,
-                    price_at_purchase=cart_item.product.price,
-                    subtotal=cart_item.get_subtotal()
-                )
-                db.session.add(order_item)
-                cart_item.product.reduce_stock(cart_item.quantity)
+            # Create order items (one executemany)
+            for line in lines:
+                line['order_id'] = order.id
+            db.session.execute(insert(OrderItem), lines)
             
-            # Clear cart
-            CartItem.query.filter_by(cart_id=cart.id).delete()
+            # Clear cart (one statement)
+            CartItem.query.filter_by(cart_id=cart_id).delete(synchronize_session=False)
+            
+            # Follow-up work (metrics, ...) runs on background workers,
+            # committed atomically with the order through the outbox
+            publish('order.created', {
+                'order_id': order.id,
+                'order_number': order.order_number,
+                'user_id': user_id,
+                'total_amount': order.total_amount
+            })
+            
+            # Stock changed on every line; history and totals gained an order
+            invalidate('products', 'admin:stats', f'orders:user:{user_id}',
+                       *(f"product:{line['product_id']}" for line in lines))
             
             db.session.commit()
-            logger.info(f"Order created: {order.order_number}")
-            # Record metric
-            try:
-                from app.metrics import record_order
-                record_order(order.total_amount)
-            except:
-                pass
+            logger.info(f"Order created: {order.order_number} ({len(lines)} items, ${total_amount:.2f})")
             
             return order, None
             
@@ -69,12 +110,76 @@ class OrderService:
             return None, str(e)
     
     @staticmethod
-    def get_user_orders(user_id):
-        """Get all orders for a user"""
+    def encode_cursor(order):
+        """Opaque keyset cursor pointing after the given order (created_at may be NULL on old rows)"""
+        raw = f"{order.created_at.isoformat() if order.created_at else ''}|{order.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """Decode a keyset cursor into (created_at or None, id); raises ValueError if malformed"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, order_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+            return (datetime.fromisoformat(created_at) if created_at else None), int(order_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    @staticmethod
+    def page_limit(limit=None):
+        """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+        return max(1, min(limit or OrderService.DEFAULT_PAGE_SIZE, OrderService.MAX_PAGE_SIZE))
+    
+    @staticmethod
+    def user_orders_statement(user_id, limit, cursor=None, include_items=True):
+        """
+        SELECT for one page of a user's order history, newest first, plus one
+        extra row to tell whether another page exists. Keyset pagination on
+        (user_id, created_at, id); items for the whole page are loaded with a
+        single batched query. Raises ValueError for a malformed cursor.
+        """
+        stmt = select(Order).where(Order.user_id == user_id)
+        if cursor:
+            created_at, order_id = OrderService.decode_cursor(cursor)
+            # NULL created_at sorts last in a descending order (SQLite and MySQL)
+            if created_at is None:
+                stmt = stmt.where(Order.created_at.is_(None), Order.id < order_id)
+            else:
+                stmt = stmt.where(db.or_(
+                    Order.created_at < created_at,
+                    db.and_(Order.created_at == created_at, Order.id < order_id),
+                    Order.created_at.is_(None)
+                ))
+        if include_items:
+            stmt = stmt.options(selectinload(Order.items))
+        return stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+    
+    @staticmethod
+    def split_page(orders, limit):
+        """(orders on this page, next_cursor or None) from the limit + 1 fetched rows"""
+        if len(orders) > limit:
+            orders = orders[:limit]
+            return orders, OrderService.encode_cursor(orders[-1])
+        return orders, None
+    
+    @staticmethod
+    def get_user_orders_page(user_id, limit=None, cursor=None, include_items=True):
+        """
+        Get one page of a user's order history, newest first.
+        Returns ((orders, next_cursor), error).
+        """
         try:
-            orders = Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc()).all()
-            return orders, None
+            limit = OrderService.page_limit(limit)
+            stmt = OrderService.user_orders_statement(user_id, limit, cursor, include_items)
+            orders, next_cursor = OrderService.split_page(db.session.scalars(stmt).all(), limit)
+            
+            logger.info(f"📦 Retrieved {len(orders)} orders for user {user_id} (more: {next_cursor is not None}) → HTTP 200")
+            return (orders, next_cursor), None
+        except ValueError as e:
+            logger.warning(f"❌ Order history failed: {str(e)} (User: {user_id}) → HTTP 400")
+            return None, str(e)
         except Exception as e:
+            logger.error(f"💥 Error fetching orders: {str(e)} → HTTP 500")
             return None, str(e)
 
 
@@ -1,6 +1,7 @@
 import logging
 from app import db
 from app.models.product import Product
+from app.response_cache import invalidate
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,7 @@ class ProductService:
             )
             
             db.session.add(product)
+            invalidate('products', 'admin:stats')
             db.session.commit()
             
             logger.info(f"✅ Product created: '{name}' (ID: {product.id}, Price: ${price}, Stock: {stock_quantity}) → HTTP 201")
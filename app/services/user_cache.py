@@ -0,0 +1,204 @@
+"""
+User Identity Cache
+Bounded LRU of immutable user snapshots keyed by primary key, with a TTL.
+
+Snapshots are plain objects (no session, no lazy loading), so they are safe
+to share across requests and threads. Entries are dropped as soon as a User
+row is updated or deleted through the ORM in this process; other processes
+see the change once the TTL expires.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class UserSnapshot:
+    """Read-only copy of the public fields of a User (never the password hash)"""
+
+    __slots__ = ('id', 'username', 'email', 'full_name', 'is_admin', 'created_at', 'updated_at')
+
+    def __init__(self, id, username, email, full_name=None, is_admin=False, created_at=None, updated_at=None):
+        for name, value in zip(self.__slots__, (id, username, email, full_name, bool(is_admin), created_at, updated_at)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("UserSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("UserSnapshot is immutable")
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, user.full_name,
+                   user.is_admin, user.created_at, user.updated_at)
+
+    def to_dict(self):
+        """Same shape as User.to_dict()"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'full_name': self.full_name,
+            'is_admin': self.is_admin,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+
+class UserCache:
+    """
+    Thread-safe LRU with per-entry expiry.
+    A lookup that races with an invalidation does not store its (possibly stale) result.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()  # user id -> (expires at, snapshot)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                hit = False
+        self._record(hit)
+        return entry[1] if hit else None
+
+    def get_or_load(self, user_id, loader):
+        """Return a cached snapshot, or call loader(user_id) -> User and cache the result"""
+        if not self.enabled:
+            user = loader(user_id)
+            return UserSnapshot.from_user(user) if user else None
+
+        snapshot = self.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        generation = self._generation
+        user = loader(user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        self.put(snapshot, generation)
+        return snapshot
+
+    def put(self, snapshot, generation=None):
+        with self._lock:
+            # Skip if a user was invalidated while this one was being loaded
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[snapshot.id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _record(self, hit):
+        try:
+            from app.metrics import record_user_cache
+            total = self.hits + self.misses
+            record_user_cache(hit, len(self._entries), self.hits / total if total else 0.0)
+        except Exception:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _build_cache(maxsize=None, ttl=None):
+    if maxsize is None:
+        maxsize = int(os.getenv('USER_CACHE_SIZE', 10000))
+    if ttl is None:
+        ttl = float(os.getenv('USER_CACHE_TTL', 300))
+    return UserCache(maxsize, ttl)
+
+
+def init_user_cache(maxsize=None, ttl=None):
+    """
+    (Re)build the process-wide cache from arguments or environment:
+    USER_CACHE_SIZE (0 = disabled), USER_CACHE_TTL (seconds)
+    """
+    global _cache
+
+    cache = _build_cache(maxsize, ttl)
+    with _cache_lock:
+        _cache = cache
+    return cache
+
+
+def get_user_cache():
+    """Return the process-wide cache, creating it from the environment on first use"""
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _build_cache()
+    return _cache
+
+
+def _invalidate_user(mapper, connection, target):
+    # Drop now so this thread re-reads its own write, and again after commit
+    # so a concurrent reader cannot re-cache the pre-commit row
+    get_user_cache().invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('user_cache_invalidate', set()).add(target.id)
+
+
+event.listen(User, 'after_update', _invalidate_user)
+event.listen(User, 'after_delete', _invalidate_user)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    user_ids = session.info.pop('user_cache_invalidate', None)
+    if user_ids:
+        cache = get_user_cache()
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('user_cache_invalidate', None)
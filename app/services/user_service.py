@@ -1,12 +1,19 @@
 import logging
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models.user import User
 from app.models.cart import Cart
+from app.response_cache import invalidate
+from app.services.user_cache import get_user_cache
+from app.utils.passwords import PasswordHasherBusy
 
 logger = logging.getLogger(__name__)
 
 class UserService:
     
+    # Returned when the password hashing pool is saturated (routes map it to 503)
+    BUSY_ERROR = "Server busy, please retry"
+    
     @staticmethod
     def create_user(username, email, password, full_name=None):
         """Register a new user with validation"""
@@ -26,26 +33,15 @@ class UserService:
                 logger.warning(f"❌ Registration failed: Invalid email format ('{email}')")
                 return None, "Invalid email format"
             
-            # Check if username exists
-            if User.query.filter_by(username=username).first():
-                logger.warning(f"❌ Registration failed: Username '{username}' already exists (HTTP 400)")
-                return None, "Username already exists"
-            
-            # Check if email exists
-            if User.query.filter_by(email=email).first():
-                logger.warning(f"❌ Registration failed: Email '{email}' already registered (HTTP 400)")
-                return None, "Email already exists"
-            
-            # Create user
+            # Hash before touching the database so no transaction is held open meanwhile
             user = User(username=username, email=email, full_name=full_name)
             user.set_password(password)
             
+            # User and cart go in one flush / one commit; the unique constraints
+            # on username and email reject duplicates (no existence queries)
+            user.cart = Cart()
             db.session.add(user)
-            db.session.commit()
-            
-            # Create cart
-            cart = Cart(user_id=user.id)
-            db.session.add(cart)
+            invalidate('admin:stats')
             db.session.commit()
             
             logger.info(f"✅ User registered successfully: '{username}' (ID: {user.id}, Email: {email}) → HTTP 201")
@@ -59,11 +55,42 @@ class UserService:
             
             return user, None
             
+        except IntegrityError as e:
+            db.session.rollback()
+            field = UserService._duplicate_field(e)
+            if field == 'email':
+                logger.warning(f"❌ Registration failed: Email '{email}' already registered (HTTP 400)")
+                return None, "Email already exists"
+            if field == 'username':
+                logger.warning(f"❌ Registration failed: Username '{username}' already exists (HTTP 400)")
+                return None, "Username already exists"
+            logger.error(f"💥 Error creating user: {str(e)} → HTTP 500")
+            return None, str(e)
+        except PasswordHasherBusy:
+            db.session.rollback()
+            logger.warning(f"⏳ Registration rejected: password hashing pool saturated ('{username}') → HTTP 503")
+            return None, UserService.BUSY_ERROR
         except Exception as e:
             db.session.rollback()
             logger.error(f"💥 Error creating user: {str(e)} → HTTP 500")
             return None, str(e)
     
+    @staticmethod
+    def _duplicate_field(error):
+        """
+        Which unique column an IntegrityError is about ('username', 'email' or None).
+        SQLite: "UNIQUE constraint failed: users.email"
+        MySQL:  "Duplicate entry 'x' for key 'ix_users_email'"
+        """
+        message = str(getattr(error, 'orig', error))
+        if 'for key' in message:
+            # Only look at the key name - the duplicate value is user input
+            message = message.rsplit('for key', 1)[1]
+        for field in ('username', 'email'):
+            if field in message:
+                return field
+        return None
+    
     @staticmethod
     def authenticate_user(username, password):
         """Login user with detailed logging"""
@@ -90,6 +117,16 @@ class UserService:
                     pass
                 return None, "Invalid credentials"
             
+            # Transparently upgrade hashes made with an older method/cost
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                    logger.info(f"🔁 Password hash upgraded for user '{username}'")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning(f"⚠️ Could not upgrade password hash for '{username}': {str(e)}")
+            
             logger.info(f"✅ Login successful: '{username}' (ID: {user.id}) → HTTP 200")
             
             try:
@@ -100,15 +137,18 @@ class UserService:
             
             return user, None
             
+        except PasswordHasherBusy:
+            logger.warning(f"⏳ Login rejected: password hashing pool saturated ('{username}') → HTTP 503")
+            return None, UserService.BUSY_ERROR
         except Exception as e:
             logger.error(f"💥 Server error during login: {str(e)} → HTTP 500")
             return None, str(e)
     
     @staticmethod
     def get_user_by_id(user_id):
-        """Get user by ID"""
+        """Get a user snapshot by ID (served from the user cache when possible)"""
         try:
-            user = User.query.get(user_id)
+            user = get_user_cache().get_or_load(user_id, lambda pk: db.session.get(User, pk))
             if not user:
                 logger.warning(f"❌ User not found: ID {user_id} → HTTP 404")
                 return None, "User not found"
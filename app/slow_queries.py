@@ -0,0 +1,204 @@
+"""
+Slow Query Log
+Times every SQL statement with engine events. Statements slower than
+SLOW_QUERY_MS are logged with normalized SQL, bound-parameter shapes, the app
+function that issued them and the request id, and kept in a bounded ring.
+The first slow run of each statement shape also captures its plan
+(EXPLAIN QUERY PLAN on SQLite, EXPLAIN on MySQL) - except on streaming
+cursors, whose unread rows the extra command would discard.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),  # string literals
+    (re.compile(r'%\(\w+\)s|%s|(?<![:\w]):\w+'), '?'),  # pyformat / format / named placeholders
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),  # numbers
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?)'),  # IN (?, ?, ?) / VALUES (?, ?)
+    (re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+'), '(?), ...'),  # multi-row VALUES
+]
+
+
+def normalize_sql(statement):
+    """Statement shape: literals and placeholders become ?, lists collapse"""
+    for pattern, replacement in _LITERALS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def parameter_shape(parameters, executemany=False):
+    """Types of the bound parameters, never their values"""
+    if executemany and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+
+def find_caller():
+    """Innermost app function outside the database plumbing, e.g. 'OrderService.create_order (order_service.py:88)'"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('app.') and module not in (__name__, 'app.database'):
+            code = frame.f_code
+            return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Recent slow statements (ring) plus per-shape totals and plans (LRU-bounded)"""
+
+    def __init__(self, threshold=0.2, size=200, max_shapes=500, explain=True):
+        self.threshold = threshold
+        self.explain = explain
+        self.max_shapes = max_shapes
+        self.recent = deque(maxlen=size)
+        self._shapes = OrderedDict()  # normalized SQL -> stats and plan
+        self._lock = threading.Lock()
+
+    def record(self, conn, cursor, statement, parameters, executemany, duration, streaming=False):
+        sql = normalize_sql(statement)
+        entry = {
+            'at': datetime.utcnow().isoformat(),
+            'duration_ms': round(duration * 1000, 2),
+            'sql': sql,
+            'params': parameter_shape(parameters, executemany),
+            'rows': cursor.rowcount if cursor.rowcount >= 0 else None,
+            'caller': find_caller(),
+            'request_id': g.get('request_id') if has_request_context() else None,
+            'engine': getattr(conn.engine.pool, 'metrics_label', 'primary')
+        }
+
+        with self._lock:
+            self.recent.append(entry)
+            shape = self._shapes.get(sql)
+            if shape is None:
+                shape = self._shapes[sql] = {'sql': sql, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'plan': None}
+                if len(self._shapes) > self.max_shapes:
+                    self._shapes.popitem(last=False)
+            else:
+                self._shapes.move_to_end(sql)
+            # A streaming (server-side) cursor still has unread rows on this connection:
+            # another command would make the driver discard them, so wait for a buffered run
+            needs_plan = self.explain and shape['plan'] is None and not streaming
+            if needs_plan:
+                shape['plan'] = []  # claimed, so concurrent runs don't explain it too
+            shape['count'] += 1
+            shape['total_ms'] += entry['duration_ms']
+            shape['max_ms'] = max(shape['max_ms'], entry['duration_ms'])
+            shape['last_caller'] = entry['caller']
+
+        if needs_plan:
+            shape['plan'] = explain(conn, statement, parameters[0] if executemany and parameters else parameters)
+
+        logger.warning(
+            f"🐢 Slow query {entry['duration_ms']:.1f}ms in {entry['caller'] or 'unknown'} "
+            f"(request {entry['request_id'] or '-'}): {sql} params={entry['params']}"
+        )
+        try:
+            from app.metrics import record_slow_query
+            record_slow_query(entry['engine'], sql.split(' ', 1)[0].upper(), duration)
+        except Exception:
+            pass
+
+    def snapshot(self, limit=50):
+        with self._lock:
+            recent = list(self.recent)[-limit:][::-1]
+            shapes = sorted((dict(shape) for shape in self._shapes.values()), key=lambda s: s['total_ms'], reverse=True)
+        return recent, shapes[:limit]
+
+    def clear(self):
+        with self._lock:
+            self.recent.clear()
+            self._shapes.clear()
+
+
+def explain(conn, statement, parameters):
+    """
+    Plan rows for one statement, run on the same DBAPI connection (no events
+    fire). Only safe once the statement's rows are buffered - never while a
+    server-side cursor is open on the connection.
+    """
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters or ())
+        columns = [column[0] for column in cursor.description or ()]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    except Exception as e:
+        return [{'error': str(e)}]
+    finally:
+        cursor.close()
+
+
+_log = None
+
+
+def get_slow_query_log():
+    return _log
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _log is not None and context is not None:
+        context._slow_query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _check_duration(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_slow_query_started', None)
+    if started is None or _log is None:
+        return
+    duration = time.perf_counter() - started
+    if duration >= _log.threshold:
+        options = context.execution_options
+        streaming = bool(options.get('stream_results') or options.get('yield_per')
+                         or getattr(context, '_is_server_side', False))
+        try:
+            _log.record(conn, cursor, statement, parameters, executemany, duration, streaming)
+        except Exception as e:
+            logger.error(f"❌ Could not record slow query: {str(e)}")
+
+
+def init_slow_query_log(app):
+    """
+    Enable the slow query log from the environment:
+    SLOW_QUERY_LOG_ENABLED, SLOW_QUERY_MS (threshold), SLOW_QUERY_EXPLAIN
+    (capture plans), SLOW_QUERY_BUFFER (recent entries kept),
+    SLOW_QUERY_MAX_SHAPES (distinct statements tracked)
+    """
+    global _log
+
+    if os.getenv('SLOW_QUERY_LOG_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        _log = None
+        return None
+
+    _log = SlowQueryLog(
+        threshold=float(os.getenv('SLOW_QUERY_MS', 200)) / 1000.0,
+        size=int(os.getenv('SLOW_QUERY_BUFFER', 200)),
+        max_shapes=int(os.getenv('SLOW_QUERY_MAX_SHAPES', 500)),
+        explain=os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() in ('1', 'true', 'yes')
+    )
+    app.extensions['slow_query_log'] = _log
+    logger.info(f"🐢 Slow query log enabled (≥ {_log.threshold * 1000:.0f}ms)")
+    return _log
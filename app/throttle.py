@@ -0,0 +1,239 @@
+"""
+Login Throttling
+Sliding-window attempt counters per username and per client IP, checked
+before any database or password hashing work.
+
+Backends:
+- memory (default): per-process bucketed counters with time-based eviction
+- redis: shared sorted-set sliding log so limits apply across workers
+"""
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding-window counter.
+    The window is split into `buckets` slots; each key keeps only the index of
+    its newest slot and a tiny array of per-slot counts. Keys are kept in order
+    of last activity, so the key cap evicts the least recently hit key in O(1).
+    """
+
+    def __init__(self, window_seconds, buckets=6, max_keys=100000):
+        self.window = window_seconds
+        self.buckets = buckets
+        self.slot_width = window_seconds / buckets
+        self.max_keys = max_keys
+
+        self._entries = OrderedDict()  # key -> [newest slot, array of counts], least recently hit first
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+
+    def _slot(self, now):
+        return int(now / self.slot_width)
+
+    def _advance(self, entry, slot):
+        """Zero the slots that fell out of the window since the key was last touched"""
+        newest, counts = entry
+        if slot - newest >= self.buckets:
+            for i in range(self.buckets):
+                counts[i] = 0
+        else:
+            for s in range(newest + 1, slot + 1):
+                counts[s % self.buckets] = 0
+        entry[0] = slot
+
+    def hit(self, key, now=None):
+        """Count one event for key and return the count within the window"""
+        now = time.time() if now is None else now
+        slot = self._slot(now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [slot, array('I', [0] * self.buckets)]
+                if len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+                if entry[0] != slot:
+                    self._advance(entry, slot)
+            entry[1][slot % self.buckets] += 1
+            total = sum(entry[1])
+
+            if now >= self._next_sweep:
+                self._sweep(slot)
+                self._next_sweep = now + self.window
+        return total
+
+    def count(self, key, now=None):
+        now = time.time() if now is None else now
+        slot = self._slot(now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0
+            if entry[0] != slot:
+                self._advance(entry, slot)
+            return sum(entry[1])
+
+    def reset(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _sweep(self, slot):
+        """Drop keys with no events inside the window (runs once per window)"""
+        expired = [key for key, (newest, _) in self._entries.items() if slot - newest >= self.buckets]
+        for key in expired:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MemoryThrottleBackend:
+    """Per-process counters"""
+
+    def __init__(self, window_seconds, max_keys=100000):
+        self.window = window_seconds
+        self.counter = SlidingWindowCounter(window_seconds, max_keys=max_keys)
+
+    def hit(self, key):
+        return self.counter.hit(key)
+
+    def reset(self, key):
+        self.counter.reset(key)
+
+    def retry_after(self, key):
+        return self.counter.slot_width
+
+    def size(self):
+        return len(self.counter)
+
+
+class RedisThrottleBackend:
+    """
+    Shared sliding log in Redis (one sorted set per key, scored by time).
+    Falls back to in-memory counting if Redis is unreachable so logins keep working.
+    """
+
+    def __init__(self, url, window_seconds, prefix='login_throttle:'):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.window = window_seconds
+        self.prefix = prefix
+        self.fallback = MemoryThrottleBackend(window_seconds)
+
+    def hit(self, key):
+        now = time.time()
+        redis_key = self.prefix + key
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.zremrangebyscore(redis_key, 0, now - self.window)
+            pipe.zadd(redis_key, {f'{now}:{uuid.uuid4().hex[:8]}': now})
+            pipe.zcard(redis_key)
+            pipe.expire(redis_key, int(math.ceil(self.window)))
+            return pipe.execute()[2]
+        except Exception as e:
+            logger.warning(f"⚠️ Login throttle Redis unavailable, counting locally: {str(e)}")
+            return self.fallback.hit(key)
+
+    def reset(self, key):
+        self.fallback.reset(key)
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception:
+            pass
+
+    def retry_after(self, key):
+        try:
+            oldest = self.client.zrange(self.prefix + key, 0, 0, withscores=True)
+            if oldest:
+                return max(1.0, oldest[0][1] + self.window - time.time())
+        except Exception:
+            pass
+        return self.fallback.retry_after(key)
+
+    def size(self):
+        return self.fallback.size()
+
+
+class LoginThrottle:
+    """
+    Limits login attempts per username and per client IP within a sliding window.
+    Every attempt counts; a successful login clears the username's counter.
+    """
+
+    def __init__(self, backend, user_limit=10, ip_limit=100):
+        self.backend = backend
+        self.user_limit = user_limit
+        self.ip_limit = ip_limit
+
+    def check(self, username, client_ip):
+        """
+        Record an attempt. Returns None if allowed, otherwise the number of
+        seconds the client should wait before retrying.
+        """
+        checks = [('ip', f'ip:{client_ip}', self.ip_limit)]
+        if username:
+            checks.append(('user', f'user:{str(username).lower()}', self.user_limit))
+
+        for scope, key, limit in checks:
+            if self.backend.hit(key) > limit:
+                try:
+                    from app.metrics import record_login_throttled
+                    record_login_throttled(scope, self.backend.size())
+                except Exception:
+                    pass
+                return self.backend.retry_after(key)
+        return None
+
+    def reset_user(self, username):
+        self.backend.reset(f'user:{str(username).lower()}')
+
+
+def get_login_throttle():
+    """Login throttle for this app (None when disabled)"""
+    from flask import current_app
+    return current_app.extensions.get('login_throttle')
+
+
+def init_login_throttle(app):
+    """
+    Configure login throttling from environment:
+    LOGIN_THROTTLE_ENABLED, LOGIN_THROTTLE_WINDOW (seconds),
+    LOGIN_THROTTLE_USER_LIMIT, LOGIN_THROTTLE_IP_LIMIT,
+    LOGIN_THROTTLE_BACKEND (memory or redis), LOGIN_THROTTLE_REDIS_URL
+    """
+    if os.getenv('LOGIN_THROTTLE_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        app.extensions['login_throttle'] = None
+        logger.info("ℹ️  Login throttling disabled")
+        return None
+
+    window = float(os.getenv('LOGIN_THROTTLE_WINDOW', 60))
+    backend_name = os.getenv('LOGIN_THROTTLE_BACKEND', 'memory').lower()
+
+    backend = None
+    if backend_name == 'redis':
+        try:
+            backend = RedisThrottleBackend(os.getenv('LOGIN_THROTTLE_REDIS_URL', 'redis://localhost:6379/0'), window)
+            logger.info("✅ Login throttling using shared Redis backend")
+        except ImportError:
+            logger.warning("⚠️ redis package not installed - login throttling falls back to in-memory counters")
+    if backend is None:
+        backend = MemoryThrottleBackend(window)
+
+    throttle = LoginThrottle(
+        backend,
+        user_limit=int(os.getenv('LOGIN_THROTTLE_USER_LIMIT', 10)),
+        ip_limit=int(os.getenv('LOGIN_THROTTLE_IP_LIMIT', 100))
+    )
+    app.extensions['login_throttle'] = throttle
+    return throttle
@@ -1,17 +1,17 @@
 """
 OpenTelemetry Distributed Tracing
 Tracks request flow through the application
+
+OpenTelemetry is only imported once the collector is known to be reachable,
+so apps without tracing do not pay its import cost.
 """
 import logging
+import os
 import socket
-from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
 
 logger = logging.getLogger(__name__)
 
-def check_port_open(host, port, timeout=2):
+def check_port_open(host, port, timeout=0.2):
     """Check if a port is open and accepting connections"""
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -26,14 +26,25 @@ def init_tracing(app, db_engine):
     """
     Initialize OpenTelemetry tracing (optional - only if Tempo is available)
     """
+    if os.getenv('TRACING_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        logger.info("ℹ️  Tracing disabled (TRACING_ENABLED=false)")
+        return None
+    
+    host = os.getenv('TRACING_HOST', 'localhost')
+    port = int(os.getenv('TRACING_PORT', 4317))
+    
     try:
         # Check if Tempo is running
-        if not check_port_open('localhost', 4317):
+        if not check_port_open(host, port, float(os.getenv('TRACING_PROBE_TIMEOUT', 0.2))):
             logger.info("ℹ️  Tempo not available - running without distributed tracing")
             logger.info("   To enable tracing: cd monitoring && docker-compose up -d")
             return None
         
         # Tempo is available, proceed with tracing setup
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.resources import Resource, SERVICE_NAME
         from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
         from opentelemetry.instrumentation.flask import FlaskInstrumentor
         from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
@@ -49,7 +60,7 @@ def init_tracing(app, db_engine):
         
         # Export traces to Tempo via OTLP
         otlp_exporter = OTLPSpanExporter(
-            endpoint="http://localhost:4317",
+            endpoint=f"http://{host}:{port}",
             insecure=True
         )
         span_processor = SimpleSpanProcessor(otlp_exporter)
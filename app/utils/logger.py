@@ -1,8 +1,12 @@
 import logging
 import os
 import sys
+import threading
 from datetime import datetime
 
+_configured = False
+_configure_lock = threading.Lock()
+
 def setup_logging():
     """Configure logging for the application"""
     log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
@@ -50,4 +54,77 @@ def setup_logging():
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
     logging.getLogger('sqlalchemy').setLevel(logging.WARNING)
     
-    logging.info(f"Logging configured with level: {log_level}")
\ No newline at end of file
+    logging.info(f"Logging configured with level: {log_level}")
+
+
+def configure_logging():
+    """
+    Application logging: human-readable app.log, JSON app_json.log (Grafana/Loki)
+    and console, plus request ids on every record. The files go in LOG_DIR
+    (default logs/; empty for console only).
+    Idempotent - safe to call from every create_app(); files are opened on first write.
+    """
+    global _configured
+
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+
+        from pythonjsonlogger import jsonlogger
+
+        # Human-readable formatter (with emojis)
+        human_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+        # JSON formatter (for Grafana/Loki)
+        json_formatter = jsonlogger.JsonFormatter(
+            '%(asctime)s %(levelname)s %(name)s %(message)s',
+            rename_fields={'asctime': 'timestamp', 'levelname': 'level', 'name': 'logger'}
+        )
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(human_formatter)
+        console_handler.setLevel(logging.INFO)
+        handlers = [console_handler]
+
+        log_dir = os.getenv('LOG_DIR', 'logs')
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+            human_file_handler = logging.FileHandler(os.path.join(log_dir, 'app.log'), delay=True)
+            human_file_handler.setFormatter(human_formatter)
+            human_file_handler.setLevel(logging.INFO)
+
+            json_file_handler = logging.FileHandler(os.path.join(log_dir, 'app_json.log'), delay=True)
+            json_file_handler.setFormatter(json_formatter)
+            json_file_handler.setLevel(logging.INFO)
+
+            handlers = [human_file_handler, json_file_handler, console_handler]
+
+        logging.basicConfig(level=logging.INFO, handlers=handlers, force=True)
+
+        # Reduce Flask noise
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+        _install_request_id_factory()
+
+    logging.getLogger('app').info("✅ Logging system initialized with JSON support")
+
+
+def _install_request_id_factory():
+    """Inject the Flask request id into all log records (as taskName)"""
+    from flask import g
+
+    old_factory = logging.getLogRecordFactory()
+
+    def record_factory(*args, **kwargs):
+        record = old_factory(*args, **kwargs)
+        try:
+            # Try to get request_id from Flask context
+            record.taskName = g.get('request_id')
+        except RuntimeError:
+            # Outside request context (e.g., during startup)
+            record.taskName = None
+        return record
+
+    logging.setLogRecordFactory(record_factory)
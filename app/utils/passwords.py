@@ -0,0 +1,205 @@
+"""
+Password hashing on a bounded process pool
+Keeps PBKDF2/scrypt work off request threads so a login storm cannot
+hold the GIL and stall every other request in the process.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HASH_METHOD = 'scrypt'
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout"""
+
+
+def normalize_method(method):
+    """
+    Expand a werkzeug method string with its defaults so it can be compared
+    with the prefix of a stored hash ('scrypt' -> 'scrypt:32768:8:1')
+    """
+    parts = method.split(':')
+    if parts[0] == 'scrypt':
+        defaults = ['32768', '8', '1']
+    elif parts[0] == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    values = parts[1:] + defaults[len(parts) - 1:]
+    return ':'.join([parts[0]] + values[:len(defaults)])
+
+
+def _watch_parent(parent_pid):
+    """Pool worker initializer: exit once the process that forked us is gone"""
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1.0)
+        os._exit(0)
+
+    threading.Thread(target=watch, name='parent-watch', daemon=True).start()
+
+
+class PasswordHasher:
+    """
+    Runs hash/verify calls on a small process pool.
+    At most `max_concurrency` calls may be running or queued; callers wait up
+    to `queue_timeout` seconds for a slot and then get PasswordHasherBusy.
+    """
+
+    def __init__(self, workers=1, max_concurrency=4, queue_timeout=2.0, method=DEFAULT_HASH_METHOD):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.method = method
+        self.method_prefix = normalize_method(method)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def start(self):
+        """
+        Start the pool now. Workers are forked, so call this before the
+        process starts other threads (create_app does, and so does each
+        server worker after fork).
+        """
+        executor = self._get_executor()
+        if executor is not None:
+            # Forks all pool workers immediately instead of on first login
+            executor.submit(os.getpid).result()
+            logger.info(f"🔐 Password hashing pool started ({self.workers} processes, method {self.method_prefix})")
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
+
+    def _get_executor(self):
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            # A pool inherited across fork belongs to the parent - build our own
+            if self._executor is None or self._pid != os.getpid():
+                # Workers inherit their own queue's write end, so they never see
+                # EOF if this process is killed - they watch for that instead
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('fork'),
+                    initializer=_watch_parent,
+                    initargs=(os.getpid(),)
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, operation, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            try:
+                from app.metrics import record_password_hash_rejected
+                record_password_hash_rejected(operation)
+            except Exception:
+                pass
+            raise PasswordHasherBusy("Password hashing is saturated")
+
+        started = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return func(*args)
+            try:
+                return executor.submit(func, *args).result()
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM killed) - replace the pool and retry once
+                logger.warning("⚠️ Password hashing pool broken - restarting")
+                self.shutdown()
+                return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+            try:
+                from app.metrics import record_password_hash
+                record_password_hash(operation, time.perf_counter() - started)
+            except Exception:
+                pass
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run('hash', generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run('verify', check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the stored hash was made with a different method or cost"""
+        return password_hash.split('$', 1)[0] != self.method_prefix
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def _build_hasher(workers=None, max_concurrency=None, queue_timeout=None, method=None):
+    if workers is None:
+        workers = int(os.getenv('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    if workers > 0 and 'fork' not in multiprocessing.get_all_start_methods():
+        logger.warning("⚠️ Process pool hashing needs fork() - hashing passwords inline")
+        workers = 0
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv('PASSWORD_HASH_MAX_CONCURRENCY', max(workers, 1) * 4))
+    if queue_timeout is None:
+        queue_timeout = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 2.0))
+    if method is None:
+        method = os.getenv('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD)
+    return PasswordHasher(workers, max_concurrency, queue_timeout, method)
+
+
+def init_password_hasher(workers=None, max_concurrency=None, queue_timeout=None, method=None, start=True):
+    """
+    (Re)build the process-wide hasher from arguments or environment:
+    PASSWORD_HASH_WORKERS (0 = hash inline), PASSWORD_HASH_MAX_CONCURRENCY,
+    PASSWORD_HASH_QUEUE_TIMEOUT, PASSWORD_HASH_METHOD
+    """
+    global _hasher
+
+    hasher = _build_hasher(workers, max_concurrency, queue_timeout, method)
+    with _hasher_lock:
+        if _hasher is not None:
+            _hasher.shutdown()
+        _hasher = hasher
+
+    if start:
+        hasher.start()
+    return hasher
+
+
+def get_password_hasher():
+    """Return the process-wide hasher, creating it from the environment on first use"""
+    global _hasher
+
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = _build_hasher()
+    return _hasher
+
+
+def hash_password(password):
+    return get_password_hasher().hash(password)
+
+
+def verify_password(password_hash, password):
+    return get_password_hasher().verify(password_hash, password)
+
+
+def password_needs_rehash(password_hash):
+    return get_password_hasher().needs_rehash(password_hash)
@@ -0,0 +1,11 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py app.wsgi:app    (or: python serve.py)
+
+With a preloaded app (APP_PRELOAD=true) the server calls init_worker(app)
+in each worker after fork; otherwise create_app() does it.
+"""
+from app import create_app
+
+app = create_app()
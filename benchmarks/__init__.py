@@ -0,0 +1 @@
+# Benchmarks package (run from the project root: python -m benchmarks.<name>)
@@ -0,0 +1,191 @@
+"""
+ASGI vs WSGI concurrency per core
+Runs the hot read endpoints on one gunicorn gthread worker (WSGI) and on one
+uvicorn worker (ASGI, async database driver) against the same seeded
+database, and reports throughput and latency at increasing client concurrency.
+
+Run: python -m benchmarks.bench_asgi [--concurrency 8,64,256] [--duration 10] [--threads 8]
+MySQL (network round-trips are where async pays off):
+    DATABASE_TYPE=mysql MYSQL_DATABASE=bench_db python -m benchmarks.bench_asgi
+The client runs on the same machine; on a single core it competes with the server.
+"""
+import argparse
+import http.client
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from benchmarks.common import create_bench_app, summarize, print_table, save_results
+from benchmarks.loadtest import free_port
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(db, args):
+    from app.models import User, Product, Order, OrderItem
+
+    now = datetime.utcnow()
+    session = db.session
+    session.execute(insert(User), [{'id': 1, 'username': 'asgi', 'email': 'asgi@example.com', 'password_hash': 'x'}])
+    session.execute(insert(Product), [
+        {'id': i, 'name': f'ASGI Product {i}', 'price': 9.99, 'stock_quantity': 100, 'category': 'Bench'}
+        for i in range(1, args.products + 1)
+    ])
+    session.execute(insert(Order), [
+        {'id': i, 'user_id': 1, 'order_number': f'ASGI-{i}', 'total_amount': 9.99,
+         'status': 'pending', 'created_at': now - timedelta(minutes=i)}
+        for i in range(1, args.orders + 1)
+    ])
+    session.execute(insert(OrderItem), [
+        {'order_id': i, 'product_id': 1, 'product_name': 'ASGI Product 1', 'quantity': 1,
+         'price_at_purchase': 9.99, 'subtotal': 9.99}
+        for i in range(1, args.orders + 1)
+    ])
+    session.commit()
+
+
+def start_server(kind, workdir, args):
+    """One serving process - the unit of 'per core'"""
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(port),
+        'PYTHONPATH': PROJECT_ROOT + os.pathsep + env.get('PYTHONPATH', ''),
+        'JOB_WORKERS': '0',
+        'ACTIVE_USERS_ENABLED': 'false',
+        'WEB_CONCURRENCY': '1',
+        'GUNICORN_THREADS': str(args.threads),
+        'GUNICORN_MAX_REQUESTS': '0',
+        'GUNICORN_ACCESS_LOG': '',
+        'GUNICORN_PIDFILE': os.path.join(workdir, f'{kind}.pid'),
+        'PROMETHEUS_MULTIPROC_DIR': os.path.join(workdir, 'prometheus'),
+    })
+    if kind == 'wsgi':
+        command = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(PROJECT_ROOT, 'gunicorn.conf.py'), 'app.wsgi:app']
+    else:
+        env.pop('PROMETHEUS_MULTIPROC_DIR')
+        command = [sys.executable, '-m', 'uvicorn', 'app.asgi:app', '--port', str(port),
+                   '--workers', '1', '--no-access-log', '--log-level', 'warning']
+
+    log = open(os.path.join(workdir, f'{kind}.out'), 'w')
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{kind} server exited during startup - see {log.name}")
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1).close()
+            return process, port
+        except Exception:
+            time.sleep(0.25)
+    process.terminate()
+    raise SystemExit(f"{kind} server did not become healthy within 60s")
+
+
+def run_level(port, concurrency, args, token):
+    """`concurrency` keep-alive clients issuing requests back to back for args.duration seconds"""
+    paths = [
+        ('products', lambda rng: '/api/products'),
+        ('product', lambda rng: f'/api/products/{rng.randint(1, args.products)}'),
+        ('orders', lambda rng: '/api/orders/user/1?limit=20'),
+    ]
+    headers = {'Authorization': f'Bearer {token}'}
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        samples, failed = [], 0
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.perf_counter() < stop_at:
+            _, path = paths[rng.randrange(len(paths))]
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path(rng), headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except Exception:
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            samples.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            latencies.extend(samples)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(latencies)
+    return {
+        'concurrency': concurrency,
+        'requests': stats['n'],
+        'errors': errors[0],
+        'req_per_sec': stats['n'] / elapsed,
+        'p50_ms': stats['p50_ms'],
+        'p95_ms': stats['p95_ms'],
+        'p99_ms': stats['p99_ms']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare one ASGI worker with one WSGI worker')
+    parser.add_argument('--concurrency', default='8,64,256', help='Comma-separated client counts')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads in the WSGI worker')
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-asgi-')
+    db_path = os.path.join(workdir, 'bench.db')
+    app = create_bench_app(db_path, ACTIVE_USERS_ENABLED='false')
+    from app import db
+    from app.auth import issue_token
+    from app.models import User
+    with app.app_context():
+        seed(db, args)
+        token = issue_token(db.session.get(User, 1))
+    os.environ['SQLITE_DB_PATH'] = db_path
+
+    levels = [int(value) for value in args.concurrency.split(',')]
+    rows = []
+    for kind in ('wsgi', 'asgi'):
+        process, port = start_server(kind, workdir, args)
+        try:
+            run_level(port, min(levels), args, token)  # warm up pools and caches
+            for concurrency in levels:
+                row = run_level(port, concurrency, args, token)
+                rows.append({'server': kind, **row})
+                print(f"{kind} c={concurrency}: {row['req_per_sec']:.0f} req/s, p99 {row['p99_ms']:.1f} ms")
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(f"\n⚡ One worker process each (WSGI: gthread x {args.threads}; ASGI: uvicorn + async driver)\n")
+    print_table(rows, ['server', 'concurrency', 'requests', 'errors', 'req_per_sec', 'p50_ms', 'p95_ms', 'p99_ms'])
+
+    if args.json:
+        save_results(args.json, 'asgi', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Checkout latency vs. cart size
+Run: python -m benchmarks.bench_checkout [--sizes 1,10,50] [--iterations 30] [--json out.json]
+"""
+import argparse
+import time
+from benchmarks.common import create_bench_app, QueryCounter, summarize, print_table, save_results
+
+
+def seed(db, product_count):
+    """Create one shopper with a cart and enough well-stocked products"""
+    from app.models import User, Product, Cart
+
+    user = User(username='bench', email='bench@example.com')
+    user.password_hash = 'not-used'
+    user.cart = Cart()
+    db.session.add(user)
+    db.session.add_all([
+        Product(name=f'Bench Product {i}', price=1.0 + (i % 50), stock_quantity=10 ** 9, category='Bench')
+        for i in range(product_count)
+    ])
+    db.session.commit()
+    return user.id, user.cart.id
+
+
+def fill_cart(db, cart_id, size):
+    from app.models import CartItem
+    db.session.execute(CartItem.__table__.insert(), [
+        {'cart_id': cart_id, 'product_id': product_id, 'quantity': 1 + product_id % 3}
+        for product_id in range(1, size + 1)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OrderService.create_order against cart size')
+    parser.add_argument('--sizes', default='1,5,10,25,50,100', help='Comma separated cart sizes')
+    parser.add_argument('--iterations', type=int, default=30, help='Checkouts per cart size')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    app = create_bench_app()
+    from app import db
+    from app.services.order_service import OrderService
+
+    rows = []
+    with app.app_context():
+        user_id, cart_id = seed(db, max(sizes))
+        counter = QueryCounter(db.engine)
+
+        for size in sizes:
+            samples = []
+            queries = 0
+            for _ in range(args.iterations):
+                fill_cart(db, cart_id, size)
+                db.session.expire_all()
+                counter.reset()
+
+                started = time.perf_counter()
+                order, error = OrderService.create_order(user_id, 'Benchmark Street 1')
+                samples.append(time.perf_counter() - started)
+                queries += counter.reset()
+
+                if error:
+                    raise SystemExit(f"Checkout failed: {error}")
+
+            stats = summarize(samples)
+            rows.append({
+                'cart_size': size,
+                **stats,
+                'ms_per_line': stats['p50_ms'] / size,
+                'queries': queries / args.iterations
+            })
+
+    print_table(rows, ['cart_size', 'p50_ms', 'p95_ms', 'mean_ms', 'ms_per_line', 'queries'])
+
+    if args.json:
+        save_results(args.json, 'checkout', rows)
+
+
+if __name__ == '__main__':
+    main()
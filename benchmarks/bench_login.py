@@ -0,0 +1,107 @@
+"""
+Login throughput while other endpoints are under load
+Compares inline password hashing with the hashing process pool.
+Run: python -m benchmarks.bench_login [--duration 10] [--login-threads 8] [--browse-threads 4]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from benchmarks.common import create_bench_app, summarize, print_table, save_results
+
+
+def run_mode(app, mode, workers, args):
+    from app.utils.passwords import init_password_hasher
+
+    # Rebuild the hasher before any load threads exist (the pool forks)
+    init_password_hasher(workers=0 if mode == 'inline' else workers,
+                         max_concurrency=args.max_concurrency)
+
+    lock = threading.Lock()
+    logins, browses, rejected = [], [], [0]
+    deadline = time.perf_counter() + args.duration
+
+    def login_loop(index):
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = client.post('/api/users/login', json={
+                'username': f'bench{index % args.users}', 'password': 'bench-password'
+            })
+            elapsed = time.perf_counter() - started
+            with lock:
+                if response.status_code == 200:
+                    logins.append(elapsed)
+                else:
+                    rejected[0] += 1
+
+    def browse_loop():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get('/api/products')
+            elapsed = time.perf_counter() - started
+            with lock:
+                browses.append(elapsed)
+
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(args.login_threads)]
+    threads += [threading.Thread(target=browse_loop) for _ in range(args.browse_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    login_stats = summarize(logins)
+    browse_stats = summarize(browses)
+    return {
+        'mode': mode if mode == 'inline' else f'pool({workers})',
+        'logins_per_s': len(logins) / args.duration,
+        'login_p50_ms': login_stats['p50_ms'],
+        'login_p95_ms': login_stats['p95_ms'],
+        'rejected': rejected[0],
+        'browse_per_s': len(browses) / args.duration,
+        'browse_p50_ms': browse_stats['p50_ms'],
+        'browse_p99_ms': browse_stats['p99_ms']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark login throughput under mixed load')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per mode')
+    parser.add_argument('--login-threads', type=int, default=8)
+    parser.add_argument('--browse-threads', type=int, default=4)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--pool-workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--max-concurrency', type=int, default=64)
+    parser.add_argument('--modes', default='inline,pool', help='inline, pool or both')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-login-')
+    # Repeated logins for the same users would otherwise be throttled
+    app = create_bench_app(os.path.join(workdir, 'bench.db'), LOGIN_THROTTLE_ENABLED='0')
+    from app import db
+    from app.models import Product
+    from app.services.user_service import UserService
+
+    with app.app_context():
+        for i in range(args.users):
+            UserService.create_user(f'bench{i}', f'bench{i}@example.com', 'bench-password')
+        db.session.add_all([
+            Product(name=f'Bench Product {i}', price=9.99, stock_quantity=100, category='Bench')
+            for i in range(args.products)
+        ])
+        db.session.commit()
+
+    rows = [run_mode(app, mode, args.pool_workers, args) for mode in args.modes.split(',')]
+    print_table(rows, ['mode', 'logins_per_s', 'login_p50_ms', 'login_p95_ms', 'rejected',
+                       'browse_per_s', 'browse_p50_ms', 'browse_p99_ms'])
+
+    if args.json:
+        save_results(args.json, 'login', rows)
+
+
+if __name__ == '__main__':
+    main()
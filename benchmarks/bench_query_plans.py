@@ -0,0 +1,140 @@
+"""
+Query plans for the hot paths before and after migration 0002
+Seeds a database, drops the hot-path indexes (as on a database created before
+the migration existed), prints plans and timings, applies the migration and
+prints them again.
+
+Run: python -m benchmarks.bench_query_plans [--users 2000] [--orders 20000]
+MySQL: DATABASE_TYPE=mysql MYSQL_DATABASE=bench_db python -m benchmarks.bench_query_plans
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, text
+from benchmarks.common import create_bench_app, summarize, print_table, save_results
+
+
+def seed(db, args):
+    from app.models import User, Product, Cart, CartItem, Order, OrderItem
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    session = db.session
+
+    session.execute(insert(User), [
+        {'id': i, 'username': f'plan{i}', 'email': f'plan{i}@example.com', 'password_hash': 'x'}
+        for i in range(1, args.users + 1)
+    ])
+    session.execute(insert(Product), [
+        {'id': i, 'name': f'Plan Product {i}', 'price': 9.99, 'stock_quantity': 100,
+         'category': 'Bench', 'is_active': rng.random() > 0.1}
+        for i in range(1, args.products + 1)
+    ])
+    session.execute(insert(Cart), [{'id': i, 'user_id': i} for i in range(1, args.users + 1)])
+    session.execute(insert(CartItem), [
+        {'cart_id': rng.randint(1, args.users), 'product_id': rng.randint(1, args.products), 'quantity': 1}
+        for _ in range(args.cart_items)
+    ])
+    session.execute(insert(Order), [
+        {'id': i, 'user_id': rng.randint(1, args.users), 'order_number': f'PLAN-{i}',
+         'total_amount': 9.99, 'status': 'pending', 'created_at': now - timedelta(minutes=i)}
+        for i in range(1, args.orders + 1)
+    ])
+    session.execute(insert(OrderItem), [
+        {'order_id': rng.randint(1, args.orders), 'product_id': rng.randint(1, args.products),
+         'product_name': 'Plan Product', 'quantity': 1, 'price_at_purchase': 9.99, 'subtotal': 9.99}
+        for _ in range(args.orders * 3)
+    ])
+    session.commit()
+
+
+def hot_queries(args):
+    from app.models import CartItem, Order, OrderItem, Product
+    user_id, product_id, order_id = args.users // 2, args.products // 2, args.orders // 2
+    return {
+        'cart item lookup': select(CartItem).where(CartItem.cart_id == user_id, CartItem.product_id == product_id),
+        'order items': select(OrderItem).where(OrderItem.order_id == order_id),
+        'order history page': select(Order).where(Order.user_id == user_id)
+                              .order_by(Order.created_at.desc(), Order.id.desc()).limit(21),
+        'product listing': select(Product).where(Product.is_active.is_(True)),
+    }
+
+
+def explain(connection, sql):
+    if connection.dialect.name == 'sqlite':
+        return '; '.join(row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+    rows = connection.execute(text(f'EXPLAIN {sql}')).mappings().all()
+    return '; '.join(f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows)
+
+
+def measure(db, args, phase):
+    rows = []
+    with db.engine.connect() as connection:
+        for name, stmt in hot_queries(args).items():
+            sql = str(stmt.compile(connection, compile_kwargs={'literal_binds': True}))
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                connection.execute(stmt).fetchall()
+                samples.append(time.perf_counter() - started)
+            stats = summarize(samples)
+            rows.append({'phase': phase, 'query': name, 'p50_ms': stats['p50_ms'],
+                         'p95_ms': stats['p95_ms'], 'plan': explain(connection, sql)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query plans before/after the hot-path index migration')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--cart-items', type=int, default=50000)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-plans-')
+    app = create_bench_app(os.path.join(workdir, 'bench.db'))
+    from app import db
+    from app.migrations import m0002_hot_path_indexes as migration
+
+    with app.app_context():
+        seed(db, args)
+
+        # Back to the pre-migration schema
+        with db.engine.begin() as connection:
+            for name, table, _ in migration.INDEXES:
+                try:
+                    connection.exec_driver_sql(
+                        f'DROP INDEX {name}' if connection.dialect.name == 'sqlite' else f'DROP INDEX `{name}` ON `{table}`'
+                    )
+                except Exception as e:
+                    print(f"⚠️ Could not drop {name}: {e}")
+            if connection.dialect.name == 'sqlite':
+                connection.exec_driver_sql('ANALYZE')
+        db.engine.dispose()
+        before = measure(db, args, 'before')
+
+        with db.engine.begin() as connection:
+            migration.upgrade(connection)
+            if connection.dialect.name == 'sqlite':
+                connection.exec_driver_sql('ANALYZE')
+        db.engine.dispose()
+        after = measure(db, args, 'after')
+
+    rows = before + after
+    print_table(rows, ['phase', 'query', 'p50_ms', 'p95_ms'])
+    print()
+    for row in rows:
+        print(f"{row['phase']:>6}  {row['query']:<20} {row['plan']}")
+
+    if args.json:
+        save_results(args.json, 'query_plans', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Registration throughput
+Concurrent registrations (with a share of duplicate usernames/emails) against
+SQLite or MySQL, reporting statements and commits per registration.
+
+Run: python -m benchmarks.bench_registration [--registrations 500] [--threads 8]
+MySQL: DATABASE_TYPE=mysql MYSQL_HOST=... MYSQL_DATABASE=... python -m benchmarks.bench_registration
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from benchmarks.common import create_bench_app, QueryCounter, summarize, print_table, save_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark user registration')
+    parser.add_argument('--registrations', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duplicate-rate', type=float, default=0.1,
+                        help='Share of attempts reusing an existing username or email')
+    parser.add_argument('--hash-method', default='pbkdf2:sha256:1000',
+                        help='Cheap by default so database cost dominates; use scrypt for end-to-end numbers')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-registration-')
+    app = create_bench_app(os.path.join(workdir, 'bench.db'),
+                           PASSWORD_HASH_WORKERS=0, PASSWORD_HASH_METHOD=args.hash_method)
+    from app import db
+    from app.services.user_service import UserService
+
+    with app.app_context():
+        engine = db.engine
+    statements = QueryCounter(engine)
+    commits = [0]
+
+    from sqlalchemy import event
+    event.listen(engine, 'commit', lambda conn: commits.__setitem__(0, commits[0] + 1))
+
+    # Unique per run so repeated MySQL runs do not collide with earlier rows
+    run_id = uuid.uuid4().hex[:6]
+    rng = random.Random(args.seed)
+    attempts = []
+    for i in range(args.registrations):
+        if i > 0 and rng.random() < args.duplicate_rate:
+            j = rng.randrange(i)
+            if rng.random() < 0.5:
+                attempts.append((f'r{run_id}_{j}', f'r{run_id}_{i}@example.com'))
+            else:
+                attempts.append((f'r{run_id}_{i}', f'r{run_id}_{j}@example.com'))
+        else:
+            attempts.append((f'r{run_id}_{i}', f'r{run_id}_{i}@example.com'))
+
+    lock = threading.Lock()
+    latencies, outcomes = [], {}
+    cursor = [0]
+
+    def worker():
+        while True:
+            with lock:
+                if cursor[0] >= len(attempts):
+                    return
+                username, email = attempts[cursor[0]]
+                cursor[0] += 1
+            with app.app_context():
+                started = time.perf_counter()
+                user, error = UserService.create_user(username, email, 'bench-password')
+                elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                key = 'created' if user else error
+                outcomes[key] = outcomes.get(key, 0) + 1
+
+    statements.reset()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(latencies)
+    row = {
+        'database': engine.dialect.name,
+        'attempts': len(attempts),
+        'created': outcomes.get('created', 0),
+        'per_s': len(attempts) / elapsed,
+        'p50_ms': stats['p50_ms'],
+        'p95_ms': stats['p95_ms'],
+        'stmts_per_attempt': statements.count / len(attempts),
+        'commits_per_attempt': commits[0] / len(attempts)
+    }
+    print_table([row], list(row))
+    print(f"\nOutcomes: {outcomes}")
+
+    if args.json:
+        save_results(args.json, 'registration', [dict(row, outcomes=outcomes)])
+
+
+if __name__ == '__main__':
+    main()
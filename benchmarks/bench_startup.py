@@ -0,0 +1,107 @@
+"""
+Startup time
+Import time per module (python -X importtime) and create_app() wall time,
+each measured in a fresh interpreter.
+
+Run: python -m benchmarks.bench_startup [--runs 5] [--top 20]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from benchmarks.common import print_table, save_results
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CREATE_APP_SNIPPET = """
+import time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(f"{imported - started:.6f} {created - imported:.6f}")
+"""
+
+
+def _env(workdir):
+    env = dict(os.environ)
+    env.setdefault('SQLITE_DB_PATH', os.path.join(workdir, 'startup.db'))
+    env.setdefault('JOB_WORKERS', '0')
+    env['PYTHONPATH'] = PROJECT_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def import_times(workdir):
+    """Self and cumulative import time (ms) per module for `import app`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        capture_output=True, text=True, cwd=workdir, env=_env(workdir)
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Nesting is shown as two extra spaces per level after the first
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append({
+            'module': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'depth': depth
+        })
+    return modules
+
+
+def startup_times(workdir, runs):
+    """(import seconds, create_app seconds) per fresh-interpreter run"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', CREATE_APP_SNIPPET],
+            capture_output=True, text=True, cwd=workdir, env=_env(workdir)
+        )
+        lines = [line for line in result.stdout.splitlines() if line.strip()]
+        if result.returncode != 0 or not lines:
+            raise RuntimeError(f"create_app failed:\n{result.stderr[-2000:]}")
+        imported, created = map(float, lines[-1].split())
+        samples.append((imported, created))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import and app startup time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=20, help='Slowest modules to list')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-startup-')
+
+    modules = import_times(workdir)
+    # `app` itself plus the packages it imports directly
+    direct = [m for m in modules if m['depth'] <= 1]
+    slowest = sorted(direct, key=lambda m: m['cumulative_ms'], reverse=True)[:args.top]
+    print(f"📦 Slowest imports for `import app` ({len(modules)} modules loaded)\n")
+    print_table(slowest, ['module', 'cumulative_ms', 'self_ms'])
+
+    samples = startup_times(workdir, args.runs)
+    summary = {
+        'runs': args.runs,
+        'import_ms': statistics.median(s[0] for s in samples) * 1000,
+        'create_app_ms': statistics.median(s[1] for s in samples) * 1000,
+        'total_ms': statistics.median(s[0] + s[1] for s in samples) * 1000,
+        'modules_loaded': len(modules)
+    }
+    print(f"\n⏱️  Median over {args.runs} fresh interpreters\n")
+    print_table([summary], list(summary))
+
+    if args.json:
+        save_results(args.json, 'startup', {'summary': summary, 'imports': modules})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Shared helpers for benchmarks
+Builds an app against a throwaway database and summarizes timings
+"""
+import json
+import logging
+import os
+import platform
+import secrets
+import subprocess
+import sys
+from datetime import datetime
+
+
+def create_bench_app(sqlite_path=':memory:', quiet=True, **env):
+    """
+    Create the Flask app for benchmarking.
+    Defaults to in-memory SQLite with background job workers disabled;
+    pass DATABASE_TYPE='mysql' (and MYSQL_* values) to run against MySQL.
+    """
+    os.environ.setdefault('DATABASE_TYPE', 'sqlite')
+    os.environ['SQLITE_DB_PATH'] = sqlite_path
+    os.environ.setdefault('JOB_WORKERS', '0')
+    # Tokens are only signed with a configured key (servers started later inherit it)
+    os.environ.setdefault('SECRET_KEY', secrets.token_hex(16))
+    for key, value in env.items():
+        os.environ[key] = str(value)
+
+    from app import create_app
+    app = create_app()
+
+    # Keep per-request INFO logs out of the measurements
+    if quiet:
+        logging.disable(logging.INFO)
+    return app
+
+
+class QueryCounter:
+    """Count SQL statements sent to an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def reset(self):
+        count, self.count = self.count, 0
+        return count
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    """Summarize timing samples (seconds) in milliseconds"""
+    values = sorted(samples)
+    count = len(values)
+    return {
+        'n': count,
+        'mean_ms': (sum(values) / count * 1000) if count else 0.0,
+        'p50_ms': percentile(values, 50) * 1000,
+        'p95_ms': percentile(values, 95) * 1000,
+        'p99_ms': percentile(values, 99) * 1000,
+        'min_ms': (values[0] * 1000) if count else 0.0,
+        'max_ms': (values[-1] * 1000) if count else 0.0
+    }
+
+
+def print_table(rows, columns):
+    """Print a list of dicts as an aligned text table"""
+    def fmt(value):
+        return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    widths = {col: max(len(col), *(len(fmt(row.get(col, ''))) for row in rows)) for col in columns}
+    print('  '.join(col.rjust(widths[col]) for col in columns))
+    print('  '.join('-' * widths[col] for col in columns))
+    for row in rows:
+        print('  '.join(fmt(row.get(col, '')).rjust(widths[col]) for col in columns))
+
+
+def environment_info():
+    """Metadata stored with results so runs can be compared"""
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        revision = None
+
+    return {
+        'timestamp': datetime.utcnow().isoformat(),
+        'git_revision': revision,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'database': os.getenv('DATABASE_TYPE', 'sqlite')
+    }
+
+
+def save_results(path, benchmark, results):
+    """Write results as JSON together with environment metadata"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'benchmark': benchmark, 'environment': environment_info(), 'results': results}, f, indent=2)
+    print(f"\n💾 Results saved to {path}")
@@ -0,0 +1,400 @@
+"""
+Checkout concurrency load test
+Simulates N shoppers doing register → login → browse → add to cart → checkout
+against a local app instance and reports throughput, latency percentiles per
+endpoint, error rates and stock-invariant violations.
+
+Run (starts its own app on a fresh SQLite file):
+    python -m benchmarks.loadtest --users 20 --iterations 5 --think-time 50
+Against an already running instance (its database must not take other traffic):
+    python -m benchmarks.loadtest --base-url http://localhost:5001
+Baselines:
+    python -m benchmarks.loadtest --save-baseline benchmarks/baselines/loadtest.json
+    python -m benchmarks.loadtest --compare benchmarks/baselines/loadtest.json
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from benchmarks.common import summarize, print_table, save_results
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Created by create_admin.py on the local app's database to seed products
+ADMIN_USERNAME, ADMIN_PASSWORD = 'admin', 'admin123'
+
+
+class ZipfSampler:
+    """Pick items with Zipf-distributed popularity (skew 0 = uniform)"""
+
+    def __init__(self, items, skew, rng):
+        self.items = list(items)
+        self.rng = rng
+        weights = [1.0 / ((rank + 1) ** skew) for rank in range(len(self.items))]
+        total = sum(weights)
+        self.cumulative = []
+        running = 0.0
+        for weight in weights:
+            running += weight / total
+            self.cumulative.append(running)
+
+    def sample(self):
+        index = bisect.bisect_left(self.cumulative, self.rng.random())
+        return self.items[min(index, len(self.items) - 1)]
+
+
+class Stats:
+    """Thread-safe per-endpoint latency and status recording"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.ordered = defaultdict(int)  # product id -> units in successful orders
+        self.checkouts = 0
+
+    def record(self, endpoint, status, elapsed):
+        with self.lock:
+            self.latencies[endpoint].append(elapsed)
+            self.statuses[endpoint][status] += 1
+
+    def record_order(self, order):
+        with self.lock:
+            self.checkouts += 1
+            for item in order.get('items', []):
+                self.ordered[item['product_id']] += item['quantity']
+
+
+class Client:
+    """Minimal JSON HTTP client that records every call"""
+
+    def __init__(self, base_url, stats, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+
+    def call(self, method, path, endpoint, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=self.headers)
+
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, payload = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        except Exception:
+            status, payload = 'error', b''
+        self.stats.record(endpoint, status, time.perf_counter() - started)
+
+        try:
+            return status, json.loads(payload) if payload else {}
+        except ValueError:
+            return status, {}
+
+
+class Shopper(threading.Thread):
+    """One simulated user"""
+
+    def __init__(self, index, args, base_url, stats, product_ids, run_id):
+        super().__init__(name=f'shopper-{index}', daemon=True)
+        self.args = args
+        self.rng = random.Random(args.seed * 1000003 + index)
+        self.client = Client(base_url, stats)
+        self.stats = stats
+        self.sampler = ZipfSampler(product_ids, args.hot_skew, self.rng)
+        self.username = f'lt{run_id}u{index}'
+
+    def think(self):
+        if self.args.think_time > 0:
+            time.sleep(self.rng.expovariate(1000.0 / self.args.think_time))
+
+    def run(self):
+        password = 'loadtest-password'
+        self.client.call('POST', '/api/users/register', 'POST /api/users/register', {
+            'username': self.username,
+            'email': f'{self.username}@loadtest.local',
+            'password': password
+        })
+        self.think()
+
+        status, data = self.client.call('POST', '/api/users/login', 'POST /api/users/login', {
+            'username': self.username, 'password': password
+        })
+        if status != 200:
+            return
+        user_id = data['user']['id']
+        self.client.headers['Authorization'] = f"Bearer {data['token']}"
+        self.think()
+
+        for _ in range(self.args.iterations):
+            self.client.call('GET', '/api/products', 'GET /api/products')
+            self.think()
+
+            for _ in range(self.rng.randint(1, self.args.max_cart_lines)):
+                product_id = self.sampler.sample()
+                self.client.call('GET', f'/api/products/{product_id}', 'GET /api/products/<id>')
+                self.client.call('POST', f'/api/cart/{user_id}/add', 'POST /api/cart/<user>/add', {
+                    'product_id': product_id, 'quantity': self.rng.randint(1, 2)
+                })
+                self.think()
+
+            status, data = self.client.call('POST', '/api/orders', 'POST /api/orders', {
+                'shipping_address': '1 Load Test Way'
+            })
+            if status == 201:
+                self.stats.record_order(data['order'])
+            self.think()
+
+            self.client.call('GET', f'/api/orders/user/{user_id}?summary=1', 'GET /api/orders/user/<user>')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def local_env(workdir):
+    """Environment for the local app and its helper scripts (a fresh SQLite database inside workdir)"""
+    env = dict(os.environ)
+    env.update({
+        'FLASK_ENV': 'production',
+        # Production mode issues no login tokens without a configured key
+        'SECRET_KEY': os.getenv('SECRET_KEY') or secrets.token_hex(16),
+        'DATABASE_TYPE': 'sqlite',
+        'SQLITE_DB_PATH': os.path.join(workdir, 'loadtest.db'),
+        # Every simulated user logs in from 127.0.0.1
+        'LOGIN_THROTTLE_IP_LIMIT': os.getenv('LOGIN_THROTTLE_IP_LIMIT', '100000'),
+        # Measure the app, not load shedding (set ADMISSION_ENABLED=true to test shedding)
+        'ADMISSION_ENABLED': os.getenv('ADMISSION_ENABLED', 'false')
+    })
+    return env
+
+
+def start_local_app(workdir, port):
+    """Start run.py on a fresh SQLite database inside workdir"""
+    env = local_env(workdir)
+    env['PORT'] = str(port)
+    log = open(os.path.join(workdir, 'server.out'), 'w')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_ROOT, 'run.py')],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"App exited during startup - see {log.name}")
+        try:
+            urllib.request.urlopen(base_url + '/health', timeout=1).close()
+            return process, base_url
+        except Exception:
+            time.sleep(0.25)
+    process.terminate()
+    raise SystemExit("App did not become healthy within 60s")
+
+
+def fetch_stock(base_url):
+    with urllib.request.urlopen(base_url + '/api/products', timeout=30) as response:
+        return {p['id']: p['stock_quantity'] for p in json.loads(response.read())['products']}
+
+
+def create_local_admin(workdir):
+    """Run create_admin.py against the local app's database"""
+    env = local_env(workdir)
+    env.update({'JOB_WORKERS': '0', 'PASSWORD_HASH_WORKERS': '0'})
+    result = subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, 'create_admin.py')],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"create_admin.py failed:\n{result.stderr}")
+
+
+def seed_products(base_url, count, stock):
+    """Create the products as the admin user (creating products needs an admin token)"""
+    client = Client(base_url, Stats())
+    status, data = client.call('POST', '/api/users/login', 'seed login', {
+        'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD
+    })
+    if status != 200:
+        raise SystemExit(f"Admin login failed (HTTP {status}) - cannot seed products")
+    client.headers['Authorization'] = f"Bearer {data['token']}"
+    for i in range(count):
+        client.call('POST', '/api/products', 'seed', {
+            'name': f'Load Test Product {i}',
+            'price': round(5 + (i * 7.31) % 200, 2),
+            'stock_quantity': stock,
+            'category': 'LoadTest'
+        })
+
+
+def check_invariants(initial, final, ordered):
+    """Every unit sold must come out of stock exactly once, and stock never goes negative"""
+    violations = []
+    for product_id, start in initial.items():
+        end = final.get(product_id)
+        sold = ordered.get(product_id, 0)
+        if end is None:
+            continue
+        if end < 0:
+            violations.append({'product_id': product_id, 'problem': 'negative stock', 'stock': end})
+        if start - sold != end:
+            violations.append({
+                'product_id': product_id, 'problem': 'stock mismatch',
+                'initial': start, 'sold': sold, 'final': end, 'expected': start - sold
+            })
+    return violations
+
+
+def build_report(stats, elapsed):
+    endpoints = []
+    total = errors = 0
+    for endpoint in sorted(stats.latencies):
+        statuses = stats.statuses[endpoint]
+        count = sum(statuses.values())
+        server_errors = sum(n for status, n in statuses.items() if status == 'error' or status >= 500)
+        client_errors = sum(n for status, n in statuses.items() if status != 'error' and 400 <= status < 500)
+        total += count
+        errors += server_errors
+        endpoints.append({
+            'endpoint': endpoint,
+            **summarize(stats.latencies[endpoint]),
+            'rps': count / elapsed,
+            'error_rate': server_errors / count,
+            'rejected_rate': client_errors / count
+        })
+
+    return {
+        'elapsed_s': elapsed,
+        'requests': total,
+        'throughput_rps': total / elapsed,
+        'checkouts': stats.checkouts,
+        'checkouts_per_s': stats.checkouts / elapsed,
+        'error_rate': errors / total if total else 0.0,
+        'endpoints': endpoints
+    }
+
+
+def compare(report, baseline_path, threshold):
+    """Print changes against a saved baseline; returns True if nothing regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    ok = True
+    print(f"\n📊 Compared with {baseline_path} (threshold {threshold:.0%})")
+    change = report['throughput_rps'] / baseline['throughput_rps'] - 1 if baseline['throughput_rps'] else 0.0
+    print(f"  throughput: {baseline['throughput_rps']:.1f} → {report['throughput_rps']:.1f} req/s ({change:+.1%})")
+    if change < -threshold:
+        ok = False
+
+    previous = {row['endpoint']: row for row in baseline['endpoints']}
+    for row in report['endpoints']:
+        old = previous.get(row['endpoint'])
+        if not old or not old['p95_ms']:
+            continue
+        change = row['p95_ms'] / old['p95_ms'] - 1
+        flag = '❌' if change > threshold else '✅'
+        if change > threshold:
+            ok = False
+        print(f"  {flag} {row['endpoint']}: p95 {old['p95_ms']:.1f} → {row['p95_ms']:.1f} ms ({change:+.1%})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent register/login/browse/cart/checkout load test')
+    parser.add_argument('--base-url', help='Use a running instance instead of starting one')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent simulated users')
+    parser.add_argument('--iterations', type=int, default=5, help='Checkouts per user')
+    parser.add_argument('--max-cart-lines', type=int, default=3, help='Max products added before each checkout')
+    parser.add_argument('--think-time', type=float, default=50, help='Mean think time between steps in ms (0 = none)')
+    parser.add_argument('--hot-skew', type=float, default=1.1, help='Zipf exponent of product popularity (0 = uniform)')
+    parser.add_argument('--products', type=int, default=50, help='Products to seed')
+    parser.add_argument('--stock', type=int, default=100, help='Initial stock per seeded product')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--json', help='Write the report to this JSON file')
+    parser.add_argument('--save-baseline', help='Save the report as a baseline')
+    parser.add_argument('--compare', help='Compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.20, help='Allowed regression vs baseline')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    process = None
+    if args.base_url:
+        base_url = args.base_url.rstrip('/')
+    else:
+        process, base_url = start_local_app(workdir, free_port())
+        print(f"🚀 Started local app at {base_url} (workdir: {workdir})")
+
+    try:
+        if not args.base_url:
+            create_local_admin(workdir)
+            seed_products(base_url, args.products, args.stock)
+
+        initial = fetch_stock(base_url)
+        if not initial:
+            raise SystemExit("No products to shop for")
+        # Most popular products first, so the skew targets a stable set
+        product_ids = sorted(initial)
+
+        stats = Stats()
+        run_id = uuid.uuid4().hex[:6]
+        shoppers = [Shopper(i, args, base_url, stats, product_ids, run_id) for i in range(args.users)]
+
+        print(f"🛒 {args.users} users × {args.iterations} checkouts (think {args.think_time}ms, skew {args.hot_skew})")
+        started = time.perf_counter()
+        for shopper in shoppers:
+            shopper.start()
+        for shopper in shoppers:
+            shopper.join()
+        elapsed = time.perf_counter() - started
+
+        report = build_report(stats, elapsed)
+        report['config'] = {key: value for key, value in vars(args).items()
+                            if key not in ('json', 'save_baseline', 'compare')}
+        report['invariant_violations'] = check_invariants(initial, fetch_stock(base_url), stats.ordered)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print()
+    print_table(report['endpoints'], ['endpoint', 'n', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'error_rate', 'rejected_rate'])
+    print(f"\n⏱️  {report['requests']} requests in {elapsed:.1f}s → {report['throughput_rps']:.1f} req/s, "
+          f"{report['checkouts_per_s']:.1f} checkouts/s, error rate {report['error_rate']:.2%}")
+
+    violations = report['invariant_violations']
+    if violations:
+        print(f"❌ {len(violations)} stock invariant violation(s):")
+        for violation in violations[:20]:
+            print(f"   {violation}")
+    else:
+        print("✅ Stock invariants hold")
+
+    if args.json:
+        save_results(args.json, 'loadtest', report)
+    if args.save_baseline:
+        save_results(args.save_baseline, 'loadtest', report)
+
+    ok = True
+    if args.compare:
+        ok = compare(report, args.compare, args.threshold)
+    sys.exit(0 if ok and not violations else 1)
+
+
+if __name__ == '__main__':
+    main()
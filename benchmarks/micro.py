@@ -0,0 +1,263 @@
+"""
+Micro-benchmarks
+Model serializers, cart/order/user services, the log record factory and
+metric recording against in-memory SQLite with deterministic fixtures.
+Reports ops/sec (median of rounds) and memory per operation from tracemalloc:
+peak_kb is the transient peak while one op runs, retained_b the net growth
+per op (a leak shows up here).
+
+Run: python -m benchmarks.micro [--only order] [--min-time 0.2] [--rounds 5]
+Baselines (benchmarks/baselines/micro.json is committed; refresh it on the
+same machine after an intended performance change and commit the new file):
+    python -m benchmarks.micro --save-baseline benchmarks/baselines/micro.json
+    python -m benchmarks.micro --compare benchmarks/baselines/micro.json --threshold 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from benchmarks.common import create_bench_app, print_table, save_results
+
+FIXED_TIME = datetime(2024, 1, 1, 12, 0, 0)
+PASSWORD = 'micro-secret'
+
+
+class Case:
+    """One benchmarked operation; `setup` runs before every op, untimed"""
+
+    def __init__(self, name, op, setup=None):
+        self.name = name
+        self.op = op
+        self.setup = setup
+
+
+def seed(db):
+    """Deterministic fixtures: 50 products, a user with a 5-line cart and a 5-line order"""
+    from app.models import User, Product, Cart, CartItem, Order, OrderItem
+
+    products = [
+        Product(id=i, name=f'Micro Product {i}', description='Benchmark fixture ' * 4, price=round(1.5 * i, 2),
+                stock_quantity=10 ** 9, category=f'Category {i % 5}', image_url=f'/static/images/{i}.jpg',
+                is_active=True, created_at=FIXED_TIME, updated_at=FIXED_TIME)
+        for i in range(1, 51)
+    ]
+    user = User(id=1, username='micro', email='micro@example.com', created_at=FIXED_TIME, updated_at=FIXED_TIME)
+    user.set_password(PASSWORD)
+    cart = Cart(id=1, user=user, created_at=FIXED_TIME, updated_at=FIXED_TIME)
+    cart.items = [CartItem(product=products[i], quantity=i + 1, added_at=FIXED_TIME) for i in range(5)]
+    order = Order(id=1, user_id=1, order_number='MICRO-1', status='pending', total_amount=42.0,
+                  shipping_address='1 Benchmark Way', payment_method='credit_card',
+                  created_at=FIXED_TIME, updated_at=FIXED_TIME)
+    order.items = [OrderItem(product_id=products[i].id, product_name=products[i].name, quantity=1,
+                             price_at_purchase=products[i].price, subtotal=products[i].price) for i in range(5)]
+
+    # A second user whose cart the order benchmark fills and checks out
+    buyer = User(id=2, username='buyer', email='buyer@example.com', password_hash='x', cart=Cart(id=2))
+
+    db.session.add_all(products + [user, cart, order, buyer])
+    db.session.commit()
+
+
+def detached_cart(cart):
+    """
+    A transient copy of the cart with its items in memory. Cart.items is a
+    dynamic relationship, so a persistent cart runs a SELECT on every read
+    (three per to_dict); the copy runs none, which leaves to_dict itself -
+    building the dynamic query objects included - to be timed.
+    """
+    from sqlalchemy.orm.attributes import set_committed_value
+    from app.models import Cart, CartItem
+
+    items = []
+    for item in cart.items:
+        copy = CartItem(id=item.id, cart_id=item.cart_id, product_id=item.product_id, quantity=item.quantity,
+                        added_at=item.added_at)
+        # No backref event, so the product's cart_items collection is left untouched
+        set_committed_value(copy, 'product', item.product)
+        items.append(copy)
+    copy = Cart(id=cart.id, user_id=cart.user_id, created_at=cart.created_at, updated_at=cart.updated_at)
+    copy.items = items
+    assert copy.to_dict() == cart.to_dict()
+    return copy
+
+
+def build_cases(app, db):
+    from app.models import Cart, Order, Product
+    from app.services.cart_service import CartService
+    from app.services.order_service import OrderService
+    from app.services.user_service import UserService
+    from app import metrics
+
+    product = db.session.get(Product, 1)
+    order = db.session.get(Order, 1)
+    # Load relationships once so serializer cases measure serialization only
+    order.to_dict()
+    cart = detached_cart(db.session.get(Cart, 1))
+
+    cart_products = iter(range(0, 10 ** 9))
+
+    def add_to_cart():
+        CartService.add_to_cart(1, 6 + next(cart_products) % 5, 1)
+
+    def fill_buyer_cart():
+        for product_id in (11, 12, 13):
+            CartService.add_to_cart(2, product_id, 1)
+
+    factory = logging.getLogRecordFactory()
+    json_formatter = next(
+        (handler.formatter for handler in logging.getLogger().handlers if 'Json' in type(handler.formatter).__name__),
+        logging.Formatter()
+    )
+    record = factory('app.services', logging.INFO, __file__, 1, "📦 Retrieved %d products → HTTP 200", (50,), None)
+
+    return [
+        Case('product.to_dict', product.to_dict),
+        Case('cart.to_dict', cart.to_dict),
+        Case('order.to_dict', order.to_dict),
+        Case('cart_service.add_to_cart', add_to_cart),
+        Case('order_service.create_order', lambda: OrderService.create_order(2, '1 Benchmark Way'), setup=fill_buyer_cart),
+        Case('user_service.authenticate_user', lambda: UserService.authenticate_user('micro', PASSWORD)),
+        Case('logging.record_factory', lambda: factory('app.services', logging.INFO, __file__, 1,
+                                                        "📦 Retrieved %d products → HTTP 200", (50,), None)),
+        Case('logging.json_format', lambda: json_formatter.format(record)),
+        Case('metrics.record_order', lambda: metrics.record_order(42.0)),
+        Case('metrics.record_db_pool', lambda: metrics.record_db_pool('primary', 0.0005, False, 3, 7)),
+        Case('metrics.record_response_cache', lambda: metrics.record_response_cache('products.get_products', True, 4096, 3)),
+    ]
+
+
+def time_case(case, min_time, rounds):
+    """Ops/sec per round; batches are sized so each round runs for about min_time"""
+    for _ in range(3):  # warm up
+        if case.setup:
+            case.setup()
+        case.op()
+
+    results = []
+    for _ in range(rounds):
+        ops, elapsed = 0, 0.0
+        if case.setup:
+            # Setup must stay out of the timing, so time each op
+            while elapsed < min_time:
+                case.setup()
+                started = time.perf_counter()
+                case.op()
+                elapsed += time.perf_counter() - started
+                ops += 1
+        else:
+            batch = 1
+            while elapsed < min_time:
+                started = time.perf_counter()
+                for _ in range(batch):
+                    case.op()
+                elapsed += time.perf_counter() - started
+                ops += batch
+                batch = min(batch * 2, 10000)
+        results.append(ops / elapsed)
+    return results
+
+
+def memory_case(case, samples):
+    """(mean transient peak KB, mean retained bytes) per op"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        start_current, _ = tracemalloc.get_traced_memory()
+        for _ in range(samples):
+            if case.setup:
+                case.setup()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            case.op()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        end_current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.mean(peaks) / 1024, (end_current - start_current) / samples
+
+
+def compare(rows, baseline_path, threshold):
+    """Print changes against a saved baseline; returns True if nothing regressed"""
+    with open(baseline_path) as f:
+        baseline = {row['case']: row for row in json.load(f)['results']}
+
+    ok = True
+    print(f"\n📊 Compared with {baseline_path} (threshold {threshold:.0%})")
+    for row in rows:
+        old = baseline.get(row['case'])
+        if not old:
+            print(f"  ➕ {row['case']}: new")
+            continue
+        speed = row['ops_per_sec'] / old['ops_per_sec'] - 1
+        # Ignore sub-KB noise in peak memory
+        memory = (row['peak_kb'] - old['peak_kb']) / old['peak_kb'] if old['peak_kb'] >= 1 else 0.0
+        regressed = speed < -threshold or memory > threshold
+        ok = ok and not regressed
+        print(f"  {'❌' if regressed else '✅'} {row['case']}: {old['ops_per_sec']:.0f} → {row['ops_per_sec']:.0f} ops/s "
+              f"({speed:+.1%}), peak {old['peak_kb']:.1f} → {row['peak_kb']:.1f} KB ({memory:+.1%})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for models, services, logging and metrics')
+    parser.add_argument('--only', help='Run cases whose name contains this text')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds per timing round')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--memory-samples', type=int, default=50, help='Ops traced for memory per case')
+    parser.add_argument('--hash-method', default='pbkdf2:sha256:1000',
+                        help='Password hash for authenticate_user (cheap so the service overhead shows)')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--save-baseline', help='Save results as a baseline')
+    parser.add_argument('--compare', help='Compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.20, help='Allowed regression vs baseline')
+    args = parser.parse_args()
+    if args.compare and not os.path.exists(args.compare):
+        parser.error(f"no baseline at {args.compare}; create one with --save-baseline {args.compare}")
+
+    app = create_bench_app(':memory:', PASSWORD_HASH_WORKERS=0, PASSWORD_HASH_METHOD=args.hash_method,
+                           ACTIVE_USERS_ENABLED='false', TRACING_ENABLED='false')
+    from app import db
+
+    # The tracer's own bookkeeping, subtracted from every case
+    floor_kb, floor_retained = memory_case(Case('noop', lambda: None), args.memory_samples)
+
+    rows = []
+    with app.app_context(), app.test_request_context('/api/products'):
+        from flask import g
+        g.request_id = 'micro001'
+        seed(db)
+        for case in build_cases(app, db):
+            if args.only and args.only not in case.name:
+                continue
+            rates = time_case(case, args.min_time, args.rounds)
+            peak_kb, retained = memory_case(case, args.memory_samples)
+            rows.append({
+                'case': case.name,
+                'ops_per_sec': statistics.median(rates),
+                'best_ops_per_sec': max(rates),
+                'mean_us': 1e6 / statistics.median(rates),
+                'spread': (max(rates) - min(rates)) / statistics.median(rates),
+                'peak_kb': max(0.0, peak_kb - floor_kb),
+                'retained_b': max(0.0, retained - floor_retained)
+            })
+            print(f"{case.name}: {rows[-1]['ops_per_sec']:.0f} ops/s")
+
+    print()
+    print_table(rows, ['case', 'ops_per_sec', 'mean_us', 'spread', 'peak_kb', 'retained_b'])
+
+    if args.json:
+        save_results(args.json, 'micro', rows)
+    if args.save_baseline:
+        save_results(args.save_baseline, 'micro', rows)
+    if args.compare and not compare(rows, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Export orders and order_items for offline analytics
+
+Usage:
+    python export_orders.py                                # everything, gzip CSV, into ./exports
+    python export_orders.py --format parquet               # Parquet (needs pyarrow)
+    python export_orders.py --since-id 500000              # orders after id 500000
+    python export_orders.py --since-updated 2026-10-01     # orders changed since then
+    python export_orders.py --state exports/state.json     # incremental: continue from the last run
+
+Rows are streamed from a server-side cursor in --chunk-size batches, so memory
+stays flat. With --state, the watermark is read before and saved after a
+successful run (both tables), so each run exports only what changed.
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault('JOB_WORKERS', '0')
+
+from app import create_app, db
+from app.services.export_service import DEFAULT_CHUNK_SIZE, FORMATS, TABLES, ExportService
+
+
+def export_table(export, directory):
+    """Stream one table to a file (renamed into place when complete)"""
+    path = os.path.join(directory, export.filename)
+    with open(path + '.part', 'wb') as out:
+        for data in export.chunks():
+            out.write(data)
+            if export.rows and export.rows % (export.chunk_size * 20) == 0:
+                print(f"   {export.table}: {export.rows:,} rows")
+    os.replace(path + '.part', path)
+    print(f"✅ {export.table}: {export.rows:,} rows, {export.bytes / (1024 * 1024):.1f} MB in {export.seconds:.1f}s "
+          f"({export.rows_per_second:,.0f} rows/s) → {path}")
+    return export.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream orders and order items to compressed files')
+    parser.add_argument('--format', choices=list(FORMATS), default='csv', help='csv (gzip), parquet or arrow (IPC stream)')
+    parser.add_argument('--tables', default=','.join(TABLES), help='Comma-separated tables to export')
+    parser.add_argument('--out', default='exports', help='Output directory')
+    parser.add_argument('--since-id', type=int, help='Only orders with a larger id (or tie-break for --since-updated)')
+    parser.add_argument('--since-updated', help='Only orders updated after this ISO timestamp')
+    parser.add_argument('--state', help='JSON file holding the watermark between runs')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per fetch and per encoded batch')
+    parser.add_argument('--settle-seconds', type=float,
+                        help='Leave out rows newer than this - their transactions may still be in flight '
+                             '(default EXPORT_SETTLE_SECONDS or 30)')
+    args = parser.parse_args()
+
+    since_id, since_updated = args.since_id, args.since_updated
+    if args.state and os.path.exists(args.state):
+        with open(args.state) as f:
+            state = json.load(f)
+        since_id, since_updated = state.get('since_id'), state.get('since_updated')
+        print(f"📍 Continuing from {args.state}: {state}")
+
+    os.makedirs(args.out, exist_ok=True)
+    app = create_app(start_workers=False)
+    with app.app_context():
+        try:
+            watermark = ExportService.plan(since_id, since_updated, args.settle_seconds)
+        except ValueError as e:
+            parser.error(str(e))
+
+        started = time.perf_counter()
+        total = 0
+        for table in [name.strip() for name in args.tables.split(',') if name.strip()]:
+            export, error = ExportService.start_export(table, args.format, chunk_size=args.chunk_size, watermark=watermark)
+            if error:
+                parser.error(error)
+            total += export_table(export, args.out)
+        db.session.rollback()
+
+    elapsed = time.perf_counter() - started
+    print(f"📦 Exported {total:,} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+
+    if args.state:
+        with open(args.state, 'w') as f:
+            json.dump(ExportService.next_watermark(watermark), f)
+        print(f"📍 Next run continues from {ExportService.next_watermark(watermark)}")
+
+
+if __name__ == '__main__':
+    main()
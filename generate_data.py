@@ -0,0 +1,286 @@
+"""
+Generate synthetic data for scale testing
+
+Appends users, products, carts and orders with realistic shapes: Zipf product
+popularity, geometric cart/order sizes and created_at spread over --days.
+Rows are built and bulk inserted (Core executemany) by --processes workers,
+in fixed-size id chunks each seeded from (--seed, table, chunk), so the same
+arguments and --end produce the same data whatever the process count (apart
+from password salts and the ids of item rows).
+
+Usage:
+    python generate_data.py --users 100000 --products 20000 --orders 500000
+    DATABASE_TYPE=mysql python generate_data.py --users 5000000 --products 1000000 --orders 15000000 --processes 8
+    python generate_data.py --users 1000 --products 200 --orders 5000 --zipf 1.3 --seed 7
+
+SQLite allows one writer at a time, so extra processes there only parallelize
+row generation. Every generated user's password is --password.
+"""
+import argparse
+import bisect
+import itertools
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+from statistics import NormalDist
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ.setdefault('JOB_WORKERS', '0')
+
+CATEGORIES = ['Electronics', 'Home', 'Kitchen', 'Books', 'Toys', 'Sports', 'Garden', 'Beauty', 'Fashion', 'Grocery']
+ADJECTIVES = ['Classic', 'Smart', 'Compact', 'Deluxe', 'Eco', 'Ultra', 'Pro', 'Mini', 'Vintage', 'Wireless']
+ORDER_STATUSES = [('delivered', 70), ('shipped', 10), ('processing', 5), ('pending', 10), ('cancelled', 5)]
+PAYMENT_METHODS = [('credit_card', 60), ('paypal', 25), ('debit_card', 15)]
+
+# Per-process state, set by init_worker
+_state = {}
+
+
+def geometric(rng, mean, cap):
+    """1 + geometric sample with the given mean (>= 1), capped"""
+    if mean <= 1:
+        return 1
+    p = 1.0 / mean
+    return min(cap, 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - p)))
+
+
+def zipf_cum_weights(n, s):
+    """Cumulative weights for ranks 1..n with P(k) proportional to 1/k^s (s=0 is uniform)"""
+    return list(itertools.accumulate(1.0 / k ** s for k in range(1, n + 1)))
+
+
+def pick(rng, cum_weights, ids):
+    """Sample one id by rank popularity"""
+    return ids[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+PRICES = NormalDist(3.4, 1.0)
+
+
+def product_price(product_id, seed):
+    """
+    Log-normal price (median ~$30) hashed from the id, so the order phase
+    recomputes it without reading products back
+    """
+    u = ((product_id * 2654435761 + seed * 40503) % 2 ** 32 + 0.5) / 2 ** 32
+    return round(math.exp(PRICES.inv_cdf(u)), 2) + 0.99
+
+
+def created_at(first_id, count, row_id, jitter):
+    """Spread creation times over the window in id order"""
+    position = (row_id - first_id + jitter) / max(count, 1)
+    return _state['start'] + timedelta(seconds=position * _state['span'])
+
+
+def init_worker(uri, args, first_ids, password_hash, end):
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import NullPool
+    from app.models import User, Product, Cart, CartItem, Order, OrderItem
+
+    engine = create_engine(uri, poolclass=NullPool)
+
+    @event.listens_for(engine, 'connect')
+    def bulk_session(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if engine.dialect.name == 'sqlite':
+                # Bulk load: durability is not needed, waiting for the write lock is
+                for statement in ('PRAGMA journal_mode=WAL', 'PRAGMA synchronous=OFF', 'PRAGMA busy_timeout=600000'):
+                    cursor.execute(statement)
+            elif engine.dialect.name == 'mysql':
+                # Parents are loaded before children and generated keys are unique
+                cursor.execute('SET foreign_key_checks=0, unique_checks=0')
+        finally:
+            cursor.close()
+
+    _state.update({
+        'engine': engine,
+        'args': args,
+        'first_ids': first_ids,
+        'password_hash': password_hash,
+        'tables': {model.__tablename__: model.__table__ for model in (User, Product, Cart, CartItem, Order, OrderItem)},
+        'start': end - timedelta(days=args.days),
+        'span': args.days * 86400,
+    })
+
+    if args.products:
+        # Popularity rank -> product id: a seeded shuffle so bestsellers are spread over the id range
+        product_ids = list(range(first_ids['products'], first_ids['products'] + args.products))
+        random.Random(f'{args.seed}:popularity').shuffle(product_ids)
+        _state['product_ids'] = product_ids
+        _state['product_weights'] = zipf_cum_weights(args.products, args.zipf)
+    if args.users:
+        user_ids = list(range(first_ids['users'], first_ids['users'] + args.users))
+        random.Random(f'{args.seed}:activity').shuffle(user_ids)
+        _state['user_ids'] = user_ids
+        _state['user_weights'] = zipf_cum_weights(args.users, args.user_zipf)
+
+
+def insert(table_rows):
+    """Insert {table: rows} in one transaction, batch by batch"""
+    batch = _state['args'].batch_size
+    with _state['engine'].begin() as connection:
+        for name, rows in table_rows.items():
+            table = _state['tables'][name]
+            for offset in range(0, len(rows), batch):
+                connection.execute(table.insert(), rows[offset:offset + batch])
+    return sum(len(rows) for rows in table_rows.values())
+
+
+def generate_users(first, count):
+    args, base = _state['args'], _state['first_ids']['users']
+    rng = random.Random(f'{args.seed}:users:{first}')
+    users = []
+    for user_id in range(first, first + count):
+        joined = created_at(base, args.users, user_id, rng.random())
+        users.append({
+            'id': user_id, 'username': f'gen_user_{user_id}', 'email': f'gen_user_{user_id}@example.com',
+            'password_hash': _state['password_hash'], 'full_name': f'Generated User {user_id}',
+            'is_admin': False, 'created_at': joined, 'updated_at': joined
+        })
+    return insert({'users': users})
+
+
+def generate_products(first, count):
+    args, base = _state['args'], _state['first_ids']['products']
+    rng = random.Random(f'{args.seed}:products:{first}')
+    products = []
+    for product_id in range(first, first + count):
+        category = CATEGORIES[rng.randrange(len(CATEGORIES))]
+        added = created_at(base, args.products, product_id, rng.random())
+        products.append({
+            'id': product_id, 'name': f'{rng.choice(ADJECTIVES)} {category} Item {product_id}',
+            'description': f'Generated {category.lower()} product #{product_id}',
+            'price': product_price(product_id, args.seed), 'stock_quantity': rng.randint(0, 500),
+            'category': category, 'image_url': None, 'is_active': rng.random() > 0.02,
+            'created_at': added, 'updated_at': added
+        })
+    return insert({'products': products})
+
+
+def generate_carts(first, count):
+    """Open carts for a --cart-ratio share of the users in [first, first + count)"""
+    args = _state['args']
+    rng = random.Random(f'{args.seed}:carts:{first}')
+    now = _state['start'] + timedelta(seconds=_state['span'])
+    carts, items = [], []
+    for user_id in range(first, first + count):
+        if rng.random() >= args.cart_ratio:
+            continue
+        updated = now - timedelta(seconds=rng.random() * 7 * 86400)
+        # Cart ids follow user ids so chunks never collide
+        cart_id = _state['first_ids']['carts'] + (user_id - _state['first_ids']['users'])
+        carts.append({'id': cart_id, 'user_id': user_id, 'created_at': updated, 'updated_at': updated})
+        products = {pick(rng, _state['product_weights'], _state['product_ids'])
+                    for _ in range(geometric(rng, args.cart_items, 20))}
+        items.extend({'cart_id': cart_id, 'product_id': product_id, 'quantity': geometric(rng, 1.2, 5),
+                      'added_at': updated} for product_id in products)
+    return insert({'carts': carts, 'cart_items': items})
+
+
+def generate_orders(first, count):
+    args = _state['args']
+    rng = random.Random(f'{args.seed}:orders:{first}')
+    statuses, status_weights = zip(*ORDER_STATUSES)
+    methods, method_weights = zip(*PAYMENT_METHODS)
+    users_first = _state['first_ids']['users']
+    end = _state['start'] + timedelta(seconds=_state['span'])
+    orders, items = [], []
+    for order_id in range(first, first + count):
+        user_id = pick(rng, _state['user_weights'], _state['user_ids'])
+        # Orders fall between the user's sign-up and now
+        joined = created_at(users_first, args.users, user_id, 1.0)
+        placed = joined + (end - joined) * rng.random()
+
+        total = 0.0
+        for product_id in {pick(rng, _state['product_weights'], _state['product_ids'])
+                           for _ in range(geometric(rng, args.order_items, 50))}:
+            quantity = geometric(rng, 1.2, 5)
+            price = product_price(product_id, args.seed)
+            subtotal = round(price * quantity, 2)
+            total += subtotal
+            items.append({'order_id': order_id, 'product_id': product_id, 'product_name': f'Item {product_id}',
+                          'quantity': quantity, 'price_at_purchase': price, 'subtotal': subtotal})
+
+        status = rng.choices(statuses, status_weights)[0]
+        orders.append({
+            'id': order_id, 'user_id': user_id, 'order_number': f'GEN-{order_id:010d}', 'status': status,
+            'total_amount': round(total, 2), 'shipping_address': f'{user_id} Generated Street',
+            'payment_method': rng.choices(methods, method_weights)[0],
+            'payment_status': {'pending': 'pending', 'cancelled': 'failed'}.get(status, 'completed'),
+            'created_at': placed, 'updated_at': placed
+        })
+    return insert({'orders': orders, 'order_items': items})
+
+
+def run_phase(pool, name, job, first, total, chunk_size):
+    if total <= 0:
+        return
+    started = time.perf_counter()
+    chunks = [(start, min(chunk_size, first + total - start)) for start in range(first, first + total, chunk_size)]
+    rows = 0
+    for inserted in pool.starmap(job, chunks, chunksize=1):
+        rows += inserted
+    elapsed = time.perf_counter() - started
+    print(f"✅ {name}: {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic data for scale testing')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--cart-ratio', type=float, default=0.3, help='Share of users with an open cart')
+    parser.add_argument('--cart-items', type=float, default=2.5, help='Mean distinct products per cart')
+    parser.add_argument('--order-items', type=float, default=3.0, help='Mean distinct products per order')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Product popularity skew (0 = uniform)')
+    parser.add_argument('--user-zipf', type=float, default=0.8, help='Orders-per-user skew (0 = uniform)')
+    parser.add_argument('--days', type=int, default=365, help='Spread created_at over the last N days')
+    parser.add_argument('--end', help='Latest created_at, YYYY-MM-DD (default: today, UTC)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=20000, help='Rows per worker task and transaction')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per executemany')
+    parser.add_argument('--password', default='password123', help='Password for every generated user')
+    args = parser.parse_args()
+
+    if (args.orders or args.cart_ratio > 0) and (args.users <= 0 or args.products <= 0):
+        parser.error('carts and orders need --users and --products')
+
+    from sqlalchemy import func, select
+    from app import create_app, db
+    from app.models import User, Product, Cart, Order
+    from app.utils.passwords import hash_password
+
+    app = create_app(start_workers=False)  # also brings the schema up to date
+    with app.app_context():
+        uri = db.engine.url.render_as_string(hide_password=False)
+        # Append after existing rows
+        first_ids = {model.__tablename__: (db.session.scalar(select(func.max(model.id))) or 0) + 1
+                     for model in (User, Product, Cart, Order)}
+        target = db.engine.url.render_as_string()
+        password_hash = hash_password(args.password)
+        db.session.remove()
+        db.engine.dispose()
+
+    print(f"🏭 Generating {args.users:,} users, {args.products:,} products, {args.orders:,} orders "
+          f"into {target} with {args.processes} processes (seed {args.seed})")
+    started = time.perf_counter()
+    end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    with Pool(args.processes, initializer=init_worker, initargs=(uri, args, first_ids, password_hash, end)) as pool:
+        run_phase(pool, 'users', generate_users, first_ids['users'], args.users, args.chunk_size)
+        run_phase(pool, 'products', generate_products, first_ids['products'], args.products, args.chunk_size)
+        if args.cart_ratio > 0:
+            run_phase(pool, 'carts', generate_carts, first_ids['users'], args.users, args.chunk_size)
+        # Orders average --order-items rows each, so use smaller chunks
+        run_phase(pool, 'orders', generate_orders, first_ids['orders'], args.orders,
+                  max(1, int(args.chunk_size / (1 + args.order_items))))
+    print(f"🎉 Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Gunicorn configuration - production server
+
+    gunicorn -c gunicorn.conf.py app.wsgi:app    (or: python serve.py)
+
+Prefork workers with threads, app preloading, worker recycling and
+per-worker setup of the hashing pool, background threads, tracing and
+multiprocess Prometheus metrics.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_flag(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+# Server socket
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# Workers: processes x threads
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+os.environ['GUNICORN_WORKER_THREADS'] = str(threads)  # admission limits default to it
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers to bound memory growth (jitter avoids all restarting at once)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Load the app once in the master; workers share its memory pages after fork
+preload_app = _env_flag('GUNICORN_PRELOAD', True)
+if preload_app:
+    os.environ['APP_PRELOAD'] = 'true'
+
+pidfile = os.getenv('GUNICORN_PIDFILE', 'gunicorn.pid')
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Each worker writes its metrics here; /metrics aggregates all of them.
+# Must exist before the (preloaded) app imports prometheus_client. A USR2
+# re-exec (GUNICORN_PID set to the old master) runs next to the old master;
+# keep its files then, since its workers are still serving.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'ecommerce-prometheus'))
+if 'GUNICORN_PID' not in os.environ:
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+# Workers merge distinct active-user counts through this directory
+os.environ.setdefault('ACTIVE_USERS_SHARED_DIR', os.path.join(tempfile.gettempdir(), 'ecommerce-active-users'))
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import init_worker
+        from app.wsgi import app
+        init_worker(app)
+    server.log.info(f"👷 Worker {worker.pid} ready")
+
+
+def worker_exit(server, worker):
+    from app import shutdown_worker
+    from app.wsgi import app
+    shutdown_worker(app)
+
+
+def child_exit(server, worker):
+    from prometheus_flask_exporter.multiprocess import GunicornInternalPrometheusMetrics
+    GunicornInternalPrometheusMetrics.mark_process_dead_on_child_exit(worker.pid)
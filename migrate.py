@@ -0,0 +1,46 @@
+"""
+Database schema migrations
+
+Usage:
+    python migrate.py status          # current version and pending migrations
+    python migrate.py upgrade         # apply all pending migrations
+    python migrate.py upgrade --to 1  # apply up to a version
+"""
+import argparse
+import os
+
+# Let this command do the migrating instead of create_app
+os.environ['DB_AUTO_MIGRATE'] = 'false'
+os.environ.setdefault('JOB_WORKERS', '0')
+
+from app import create_app, db
+from app.migrations import current_version, load_migrations, upgrade
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage database schema migrations')
+    parser.add_argument('command', choices=['status', 'upgrade'])
+    parser.add_argument('--to', type=int, help='Target version (upgrade only)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+        current = current_version(engine)
+
+        if args.command == 'status':
+            print(f"📋 Schema version: {current}")
+            for migration in load_migrations():
+                state = '✅ applied' if migration.version <= current else '⏳ pending'
+                print(f"   {migration.version:04d} {migration.name:<24} {state}  {migration.description}")
+            return
+
+        applied = upgrade(engine, target=args.to)
+        if applied:
+            print(f"✅ Applied {', '.join(f'{v:04d}' for v in applied)} → version {current_version(engine)}")
+        else:
+            print(f"✅ Nothing to apply (version {current})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Delete finished background jobs
+
+Usage:
+    python purge_jobs.py              # done/failed jobs older than JOB_RETENTION_DAYS (default 7)
+    python purge_jobs.py --days 1     # older than a day
+
+The job dispatcher runs the same sweep every JOB_PURGE_INTERVAL seconds; this
+is for deployments with JOB_WORKERS=0 or a backlog to clear at once.
+"""
+import argparse
+import os
+
+os.environ.setdefault('JOB_WORKERS', '0')
+
+from app import create_app
+from app.jobs import purge_finished_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Delete done and failed outbox jobs past their retention')
+    parser.add_argument('--days', type=float, default=float(os.getenv('JOB_RETENTION_DAYS', 7)),
+                        help='Keep jobs that finished within this many days')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+    args = parser.parse_args()
+    if args.days < 0:
+        parser.error('--days must not be negative')
+
+    app = create_app(start_workers=False)
+    with app.app_context():
+        deleted = purge_finished_jobs(args.days, args.batch_size)
+    print(f"🧹 Deleted {deleted:,} finished jobs older than {args.days:g} days")
+
+
+if __name__ == '__main__':
+    main()
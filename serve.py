@@ -0,0 +1,96 @@
+"""
+Production server control
+
+Usage:
+    python serve.py            # start gunicorn (foreground) with gunicorn.conf.py
+    python serve.py reload     # zero-downtime reload with new code (USR2, then QUIT the old master)
+    python serve.py stop       # graceful shutdown
+
+`python run.py` remains the development server.
+"""
+import argparse
+import os
+import shutil
+import signal
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+CONFIG = os.path.join(PROJECT_ROOT, 'gunicorn.conf.py')
+
+
+def pidfile():
+    return os.getenv('GUNICORN_PIDFILE', 'gunicorn.pid')
+
+
+def read_pid(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def start():
+    os.chdir(PROJECT_ROOT)
+    # The console script, not `python -m gunicorn`: a USR2 re-exec of the
+    # latter runs gunicorn/__main__.py as a script and its `http` package
+    # then shadows the standard library one
+    gunicorn = shutil.which('gunicorn') or os.path.join(os.path.dirname(sys.executable), 'gunicorn')
+    os.execv(gunicorn, [gunicorn, '-c', CONFIG, 'app.wsgi:app'])
+
+
+def reload(timeout=60):
+    """
+    Start a new master (which loads the new code and forks new workers) next to
+    the old one, then gracefully stop the old master once the new one is up.
+    A plain HUP would not pick up new code while the app is preloaded.
+    """
+    path = pidfile()
+    old_pid = read_pid(path)
+    if old_pid is None:
+        print(f"❌ No running server (pidfile {path} not found)")
+        return 1
+
+    # The new master writes <pidfile>.2 and renames it once the old one exits
+    os.kill(old_pid, signal.SIGUSR2)
+    deadline = time.time() + timeout
+    new_pid = None
+    while time.time() < deadline:
+        new_pid = read_pid(f'{path}.2')
+        if new_pid and new_pid != old_pid:
+            break
+        time.sleep(0.2)
+    else:
+        print(f"❌ New master did not start within {timeout}s - old master {old_pid} keeps serving")
+        return 1
+
+    # Let the new master fork its workers before the old ones stop accepting
+    time.sleep(float(os.getenv('GUNICORN_RELOAD_GRACE', 2)))
+    os.kill(old_pid, signal.SIGQUIT)
+    print(f"✅ Reloaded: master {old_pid} → {new_pid}")
+    return 0
+
+
+def stop():
+    pid = read_pid(pidfile())
+    if pid is None:
+        print("❌ No running server")
+        return 1
+    os.kill(pid, signal.SIGTERM)
+    print(f"🛑 Sent graceful shutdown to master {pid}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the production server')
+    parser.add_argument('command', nargs='?', default='start', choices=['start', 'reload', 'stop'])
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        start()
+    sys.exit(reload() if args.command == 'reload' else stop())
+
+
+if __name__ == '__main__':
+    main()
@@ -10,10 +10,16 @@ document.addEventListener('DOMContentLoaded', () => {
     loadProducts();
 });
 
+// Signed session token issued at login
+function authHeaders(headers = {}) {
+    const token = localStorage.getItem('authToken');
+    return token ? { ...headers, 'Authorization': `Bearer ${token}` } : headers;
+}
+
 // Check if user is admin
 function checkAdminAccess() {
     const currentUser = JSON.parse(localStorage.getItem('currentUser'));
-    if (!currentUser || !currentUser.is_admin) {
+    if (!currentUser || !currentUser.is_admin || !localStorage.getItem('authToken')) {
         alert('Access denied! Admin only.');
         window.location.href = '/';
     }
@@ -22,7 +28,7 @@ function checkAdminAccess() {
 // Load Statistics
 async function loadStatistics() {
     try {
-        const response = await fetch(`${API_BASE_URL}/admin/stats`);
+        const response = await fetch(`${API_BASE_URL}/admin/stats`, { headers: authHeaders() });
         const data = await response.json();
         
         document.getElementById('statUsers').textContent = data.total_users;
@@ -37,7 +43,7 @@ async function loadStatistics() {
 // Load Users
 async function loadUsers() {
     try {
-        const response = await fetch(`${API_BASE_URL}/admin/users`);
+        const response = await fetch(`${API_BASE_URL}/admin/users`, { headers: authHeaders() });
         const data = await response.json();
         
         const tbody = document.getElementById('usersTableBody');
@@ -73,7 +79,7 @@ async function loadUsers() {
 // Load Orders
 async function loadOrders() {
     try {
-        const response = await fetch(`${API_BASE_URL}/admin/orders`);
+        const response = await fetch(`${API_BASE_URL}/admin/orders`, { headers: authHeaders() });
         const data = await response.json();
         
         const tbody = document.getElementById('ordersTableBody');
@@ -152,7 +158,7 @@ async function editProduct(productId) {
     try {
         const response = await fetch(`${API_BASE_URL}/admin/products/${productId}`, {
             method: 'PUT',
-            headers: { 'Content-Type': 'application/json' },
+            headers: authHeaders({ 'Content-Type': 'application/json' }),
             body: JSON.stringify({ stock_quantity: stock })
         });
         
@@ -177,7 +183,8 @@ async function deleteProduct(productId) {
     
     try {
         const response = await fetch(`${API_BASE_URL}/admin/products/${productId}`, {
-            method: 'DELETE'
+            method: 'DELETE',
+            headers: authHeaders()
         });
         
         if (response.ok) {
@@ -300,7 +307,7 @@ window.addEventListener('load', function() {
             try {
                 const response = await fetch(`${API_BASE_URL}/admin/products`, {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
+                    headers: authHeaders({ 'Content-Type': 'application/json' }),
                     body: JSON.stringify(productData)
                 });
                 
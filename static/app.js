@@ -3,14 +3,17 @@ const API_BASE_URL = 'http://localhost:5001/api';
 
 // Global State
 let currentUser = null;
+let authToken = null;
 let currentCart = null;
 let allProducts = [];
+let ordersCursor = null;
 
 // Initialize App
 document.addEventListener('DOMContentLoaded', function() {
-    // Load user from localStorage
+    // Load user and session token from localStorage
     const savedUser = localStorage.getItem('currentUser');
-    if (savedUser) {
+    authToken = localStorage.getItem('authToken');
+    if (savedUser && authToken) {
         currentUser = JSON.parse(savedUser);
         updateUserInterface();
 
@@ -85,7 +88,9 @@ function setupAuthForms() {
             
             if (response.ok) {
                 currentUser = data.user;
+                authToken = data.token;
                 localStorage.setItem('currentUser', JSON.stringify(currentUser));
+                localStorage.setItem('authToken', authToken);
                 updateUserInterface();
 
                 // Show admin button if user is admin
@@ -173,14 +178,32 @@ function updateUserInterface() {
 
 function logout() {
     currentUser = null;
+    authToken = null;
     currentCart = null;
     localStorage.removeItem('currentUser');
+    localStorage.removeItem('authToken');
     updateUserInterface();
     document.getElementById('admin-btn').style.display = 'none';
     showToast('Logged out successfully', 'success');
     showPage('home');
 }
 
+// Signed session token for cart, order and admin calls
+function authHeaders(headers = {}) {
+    return authToken ? { ...headers, 'Authorization': `Bearer ${authToken}` } : headers;
+}
+
+// Token missing or expired: drop the session and ask for a new login
+function handleAuthError(response) {
+    if (response.status === 401) {
+        logout();
+        showToast('Session expired, please login again', 'error');
+        showPage('login');
+        return true;
+    }
+    return false;
+}
+
 // Products
 async function loadProducts() {
     try {
@@ -241,10 +264,13 @@ async function addToCart(productId) {
     try {
         const response = await fetch(`${API_BASE_URL}/cart/${currentUser.id}/add`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: authHeaders({ 'Content-Type': 'application/json' }),
             body: JSON.stringify({ product_id: productId, quantity })
         });
         
+        if (handleAuthError(response)) {
+            return;
+        }
         const data = await response.json();
         
         if (response.ok) {
@@ -265,7 +291,12 @@ async function loadCart() {
     }
     
     try {
-        const response = await fetch(`${API_BASE_URL}/cart/${currentUser.id}`);
+        const response = await fetch(`${API_BASE_URL}/cart/${currentUser.id}`, {
+            headers: authHeaders()
+        });
+        if (handleAuthError(response)) {
+            return;
+        }
         const data = await response.json();
         
         if (response.ok) {
@@ -308,9 +339,13 @@ function displayCart(cart) {
 async function removeFromCart(productId) {
     try {
         const response = await fetch(`${API_BASE_URL}/cart/${currentUser.id}/remove/${productId}`, {
-            method: 'DELETE'
+            method: 'DELETE',
+            headers: authHeaders()
         });
         
+        if (handleAuthError(response)) {
+            return;
+        }
         const data = await response.json();
         
         if (response.ok) {
@@ -349,14 +384,16 @@ function setupCheckoutForm() {
         try {
             const response = await fetch(`${API_BASE_URL}/orders`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: authHeaders({ 'Content-Type': 'application/json' }),
                 body: JSON.stringify({
-                    user_id: currentUser.id,
                     shipping_address: shippingAddress,
                     payment_method: paymentMethod
                 })
             });
             
+            if (handleAuthError(response)) {
+                return;
+            }
             const data = await response.json();
             
             if (response.ok) {
@@ -375,32 +412,57 @@ function setupCheckoutForm() {
 }
 
 // Orders
-async function loadOrders() {
+const ORDERS_PAGE_SIZE = 10;
+
+async function loadOrders(append = false) {
     if (!currentUser) {
         return;
     }
     
+    if (!append) {
+        ordersCursor = null;
+    }
+    
     try {
-        const response = await fetch(`${API_BASE_URL}/orders/user/${currentUser.id}`);
+        let url = `${API_BASE_URL}/orders/user/${currentUser.id}?limit=${ORDERS_PAGE_SIZE}`;
+        if (ordersCursor) {
+            url += `&cursor=${encodeURIComponent(ordersCursor)}`;
+        }
+        
+        const response = await fetch(url, { headers: authHeaders() });
+        if (handleAuthError(response)) {
+            return;
+        }
         const data = await response.json();
         
         if (response.ok) {
-            displayOrders(data.orders);
+            ordersCursor = data.next_cursor;
+            displayOrders(data.orders, append, data.has_more);
         }
     } catch (error) {
         showToast('Error loading orders', 'error');
     }
 }
 
-function displayOrders(orders) {
+function loadMoreOrders() {
+    loadOrders(true);
+}
+
+function displayOrders(orders, append = false, hasMore = false) {
     const ordersList = document.getElementById('orders-list');
     
-    if (!orders || orders.length === 0) {
+    // Drop the previous "Load more" button before adding a page
+    const loadMoreBtn = document.getElementById('orders-load-more');
+    if (loadMoreBtn) {
+        loadMoreBtn.remove();
+    }
+    
+    if (!append && (!orders || orders.length === 0)) {
         ordersList.innerHTML = '<p class="empty-orders">No orders yet</p>';
         return;
     }
     
-    ordersList.innerHTML = orders.map(order => `
+    const html = orders.map(order => `
         <div class="order-card">
             <div class="order-header">
                 <div>
@@ -412,7 +474,7 @@ function displayOrders(orders) {
                 <span class="order-status ${order.status}">${order.status.toUpperCase()}</span>
             </div>
             <div style="margin: 1rem 0;">
-                ${order.items.map(item => `
+                ${(order.items || []).map(item => `
                     <div style="display: flex; justify-content: space-between; padding: 0.5rem 0;">
                         <span>${item.product_name} x${item.quantity}</span>
                         <span>$${item.subtotal.toFixed(2)}</span>
@@ -428,6 +490,17 @@ function displayOrders(orders) {
             </div>
         </div>
     `).join('');
+    
+    if (append) {
+        ordersList.insertAdjacentHTML('beforeend', html);
+    } else {
+        ordersList.innerHTML = html;
+    }
+    
+    if (hasMore) {
+        ordersList.insertAdjacentHTML('beforeend',
+            '<button id="orders-load-more" class="btn-primary" onclick="loadMoreOrders()">Load more orders</button>');
+    }
 }
 
 // Toast Notification
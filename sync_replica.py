@@ -0,0 +1,57 @@
+"""
+Copy the SQLite primary into the replica files (local stand-in for replication)
+
+Usage:
+    SQLITE_REPLICA_PATHS=replica.db python sync_replica.py               # copy once
+    SQLITE_REPLICA_PATHS=replica.db python sync_replica.py --interval 2  # keep copying (simulated lag)
+"""
+import argparse
+import os
+import sqlite3
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INSTANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+
+def resolve(path):
+    # Flask-SQLAlchemy puts relative SQLite paths in the instance folder
+    return path if os.path.isabs(path) else os.path.join(INSTANCE_DIR, path)
+
+
+def sync(primary, replicas):
+    source = sqlite3.connect(primary)
+    try:
+        for replica in replicas:
+            target = sqlite3.connect(replica)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy the SQLite primary to its replicas')
+    parser.add_argument('--interval', type=float, default=0, help='Repeat every N seconds (0 = once)')
+    args = parser.parse_args()
+
+    primary = resolve(os.getenv('SQLITE_DB_PATH', 'ecommerce.db'))
+    replicas = [resolve(p.strip()) for p in os.getenv('SQLITE_REPLICA_PATHS', '').split(',') if p.strip()]
+    if not replicas:
+        print("❌ Set SQLITE_REPLICA_PATHS to one or more replica files")
+        return
+
+    while True:
+        sync(primary, replicas)
+        print(f"✅ Copied {primary} → {', '.join(replicas)}")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Test configuration
+Run from the repository root: python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def workdir(tmp_path_factory):
+    """Run the app from a scratch directory (its log files are written to the cwd)"""
+    path = tmp_path_factory.mktemp('workdir')
+    previous = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(previous)
+
+
+@pytest.fixture
+def app(workdir, tmp_path, monkeypatch):
+    """App on a fresh, migrated SQLite database, inside an app context, with no background threads"""
+    monkeypatch.setenv('DATABASE_TYPE', 'sqlite')
+    monkeypatch.setenv('SQLITE_DB_PATH', str(tmp_path / 'test.db'))
+    monkeypatch.setenv('SQLITE_REPLICA_PATHS', '')
+    monkeypatch.setenv('JOB_WORKERS', '0')
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '0')
+    monkeypatch.setenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+    monkeypatch.setenv('HEALTH_CHECKS_ENABLED', 'false')
+    monkeypatch.setenv('LOG_LEVEL', 'WARNING')
+
+    from app import create_app, db
+    app = create_app(start_workers=False)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
@@ -0,0 +1,28 @@
+from app.active_users import ActiveUserTracker
+
+NOW = 1_790_000_000.0
+
+
+def test_pending_is_bounded_without_a_flusher():
+    tracker = ActiveUserTracker(max_pending=3)
+    for user_id in range(10):
+        tracker.record(user_id)
+
+    assert len(tracker._pending) == 3
+    assert tracker.dropped == 7
+    # The newest activity is kept
+    assert tracker.flush(now=NOW)['5m'] == 3
+    assert tracker.dropped == 0
+    assert not tracker._pending
+
+
+def test_flush_counts_distinct_users_per_window():
+    tracker = ActiveUserTracker()
+    for user_id in (1, 2, 2, 3):
+        tracker.record(user_id)
+    tracker.flush(now=NOW - 600)
+    tracker.record(3)
+    tracker.record(4)
+
+    assert tracker.flush(now=NOW) == {'5m': 2, '1h': 4, '24h': 4}
+    assert tracker.dropped == 0
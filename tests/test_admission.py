@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from app.admission import (UNKNOWN_THREADS_LIMIT, AdaptiveLimit, AdmissionController, default_limits, init_admission,
+                           parse_request_start)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('t=1700000000.250', 1700000000.25),  # nginx $msec
+    ('1700000000250', 1700000000.25),  # milliseconds
+    ('1700000000250000', 1700000000.25),  # microseconds
+    ('garbage', None),
+    (None, None),
+])
+def test_parse_request_start(value, expected):
+    assert parse_request_start(value) == expected
+
+
+def test_default_limits_follow_worker_threads(monkeypatch):
+    assert default_limits(4) == {'browse': 4, 'checkout': 4, 'auth': 2, 'admin': 2}
+    assert default_limits(1)['admin'] == 1
+
+    monkeypatch.setenv('GUNICORN_WORKER_THREADS', '8')
+    controller = init_admission(Flask(__name__))
+    assert {name: limit.max_limit for name, limit in controller.limits.items()} == default_limits(8)
+
+
+def test_limits_are_high_when_threads_are_unknown(monkeypatch):
+    monkeypatch.delenv('GUNICORN_WORKER_THREADS', raising=False)
+    monkeypatch.setenv('GUNICORN_THREADS', '4')  # e.g. from .env, but not running under gunicorn
+    controller = init_admission(Flask(__name__))
+    assert {name: limit.max_limit for name, limit in controller.limits.items()} == default_limits(UNKNOWN_THREADS_LIMIT)
+
+
+@pytest.mark.parametrize('path, method, route_class', [
+    ('/api/users/login', 'POST', 'auth'),
+    ('/api/users/register', 'POST', 'auth'),
+    ('/api/orders', 'POST', 'checkout'),
+    ('/api/cart/1/add', 'POST', 'checkout'),
+    ('/api/admin/products', 'POST', 'admin'),
+    ('/api/products', 'GET', 'browse'),
+])
+def test_route_classes(path, method, route_class):
+    assert AdmissionController.route_class(path, method) == route_class
+
+
+def _controller(target=0.25):
+    app = Flask(__name__)
+    limit = AdaptiveLimit('browse', 4, target)
+    controller = AdmissionController({'browse': limit}, exempt_paths=('/health', '/api/admin/export'))
+    app.before_request(controller.before_request)
+    app.teardown_request(controller.teardown_request)
+    app.add_url_rule('/api/products', 'products', lambda: 'ok')
+    app.add_url_rule('/api/admin/export/orders', 'export', lambda: 'ok')
+    return app.test_client(), limit
+
+
+def test_backlog_wait_counts_towards_latency():
+    client, limit = _controller()
+    client.get('/api/products', headers={'X-Request-Start': f't={time.time() - 2:.3f}'})
+    assert limit.limit < limit.max_limit
+    assert limit.in_flight == 0
+
+
+def test_fast_requests_without_header_keep_the_limit():
+    client, limit = _controller()
+    for _ in range(10):
+        client.get('/api/products')
+    assert limit.limit == limit.max_limit
+
+
+def test_implausible_queue_times_are_ignored():
+    client, limit = _controller()
+    client.get('/api/products', headers={'X-Request-Start': f't={time.time() - 3600:.3f}'})
+    client.get('/api/products', headers={'X-Request-Start': f't={time.time() + 30:.3f}'})
+    assert limit.limit == limit.max_limit
+
+
+def test_exports_are_not_admitted_or_timed():
+    client, limit = _controller()
+    client.get('/api/admin/export/orders', headers={'X-Request-Start': f't={time.time() - 5:.3f}'})
+    assert limit.limit == limit.max_limit
+    assert limit.in_flight == 0
+
+
+def test_requests_over_the_limit_are_shed():
+    client, limit = _controller()
+    limit.in_flight = 4
+    response = client.get('/api/products')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+@pytest.fixture
+def default_admission(monkeypatch):
+    """Admission settings as run.py sees them (requested before `app`)"""
+    for name in ('GUNICORN_WORKER_THREADS', 'ADMISSION_ENABLED', 'ADMISSION_LIMITS'):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_default_configuration_admits_a_burst_of_logins(default_admission, app, monkeypatch):
+    from app.services.user_service import UserService
+
+    burst = 20
+    arrived = threading.Barrier(burst, timeout=10)
+
+    def authenticate_user(username, password):
+        arrived.wait()  # every login is in flight at once
+        return None, 'Invalid username or password'
+
+    monkeypatch.setattr(UserService, 'authenticate_user', staticmethod(authenticate_user))
+    client = app.test_client()
+    statuses = []
+
+    def login(i):
+        response = client.post('/api/users/login', json={'username': f'burst{i}', 'password': 'x'})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=login, args=(i,)) for i in range(burst)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [401] * burst
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import mysql
+
+from app import db
+from app.models import Order, OrderItem, Product, User
+from app.models.analytics import RollupWatermark, SalesRollup
+from app.services.analytics_service import WATERMARK, AnalyticsService, covering_buckets
+
+
+def test_covering_buckets_uses_months_inside_a_daily_range():
+    assert covering_buckets(datetime(2025, 1, 15, 10, 30), datetime(2025, 3, 10), 'day') == [
+        ('day', datetime(2025, 1, 16), datetime(2025, 2, 1)),
+        ('month', datetime(2025, 2, 1), datetime(2025, 3, 1)),
+        ('day', datetime(2025, 3, 1), datetime(2025, 3, 10)),
+    ]
+
+
+def test_covering_buckets_aligned_year_is_only_months():
+    assert covering_buckets(datetime(2025, 1, 1), datetime(2026, 1, 1), 'day') == [
+        ('month', datetime(2025, 1, 1), datetime(2026, 1, 1)),
+    ]
+
+
+def test_covering_buckets_hours_across_days():
+    assert covering_buckets(datetime(2025, 1, 1, 22), datetime(2025, 1, 3, 2), 'hour') == [
+        ('hour', datetime(2025, 1, 1, 22), datetime(2025, 1, 2)),
+        ('day', datetime(2025, 1, 2), datetime(2025, 1, 3)),
+        ('hour', datetime(2025, 1, 3), datetime(2025, 1, 3, 2)),
+    ]
+
+
+def test_covering_buckets_without_a_whole_coarser_bucket():
+    assert covering_buckets(datetime(2025, 1, 5), datetime(2025, 1, 20), 'day') == [
+        ('day', datetime(2025, 1, 5), datetime(2025, 1, 20)),
+    ]
+    # Months are the coarsest level; the end rounds up to the next month start
+    assert covering_buckets(datetime(2025, 11, 15), datetime(2026, 1, 2), 'month') == [
+        ('month', datetime(2025, 12, 1), datetime(2026, 2, 1)),
+    ]
+
+
+def test_covering_buckets_empty_when_no_bucket_starts_in_range():
+    assert covering_buckets(datetime(2025, 1, 1, 10, 30), datetime(2025, 1, 1, 10, 45), 'hour') == []
+
+
+@pytest.fixture
+def add_order(app):
+    user = User(username='buyer', email='buyer@example.com', password_hash='-')
+    product = Product(id=1, name='Widget', price=10.0, category='Tools')
+    db.session.add_all([user, product])
+    db.session.flush()
+
+    def add(order_id, created_at):
+        db.session.add(Order(id=order_id, user_id=user.id, order_number=f'A-{order_id}', total_amount=20.0,
+                             created_at=created_at))
+        db.session.add(OrderItem(order_id=order_id, product_id=1, product_name='Widget', quantity=2,
+                                 price_at_purchase=10.0, subtotal=20.0))
+        db.session.commit()
+    return add
+
+
+def rolled_up():
+    """(revenue, units, orders) across the daily total rollups, and the watermark"""
+    totals = db.session.execute(
+        select(func.sum(SalesRollup.revenue), func.sum(SalesRollup.units), func.sum(SalesRollup.orders))
+        .where(SalesRollup.granularity == 'day', SalesRollup.dimension == 'total')
+    ).one()
+    return tuple(totals), db.session.get(RollupWatermark, WATERMARK).last_order_id
+
+
+def test_fold_counts_each_order_once(add_order):
+    old = datetime.utcnow() - timedelta(days=2)
+    for order_id in (1, 2, 3):
+        add_order(order_id, old)
+
+    assert AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=30) == (3, None)
+    db.session.commit()
+    assert AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=30) == (0, None)
+    db.session.commit()
+    assert rolled_up() == ((60.0, 6, 3), 3)
+
+
+def test_fold_that_loses_the_watermark_race_adds_nothing(add_order):
+    old = datetime.utcnow() - timedelta(days=2)
+    for order_id in (1, 2):
+        add_order(order_id, old)
+    AnalyticsService.fold_new_orders(batch_size=1, settle_seconds=30)
+    db.session.commit()
+
+    # Another worker claims order 2 after this session read the watermark
+    # (held here so the session keeps the stale copy)
+    watermark = db.session.get(RollupWatermark, WATERMARK)
+    assert watermark.last_order_id == 1
+    db.session.execute(RollupWatermark.__table__.update().values(last_order_id=2))
+
+    assert AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=30) == (0, None)
+    db.session.commit()
+    db.session.expire_all()
+    assert rolled_up() == ((20.0, 2, 1), 2)
+
+
+def test_fold_reports_backlog_when_the_batch_is_full(add_order):
+    old = datetime.utcnow() - timedelta(days=2)
+    for order_id in (1, 2, 3):
+        add_order(order_id, old)
+
+    assert AnalyticsService.fold_new_orders(batch_size=2, settle_seconds=30) == (2, 'backlog')
+    assert AnalyticsService.fold_new_orders(batch_size=2, settle_seconds=30) == (1, None)
+
+
+def test_fold_stops_at_a_recent_gap_and_resumes_once_settled(add_order):
+    add_order(1, datetime.utcnow() - timedelta(days=2))
+    add_order(2, datetime.utcnow() - timedelta(days=2))
+    # Order 3 may still be in flight: 4 committed just now
+    add_order(4, datetime.utcnow())
+
+    assert AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=30) == (2, 'gap')
+    db.session.commit()
+    assert rolled_up() == ((40.0, 4, 2), 2)
+
+    # Once the gap is older than the settle window, folding moves past it
+    assert AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=0) == (1, None)
+    db.session.commit()
+    assert rolled_up() == ((60.0, 6, 3), 4)
+
+
+def test_fold_passes_over_an_old_gap(add_order):
+    old = datetime.utcnow() - timedelta(days=2)
+    add_order(1, old)
+    add_order(3, old)
+
+    assert AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=30) == (2, None)
+    db.session.commit()
+    assert rolled_up() == ((40.0, 4, 2), 3)
+
+
+def test_rebuild_locks_the_watermark_before_clearing(add_order):
+    old = datetime.utcnow() - timedelta(days=2)
+    for order_id in (1, 2):
+        add_order(order_id, old)
+    AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=30)
+    db.session.commit()
+
+    statements = []
+
+    def record(state):
+        statements.append(str(state.statement.compile(dialect=mysql.dialect())))
+    event.listen(db.session, 'do_orm_execute', record)
+    try:
+        AnalyticsService.rebuild()
+    finally:
+        event.remove(db.session, 'do_orm_execute', record)
+    assert 'FOR UPDATE' in statements[0] and 'rollup_watermarks' in statements[0]
+    assert statements[1].startswith('DELETE FROM sales_rollups')
+    db.session.commit()
+
+    assert AnalyticsService.fold_new_orders(batch_size=10, settle_seconds=30) == (2, None)
+    db.session.commit()
+    assert rolled_up() == ((40.0, 4, 2), 2)
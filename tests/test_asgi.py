@@ -0,0 +1,46 @@
+import importlib
+import sys
+
+import pytest
+from starlette.testclient import TestClient
+
+from app import db
+from app.models import Product
+
+
+@pytest.fixture
+def asgi(app, monkeypatch):
+    """app.asgi on the test database, with its own Flask app (imported after `app` set the environment)"""
+    monkeypatch.setenv('APP_PRELOAD', 'true')
+    monkeypatch.setenv('SERVER_TIMING_HEADER', 'true')
+    db.session.add(Product(id=1, name='Widget', price=10.0, category='Tools'))
+    db.session.commit()
+
+    sys.modules.pop('app.asgi', None)
+    module = importlib.import_module('app.asgi')
+    with TestClient(module.app) as client:
+        yield module, client
+    sys.modules.pop('app.asgi', None)
+
+
+def test_async_routes_skip_the_flask_hooks(asgi):
+    module, client = asgi
+    for _ in range(2):
+        response = client.get('/api/products')
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+        # Not served from (or stored in) the response cache, and no phase timings
+        assert 'X-Cache' not in response.headers
+        assert 'Server-Timing' not in response.headers
+    assert 'Server-Timing' in client.get('/api/users/1').headers
+
+
+def test_async_routes_are_not_admission_controlled(asgi, monkeypatch):
+    module, client = asgi
+    browse = module.flask_app.extensions['admission'].limits['browse']
+    monkeypatch.setattr(browse, 'try_acquire', lambda: False)
+
+    assert client.get('/api/products').status_code == 200
+    assert client.get('/api/products/1').status_code == 200
+    # The same class is shed on the routes that fall through to Flask
+    assert client.get('/api/users/1').status_code == 503
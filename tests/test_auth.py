@@ -0,0 +1,96 @@
+import pytest
+from itsdangerous import URLSafeTimedSerializer
+
+from app import db
+from app.auth import DEFAULT_SECRET_KEY, TOKEN_SALT, issue_token
+from app.models import User
+
+
+@pytest.fixture
+def secret_key(monkeypatch):
+    """A configured SECRET_KEY (requested before `app`)"""
+    monkeypatch.setenv('SECRET_KEY', 'test-secret-key')
+
+
+@pytest.fixture
+def default_secret_key(monkeypatch):
+    """SECRET_KEY left unset (requested before `app`)"""
+    monkeypatch.delenv('SECRET_KEY', raising=False)
+
+
+@pytest.fixture
+def users(app):
+    shopper = User(username='shopper', email='shopper@example.com', is_admin=False)
+    admin = User(username='admin', email='admin@example.com', is_admin=True)
+    for user in (shopper, admin):
+        user.set_password('password123')
+    db.session.add_all([shopper, admin])
+    db.session.commit()
+    return shopper, admin
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_admin_token_passes_admin_required(secret_key, app, users):
+    shopper, admin = users
+    client = app.test_client()
+    assert client.get('/api/admin/stats', headers=bearer(issue_token(admin))).status_code == 200
+
+
+def test_non_admin_token_is_forbidden_from_admin_routes(secret_key, app, users):
+    shopper, admin = users
+    client = app.test_client()
+    assert client.get('/api/admin/stats', headers=bearer(issue_token(shopper))).status_code == 403
+    assert client.get('/api/admin/stats').status_code == 401
+
+
+def test_login_required_only_admits_the_users_own_data(secret_key, app, users):
+    shopper, admin = users
+    client = app.test_client()
+    token = issue_token(shopper)
+    assert client.get(f'/api/orders/user/{shopper.id}', headers=bearer(token)).status_code == 200
+    assert client.get(f'/api/orders/user/{admin.id}', headers=bearer(token)).status_code == 403
+    assert client.get(f'/api/orders/user/{shopper.id}', headers=bearer(issue_token(admin))).status_code == 200
+
+
+def test_tampered_token_is_rejected(secret_key, app, users):
+    shopper, admin = users
+    client = app.test_client()
+    payload, signature = issue_token(shopper).rsplit('.', 1)
+    # Same claims signed with another key (e.g. promoting yourself to admin)
+    forged = URLSafeTimedSerializer('guessed-key', salt=TOKEN_SALT).dumps({'uid': admin.id, 'adm': True})
+
+    assert client.get(f'/api/orders/user/{shopper.id}',
+                      headers=bearer(payload + '.' + signature[::-1])).status_code == 401
+    assert client.get('/api/admin/stats', headers=bearer(forged)).status_code == 401
+
+
+def test_expired_token_is_rejected(secret_key, app, users):
+    shopper, admin = users
+    token = issue_token(admin)
+    app.config['AUTH_TOKEN_MAX_AGE'] = -1
+    assert app.test_client().get('/api/admin/stats', headers=bearer(token)).status_code == 401
+
+
+def test_default_secret_key_neither_issues_nor_accepts_tokens(default_secret_key, app, users):
+    shopper, admin = users
+    assert app.config['SECRET_KEY'] == DEFAULT_SECRET_KEY and not app.debug and not app.testing
+    client = app.test_client()
+
+    response = client.post('/api/users/login', json={'username': 'shopper', 'password': 'password123'})
+    assert response.status_code == 503
+    assert 'token' not in response.get_json()
+
+    # Anyone can sign with the public default key
+    minted = URLSafeTimedSerializer(DEFAULT_SECRET_KEY, salt=TOKEN_SALT).dumps({'uid': admin.id, 'adm': True})
+    assert client.get('/api/admin/stats', headers=bearer(minted)).status_code == 401
+
+
+def test_default_secret_key_works_in_testing(default_secret_key, app, users):
+    shopper, admin = users
+    app.testing = True
+    response = app.test_client().post('/api/users/login', json={'username': 'shopper', 'password': 'password123'})
+    assert response.status_code == 200
+    assert response.get_json()['token']
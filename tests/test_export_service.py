@@ -0,0 +1,95 @@
+import csv
+import gzip
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Order, OrderItem, User
+from app.services.export_service import ExportService
+
+NOW = datetime(2026, 10, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def add_order(app):
+    user = User(username='buyer', email='buyer@example.com', password_hash='-')
+    db.session.add(user)
+    db.session.flush()
+
+    def add(order_id, created_ago, updated_ago=None):
+        created = NOW - timedelta(seconds=created_ago)
+        updated = NOW - timedelta(seconds=created_ago if updated_ago is None else updated_ago)
+        db.session.add(Order(id=order_id, user_id=user.id, order_number=f'T-{order_id}', total_amount=10.0,
+                             created_at=created, updated_at=updated))
+        db.session.add(OrderItem(order_id=order_id, product_id=1, product_name='Widget', quantity=1,
+                                 price_at_purchase=10.0, subtotal=10.0))
+        db.session.commit()
+    return add
+
+
+def exported_ids(table, watermark, column='id'):
+    export, error = ExportService.start_export(table, 'csv', watermark=watermark)
+    assert error is None
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(b''.join(export.chunks())).decode())))
+    assert export.rows == len(rows)
+    return [int(row[column]) for row in rows]
+
+
+def test_id_watermark_leaves_out_unsettled_orders(add_order):
+    add_order(1, created_ago=600)
+    add_order(2, created_ago=120)
+    add_order(3, created_ago=5)  # could still have in-flight neighbours below it
+
+    watermark = ExportService.plan(settle_seconds=30, now=NOW)
+    assert watermark['until'] == {'id': 2}
+    assert exported_ids('orders', watermark) == [1, 2]
+    assert exported_ids('order_items', watermark, 'order_id') == [1, 2]
+
+    # The next run starts at the bound and picks up the order once it has settled
+    later = ExportService.plan(since_id=2, settle_seconds=30, now=NOW + timedelta(seconds=60))
+    assert later['since'] == {'id': 2} and later['until'] == {'id': 3}
+    assert exported_ids('orders', later) == [3]
+
+
+def test_id_bound_never_moves_below_the_watermark(add_order):
+    add_order(1, created_ago=5)
+    watermark = ExportService.plan(since_id=7, settle_seconds=30, now=NOW)
+    assert watermark['until'] == {'id': 7}
+    assert exported_ids('orders', watermark) == []
+
+
+def test_updated_watermark_breaks_ties_by_id(add_order):
+    add_order(1, created_ago=900, updated_ago=300)
+    add_order(2, created_ago=800, updated_ago=300)
+    add_order(3, created_ago=700, updated_ago=200)
+    add_order(4, created_ago=600, updated_ago=10)  # changed too recently
+
+    since = NOW - timedelta(seconds=300)
+    watermark = ExportService.plan(since_id=1, since_updated=since.isoformat(), settle_seconds=30, now=NOW)
+    assert watermark['until'] == {'updated_at': NOW - timedelta(seconds=200), 'id': 3}
+    assert exported_ids('orders', watermark) == [2, 3]
+    assert exported_ids('order_items', watermark, 'order_id') == [2, 3]
+    assert ExportService.next_watermark(watermark) == {
+        'since_updated': (NOW - timedelta(seconds=200)).isoformat(), 'since_id': 3
+    }
+
+
+def test_updated_watermark_resumes_exactly_after_the_bound(add_order):
+    add_order(1, created_ago=900, updated_ago=100)
+    add_order(2, created_ago=800, updated_ago=100)
+    add_order(3, created_ago=700, updated_ago=10)
+
+    first = ExportService.plan(since_updated=(NOW - timedelta(days=1)).isoformat(), settle_seconds=30, now=NOW)
+    assert exported_ids('orders', first) == [1, 2]
+
+    resume = ExportService.next_watermark(first)
+    second = ExportService.plan(resume['since_id'], resume['since_updated'], settle_seconds=30,
+                                now=NOW + timedelta(seconds=60))
+    assert exported_ids('orders', second) == [3]
+
+
+def test_invalid_watermarks_are_rejected(app):
+    assert ExportService.start_export('orders', since_id=-1)[1] == "since_id must not be negative"
+    assert 'ISO timestamp' in ExportService.start_export('orders', since_updated='yesterday')[1]
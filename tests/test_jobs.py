@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.jobs import JobQueue, _at_most_once, _handlers, job, purge_finished_jobs
+from app.models.job import OutboxJob
+
+NOW = datetime(2026, 10, 1, 12, 0, 0)
+
+
+def add_job(status, finished_ago_days=None, job_type='test.job'):
+    outbox_job = OutboxJob(job_type=job_type, payload='{}', status=status, max_attempts=3, run_after=NOW,
+                           created_at=NOW - timedelta(days=30),
+                           finished_at=None if finished_ago_days is None else NOW - timedelta(days=finished_ago_days))
+    db.session.add(outbox_job)
+    db.session.commit()
+    return outbox_job.id
+
+
+def test_purge_deletes_only_old_finished_jobs(app):
+    old = [add_job('done', 8), add_job('failed', 30)]
+    kept = [add_job('done', 6), add_job('failed', 1), add_job('pending'), add_job('processing')]
+
+    assert purge_finished_jobs(7, batch_size=1, now=NOW) == len(old)
+    assert sorted(row.id for row in db.session.query(OutboxJob.id)) == sorted(kept)
+    assert purge_finished_jobs(7, now=NOW) == 0
+
+
+@pytest.fixture
+def handlers():
+    """Register test handlers, removed again afterwards"""
+    registered = []
+
+    def register(job_type, func, once=False):
+        job(job_type, once=once)(func)
+        registered.append(job_type)
+
+    yield register
+    for job_type in registered:
+        _handlers.pop(job_type, None)
+        _at_most_once.discard(job_type)
+
+
+def run(app, job_id):
+    queue = JobQueue(app, workers=0)
+    queue._token = 'test'
+    OutboxJob.query.filter_by(id=job_id).update({'status': 'processing', 'locked_by': 'test'})
+    db.session.commit()
+    queue._run_job(job_id)
+    db.session.expire_all()
+    return db.session.get(OutboxJob, job_id)
+
+
+def test_failing_once_job_is_not_retried(app, handlers):
+    calls = []
+
+    def count_then_fail(payload):
+        calls.append(payload)  # a side effect outside the database
+        raise RuntimeError('histogram unavailable')
+
+    handlers('test.once', count_then_fail, once=True)
+    outbox_job = run(app, add_job('pending', job_type='test.once'))
+
+    assert outbox_job.status == 'failed'
+    assert outbox_job.attempts == 1
+    assert 'histogram unavailable' in outbox_job.last_error
+    # The dispatcher has nothing left to claim, so the side effect happened once
+    queue = JobQueue(app, workers=0)
+    queue._token = 'other'
+    assert queue._claim_due_jobs() == []
+    assert len(calls) == 1
+
+
+def test_failing_job_is_retried(app, handlers):
+    def fail(payload):
+        raise RuntimeError('try again')
+
+    handlers('test.retry', fail)
+    outbox_job = run(app, add_job('pending', job_type='test.retry'))
+
+    assert outbox_job.status == 'pending'
+    assert outbox_job.attempts == 1
+    assert outbox_job.finished_at is None
+
+
+def test_order_metrics_run_at_most_once():
+    import app.services.order_service  # noqa: F401 - registers the handler
+
+    assert 'order.record_metrics' in _at_most_once
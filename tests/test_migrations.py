@@ -0,0 +1,85 @@
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.migrations import current_version, latest_version, load_migrations, upgrade
+
+
+def _schema(connection, tables):
+    inspector = sa.inspect(connection)
+    return {
+        table: (
+            sorted(column['name'] for column in inspector.get_columns(table)),
+            sorted((index['name'], tuple(index['column_names'])) for index in inspector.get_indexes(table))
+        )
+        for table in tables
+    }
+
+
+def test_fresh_database_migrates_to_the_models(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    assert upgrade(engine) == [migration.version for migration in load_migrations()]
+    assert current_version(engine) == latest_version()
+
+    models = sa.create_engine('sqlite://')
+    db.metadata.create_all(models)
+    tables = sorted(db.metadata.tables)
+    with engine.connect() as migrated, models.connect() as expected:
+        assert _schema(migrated, tables) == _schema(expected, tables)
+
+
+def test_later_migrations_still_have_work_on_a_fresh_database(tmp_path):
+    """Version 1 is frozen: indexes added later must not exist before their migration"""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'v1.db'}")
+    upgrade(engine, target=1)
+    with engine.connect() as connection:
+        inspector = sa.inspect(connection)
+        order_indexes = {index['name'] for index in inspector.get_indexes('orders')}
+        assert 'ix_orders_user_created_id' not in order_indexes
+        assert 'ix_orders_updated_id' not in order_indexes
+        assert not inspector.has_table('sales_rollups')
+
+
+def test_upgrade_is_a_no_op_when_current(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'again.db'}")
+    upgrade(engine)
+    assert upgrade(engine) == []
+
+
+def test_step_lost_to_another_process_counts_as_applied(tmp_path, monkeypatch):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    upgrade(engine, target=1)
+    second = load_migrations()[1]
+    original = second.module.upgrade
+
+    def raced(connection):
+        # The other process finished this version while we were running it
+        with engine.begin() as other:
+            original(other)
+            other.exec_driver_sql(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+                (second.version, second.name)
+            )
+        raise OperationalError('CREATE INDEX', {}, Exception('index already exists'))
+
+    monkeypatch.setattr(second.module, 'upgrade', raced)
+    assert second.version not in upgrade(engine, target=second.version)
+    assert current_version(engine) == second.version
+
+
+def test_failed_step_is_not_swallowed(tmp_path, monkeypatch):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'fail.db'}")
+    upgrade(engine, target=1)
+    second = load_migrations()[1]
+
+    def broken(connection):
+        raise OperationalError('CREATE INDEX', {}, Exception('disk I/O error'))
+
+    monkeypatch.setattr(second.module, 'upgrade', broken)
+    try:
+        upgrade(engine)
+    except OperationalError:
+        pass
+    else:
+        raise AssertionError('expected the failure to propagate')
+    assert current_version(engine) == 1
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Order, User
+from app.services.order_service import OrderService
+
+NOW = datetime(2026, 10, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(username='buyer', email='buyer@example.com', password_hash='-')
+    db.session.add(user)
+    db.session.flush()
+    # Same timestamp on 2 and 3 (tie broken by id); 5 and 6 predate created_at being stamped
+    created = {1: NOW - timedelta(days=3), 2: NOW - timedelta(days=2), 3: NOW - timedelta(days=2),
+               4: NOW - timedelta(days=1), 5: None, 6: None}
+    for order_id in created:
+        db.session.add(Order(id=order_id, user_id=user.id, order_number=f'H-{order_id}', total_amount=10.0))
+    db.session.flush()
+    for order_id, created_at in created.items():
+        db.session.execute(Order.__table__.update().where(Order.id == order_id).values(created_at=created_at))
+    db.session.commit()
+    return user.id
+
+
+def all_pages(user_id, limit):
+    ids, cursor = [], None
+    while True:
+        (orders, cursor), error = OrderService.get_user_orders_page(user_id, limit=limit, cursor=cursor)
+        assert error is None
+        ids.extend(order.id for order in orders)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize('limit', [1, 2, 4, 10])
+def test_pages_cover_every_order_once_newest_first(user_id, limit):
+    assert all_pages(user_id, limit) == [4, 3, 2, 1, 6, 5]
+
+
+def test_cursor_round_trips_missing_created_at(user_id):
+    order = db.session.get(Order, 6)
+    assert order.created_at is None
+    assert OrderService.decode_cursor(OrderService.encode_cursor(order)) == (None, 6)
+
+
+def test_malformed_cursor_is_an_error(user_id):
+    result, error = OrderService.get_user_orders_page(user_id, cursor='not-a-cursor')
+    assert result is None
+    assert error == 'Invalid cursor'
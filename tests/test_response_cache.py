@@ -0,0 +1,42 @@
+from app.response_cache import CachedResponse, ResponseCache
+
+
+def _entry(tags=('products',)):
+    return CachedResponse(b'{}', 200, 'application/json', tags, expires=1e12, key='k')
+
+
+def test_response_built_during_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate_tags(['products'], now=100.0)
+    assert not cache.put('k', _entry(), generation, now=100.1)
+    assert cache.get('k') is None
+
+
+def test_replica_read_right_after_an_invalidation_is_not_stored():
+    cache = ResponseCache(replica_lag=5.0)
+    cache.invalidate_tags(['products'], now=100.0)
+    # The miss started after the invalidation, so the generation check passes
+    generation = cache.generation
+    assert not cache.put('k', _entry(), generation, replica=True, now=102.0)
+    assert cache.put('k', _entry(), generation, replica=False, now=102.0)
+
+
+def test_replica_read_is_stored_once_the_lag_has_passed():
+    cache = ResponseCache(replica_lag=5.0)
+    cache.invalidate_tags(['products'], now=100.0)
+    assert cache.put('k', _entry(), cache.generation, replica=True, now=105.5)
+
+
+def test_replica_read_of_other_tags_is_stored():
+    cache = ResponseCache(replica_lag=5.0)
+    cache.invalidate_tags(['orders:user:7'], now=100.0)
+    assert cache.put('k', _entry(('products',)), cache.generation, replica=True, now=100.5)
+
+
+def test_forgotten_tag_history_still_guards_replica_reads():
+    cache = ResponseCache(replica_lag=5.0, max_tracked_tags=2)
+    cache.invalidate_tags(['a', 'b'], now=100.0)
+    cache.invalidate_tags(['c'], now=101.0)  # history cleared
+    assert not cache.put('k', _entry(('a',)), cache.generation, replica=True, now=102.0)
+    assert cache.put('k', _entry(('a',)), cache.generation, replica=True, now=106.5)
@@ -0,0 +1,53 @@
+import pytest
+from flask import g
+
+from app import db
+from app.auth import issue_token
+from app.models import User
+
+
+@pytest.fixture
+def default_header(monkeypatch):
+    """SERVER_TIMING_HEADER left unset, with a configured SECRET_KEY (requested before `app`)"""
+    monkeypatch.delenv('SERVER_TIMING_HEADER', raising=False)
+    monkeypatch.setenv('SECRET_KEY', 'test-secret-key')
+
+
+@pytest.fixture
+def admin_token(app):
+    admin = User(username='admin', email='admin@example.com', password_hash='-', is_admin=True)
+    shopper = User(username='shopper', email='shopper@example.com', password_hash='-')
+    db.session.add_all([admin, shopper])
+    db.session.commit()
+    return issue_token(admin), issue_token(shopper)
+
+
+def get_products(app, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    with app.test_client() as client:
+        response = client.get('/api/products', headers=headers)
+        # Recorded for the access log whether or not the header was sent
+        assert g.server_timing_summary['total'] > 0
+    return response
+
+
+def test_header_only_goes_to_admins_by_default(default_header, app, admin_token):
+    admin, shopper = admin_token
+    assert app.config['SERVER_TIMING_HEADER'] == 'admin'
+
+    assert 'Server-Timing' not in get_products(app).headers
+    assert 'Server-Timing' not in get_products(app, shopper).headers
+    assert get_products(app, admin).headers['Server-Timing'].startswith('total;dur=')
+
+
+def test_header_goes_to_everyone_in_debug_mode(default_header, app):
+    app.debug = True
+    assert 'Server-Timing' in get_products(app).headers
+
+
+@pytest.mark.parametrize('mode, sent', [('all', True), ('off', False)])
+def test_header_mode_overrides_the_default(default_header, app, admin_token, mode, sent):
+    admin, shopper = admin_token
+    app.config['SERVER_TIMING_HEADER'] = mode
+    assert ('Server-Timing' in get_products(app, shopper).headers) is sent
+    assert ('Server-Timing' in get_products(app, admin).headers) is sent
@@ -0,0 +1,68 @@
+import pytest
+
+from app.throttle import LoginThrottle, MemoryThrottleBackend, SlidingWindowCounter
+
+
+def test_counts_within_window_and_forgets_after():
+    counter = SlidingWindowCounter(60, buckets=6)
+    for second in range(5):
+        assert counter.hit('alice', now=1000 + second) == second + 1
+    assert counter.count('alice', now=1030) == 5
+    assert counter.count('alice', now=1075) == 0
+
+
+def test_key_cap_holds_under_a_flood_of_new_keys():
+    counter = SlidingWindowCounter(60, max_keys=100)
+    for i in range(10000):
+        counter.hit(f'unknown-{i}', now=1000 + i * 0.001)
+    assert len(counter) == 100
+    assert counter.count('unknown-9999', now=1010) == 1
+    assert counter.count('unknown-0', now=1010) == 0
+
+
+def test_overflow_evicts_least_recently_hit_key():
+    counter = SlidingWindowCounter(60, max_keys=3)
+    counter.hit('a', now=1000)
+    counter.hit('b', now=1001)
+    counter.hit('c', now=1002)
+    counter.hit('a', now=1003)  # a is now the most recent
+    counter.hit('d', now=1004)
+    assert counter.count('b', now=1005) == 0
+    assert counter.count('a', now=1005) == 2
+    assert counter.count('c', now=1005) == 1
+    assert len(counter) == 3
+
+
+def test_overflow_does_not_trigger_a_full_sweep():
+    counter = SlidingWindowCounter(60, max_keys=10)
+    swept = []
+    original = counter._sweep
+    counter._sweep = lambda slot: swept.append(slot) or original(slot)
+    for i in range(100):
+        counter.hit(f'k{i}', now=1000 + i * 0.01)
+    assert len(swept) == 1  # the first hit schedules the timer; overflows never sweep
+    counter.hit('later', now=1061)
+    assert len(swept) == 2
+
+
+def test_timed_sweep_drops_expired_keys():
+    counter = SlidingWindowCounter(60)
+    counter.hit('old', now=1000)
+    counter.hit('new', now=1100)
+    assert len(counter) == 1
+    assert counter.count('new', now=1100) == 1
+
+
+def test_throttle_keys_non_string_usernames():
+    throttle = LoginThrottle(MemoryThrottleBackend(60), user_limit=1)
+    assert throttle.check(12345, '10.0.0.1') is None
+    assert throttle.check('12345', '10.0.0.1') is not None
+    throttle.reset_user(12345)
+    assert throttle.check(12345, '10.0.0.1') is None
+
+
+@pytest.mark.parametrize('username', [12345, ['admin'], {'$ne': None}, None])
+def test_login_rejects_non_string_username(app, username):
+    response = app.test_client().post('/api/users/login', json={'username': username, 'password': 'x'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Username and password must be strings'